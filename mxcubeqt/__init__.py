@@ -40,6 +40,7 @@ gevent.monkey.patch_all(thread=False)
 
 from mxcubecore import HardwareRepository as HWR
 from mxcubeqt.utils import gui_log_handler, error_handler, qt_import
+from mxcubeqt.utils.gevent_bridge import GeventBridge
 from mxcubeqt.gui_supervisor import (
     GUISupervisor,
     LOAD_GUI_EVENT,
@@ -158,19 +159,6 @@ def set_log_file(filename):
     LOGGER.addHandler(HWR_LOG_HANDLER)
 
 
-def do_gevent():
-    """Can't call gevent.run inside inner event loops (message boxes...)"""
-
-    if qt_import.QEventLoop():
-        try:
-            gevent.wait(timeout=0.01)
-        except AssertionError:
-            pass
-    else:
-        # all that I tried with gevent here fails! => seg fault
-        pass
-
-
 class MyCustomEvent(qt_import.QEvent):
     """Custom event"""
 
@@ -324,6 +312,15 @@ def create_app(gui_config_path=None, core_config_path=None):
         dest="mockupMode",
         help="Runs MXCuBE with mockup configuration",
     )
+    parser.add_option(
+        "",
+        "--geventTimer",
+        action="store_true",
+        default=False,
+        dest="geventTimer",
+        help="Drive gevent with a polling Qt timer instead of "
+        + "waking it up through file descriptors",
+    )
     parser.add_option(
         "",
         "--pyqt4",
@@ -558,9 +555,9 @@ def create_app(gui_config_path=None, core_config_path=None):
     # redirect errors to logger
     error_handler.enable_std_err_redirection()
 
-    gevent_timer = qt_import.QTimer()
-    gevent_timer.timeout.connect(do_gevent)
-    gevent_timer.start(0)
+    gevent_bridge = GeventBridge()
+    gevent_bridge.start(force_timer=opts.geventTimer)
+    HWR_LOGGER.debug("gevent integrated with Qt in %s mode" % gevent_bridge.mode)
 
     palette = main_application.palette()
     palette.setColor(qt_import.QPalette.ToolTipBase, qt_import.QColor(255, 241, 204))
@@ -575,6 +572,7 @@ def create_app(gui_config_path=None, core_config_path=None):
     main_application.exec_()
 
     supervisor.finalize()
+    gevent_bridge.stop()
 
     if log_lockfile is not None:
         filename = log_lockfile.name
@@ -23,6 +23,7 @@ import sys
 import time
 import operator
 import weakref
+import collections
 
 import mxcubeqt
 from mxcubeqt.utils import property_bag, connectable, colors, qt_import
@@ -67,28 +68,91 @@ def emitter(ob):
     return _emitter_cache[ob]
 
 
+def get_event_types(*names):
+    """Returns QEvent types of the names known by the Qt version"""
+    return frozenset(
+        getattr(qt_import.QEvent, name)
+        for name in names
+        if hasattr(qt_import.QEvent, name)
+    )
+
+
+# Types of the context menu, mouse, key and focus events filtered in slave mode
+FILTERED_EVENT_TYPES = get_event_types(
+    "ContextMenu",
+    "MouseButtonPress",
+    "MouseButtonRelease",
+    "MouseButtonDblClick",
+    "MouseMove",
+    "NonClientAreaMouseButtonPress",
+    "NonClientAreaMouseButtonRelease",
+    "NonClientAreaMouseButtonDblClick",
+    "NonClientAreaMouseMove",
+    "KeyPress",
+    "KeyRelease",
+    "ShortcutOverride",
+    "FocusIn",
+    "FocusOut",
+    "FocusAboutToChange",
+)
+
+
 class InstanceEventFilter(qt_import.QObject):
-    def eventFilter(self, widget, event):
+    """Blocks user input of bricks in slave mode.
+
+       The filter is installed on the application, so it sees every event.
+       Events of other types than FILTERED_EVENT_TYPES are passed without
+       further work. The brick owning a widget is found once and cached,
+       the cache is cleared when a widget is reparented.
+    """
+
+    def __init__(self, *args):
+        qt_import.QObject.__init__(self, *args)
+        # Key - widget, value - brick owning the widget or None
+        self._bricks = weakref.WeakKeyDictionary()
+
+    def get_brick(self, widget):
+        """Returns the brick (BaseWidget) owning widget, None if none"""
+        try:
+            return self._bricks[widget]
+        except (KeyError, TypeError):
+            pass
         obj = widget
-        while obj is not None:
-            if isinstance(obj, BaseWidget):
-                if isinstance(event, qt_import.QContextMenuEvent):
-                    # if obj.should_filter_event():
-                    return True
-                elif isinstance(event, qt_import.QMouseEvent):
-                    if event.button() == qt_import.Qt.RightButton:
-                        return True
-                    elif obj.should_filter_event():
-                        return True
-                elif isinstance(event, (qt_import.QKeyEvent, qt_import.QFocusEvent)):
-                    if obj.should_filter_event():
-                        return True
-
-                return qt_import.QObject.eventFilter(self, widget, event)
+        while obj is not None and not isinstance(obj, BaseWidget):
             try:
                 obj = obj.parent()
             except BaseException:
                 obj = None
+        try:
+            self._bricks[widget] = obj
+        except TypeError:
+            pass
+        return obj
+
+    def clear_cache(self):
+        self._bricks.clear()
+
+    def eventFilter(self, widget, event):
+        event_type = event.type()
+        if event_type not in FILTERED_EVENT_TYPES:
+            if event_type == qt_import.QEvent.ParentChange:
+                # Widgets below the reparented one may belong to another brick
+                self._bricks.clear()
+            return False
+
+        obj = self.get_brick(widget)
+        if obj is not None:
+            if isinstance(event, qt_import.QContextMenuEvent):
+                # if obj.should_filter_event():
+                return True
+            elif isinstance(event, qt_import.QMouseEvent):
+                if event.button() == qt_import.Qt.RightButton:
+                    return True
+                elif obj.should_filter_event():
+                    return True
+            elif isinstance(event, (qt_import.QKeyEvent, qt_import.QFocusEvent)):
+                if obj.should_filter_event():
+                    return True
         return qt_import.QObject.eventFilter(self, widget, event)
 
 
@@ -114,18 +178,113 @@ class WeakMethodFree:
         return self.f()
 
 
+class WeakMethodNamed:
+    """Weak reference to a method of a wrapped (Qt) object, found by name"""
+
+    def __init__(self, f):
+        self.c = weakref.ref(f.__self__)
+        self.name = f.__name__
+
+    def __call__(self, *args):
+        obj = self.c()
+        if obj is None:
+            return None
+        return getattr(obj, self.name)
+
+
 def WeakMethod(f):
     try:
         f.__func__
     except AttributeError:
+        if getattr(f, "__self__", None) is not None and hasattr(f, "__name__"):
+            try:
+                return WeakMethodNamed(f)
+            except TypeError:
+                pass
         return WeakMethodFree(f)
     return WeakMethodBound(f)
 
 
+def get_event_key(method):
+    """Returns a key identifying the object and the function of a method.
+       Methods got from the same object compare equal, unlike WeakMethod
+       objects created for each of them
+    """
+    owner = getattr(method, "__self__", None)
+    if owner is None:
+        return (None, method)
+    function = getattr(method, "__func__", None)
+    if function is None:
+        function = getattr(method, "__name__", method)
+    return (id(owner), function)
+
+
+class EventsCache(object):
+    """Events received while mirroring is prevented, replayed later.
+
+       Only the latest event of each slot (object and function) is kept,
+       so the size of the cache and the replay time depend on the number
+       of mirrored widgets and not on the length of the session. If
+       max_size is set the oldest events are dropped above it.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        # Key - event key (see get_event_key),
+        # value - (timestamp, weak method, args)
+        self._events = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, timestamp, method, args, key=None, weak_method=None):
+        if key is None:
+            key = get_event_key(method)
+        if weak_method is None:
+            try:
+                weak_method = WeakMethod(method)
+            except TypeError:
+                weak_method = method
+        self._events.pop(key, None)
+        self._events[key] = (timestamp, weak_method, args)
+        if self.max_size is not None and len(self._events) > self.max_size:
+            self.remove_dead()
+            while len(self._events) > self.max_size:
+                self._events.popitem(last=False)
+
+    def remove_dead(self):
+        """Removes events of deleted objects"""
+        for key, (timestamp, weak_method, args) in list(self._events.items()):
+            if isinstance(weak_method, (WeakMethodBound, WeakMethodFree,
+                                        WeakMethodNamed)) \
+                    and weak_method() is None:
+                del self._events[key]
+
+    def get_events(self):
+        """Returns (timestamp, weak method, args) tuples, oldest first"""
+        return sorted(self._events.values(), key=operator.itemgetter(0))
+
+    def clear(self):
+        self._events.clear()
+
+    def replay(self):
+        """Calls the cached events in time order and clears the cache"""
+        events = self.get_events()
+        self.clear()
+        for event_timestamp, event_method, event_args in events:
+            try:
+                method = event_method()
+                if method is not None:
+                    method(*event_args)
+            except BaseException:
+                pass
+
+
 class SignalSlotFilter:
     def __init__(self, signal, slot, should_cache):
         self.signal = signal
         self.slot = WeakMethod(slot)
+        self.key = get_event_key(slot)
         self.should_cache = should_cache
 
     def __call__(self, *args):
@@ -134,7 +293,9 @@ class SignalSlotFilter:
                 and BaseWidget._instance_mirror == BaseWidget.INSTANCE_MIRROR_PREVENT
            ):
             if self.should_cache:
-                BaseWidget._events_cache[self.slot] = (time.time(), self.slot, args)
+                BaseWidget._events_cache.add(
+                    time.time(), None, args, key=self.key, weak_method=self.slot
+                )
                 return
 
         s = self.slot()
@@ -142,6 +303,134 @@ class SignalSlotFilter:
             s(*args)
 
 
+class WidgetRegistry(object):
+    """Index of bricks and named widgets of the application.
+
+       Widgets are registered when they are built and removed when they
+       are destroyed, so lookups by name do not have to scan
+       QApplication.allWidgets().
+    """
+
+    def __init__(self):
+        # Key - id of the widget, value - widget
+        self._bricks = {}
+        self._widgets = {}
+        # Key - object name, value - widget
+        self._names = {}
+        # Key - (brick name, widget attribute name), value - widget
+        self._brick_widgets = {}
+        self._main_window = None
+
+    def register(self, widget):
+        """Registers widget under its current object name.
+           Calling it again after a rename updates the name index.
+        """
+        widget_id = id(widget)
+        if widget_id not in self._widgets:
+            self._widgets[widget_id] = widget
+            if isinstance(widget, BaseWidget):
+                self._bricks[widget_id] = widget
+            widget.destroyed.connect(
+                lambda obj=None, widget_id=widget_id: self._unregister(widget_id)
+            )
+        else:
+            self._remove_brick_widgets(self._remove_names(widget_id))
+
+        name = str(widget.objectName())
+        if name:
+            self._names[name] = widget
+
+    def register_brick_widget(self, brick_name, widget_name, widget):
+        """Registers a child widget of a brick, widget_name being the
+           attribute name of the widget in the brick
+        """
+        self._brick_widgets[(brick_name, widget_name)] = widget
+
+    def set_main_window(self, window):
+        self._main_window = window
+
+    def get_main_window(self):
+        """Returns the window that holds the configuration"""
+        if self._main_window is None:
+            for widget in qt_import.QApplication.allWidgets():
+                if hasattr(widget, "configuration"):
+                    self._main_window = widget
+                    break
+        return self._main_window
+
+    def get_bricks(self):
+        return list(self._bricks.values())
+
+    def get_widget_by_name(self, name):
+        return self._names.get(name)
+
+    def get_brick(self, brick_name):
+        widget = self._names.get(brick_name)
+        if isinstance(widget, DeferredBrick):
+            return widget.get_brick()
+        if isinstance(widget, BaseWidget):
+            return widget
+
+    def get_brick_widget(self, brick_name, widget_name):
+        """Returns brick if widget_name is empty or the brick child widget"""
+        try:
+            return self._brick_widgets[(brick_name, widget_name)]
+        except KeyError:
+            brick = self.get_brick(brick_name)
+            if brick is None:
+                return None
+            widget = brick if widget_name == "" else getattr(brick, widget_name, None)
+            if widget is not None:
+                self._brick_widgets[(brick_name, widget_name)] = widget
+            return widget
+
+    def get_brick_widget_names(self, widget):
+        """Returns (brick name, widget name) of a brick or of a brick child
+           widget, None if widget is not known
+        """
+        for key, value in self._brick_widgets.items():
+            if value is widget:
+                return key
+        if id(widget) in self._bricks:
+            return (str(widget.objectName()), "")
+        for brick in self._bricks.values():
+            for widget_name, value in vars(brick).items():
+                if value is widget:
+                    key = (str(brick.objectName()), widget_name)
+                    self._brick_widgets[key] = widget
+                    return key
+        return None
+
+    def _remove_names(self, widget_id):
+        """Removes names of the widget from the name index, returns them"""
+        names = [key for key, value in self._names.items() if id(value) == widget_id]
+        for name in names:
+            del self._names[name]
+        return names
+
+    def _remove_brick_widgets(self, brick_names):
+        for key in [key for key in self._brick_widgets if key[0] in brick_names]:
+            del self._brick_widgets[key]
+
+    def _unregister(self, widget_id):
+        widget = self._widgets.pop(widget_id, None)
+        if widget is None:
+            return
+        self._bricks.pop(widget_id, None)
+        self._remove_names(widget_id)
+        for key in [
+            key
+            for key, value in self._brick_widgets.items()
+            if id(value) == widget_id or self._names.get(key[0]) is None
+        ]:
+            del self._brick_widgets[key]
+        if self._main_window is widget:
+            self._main_window = None
+
+
+WIDGET_REGISTRY = WidgetRegistry()
+
+
 class BaseWidget(connectable.Connectable, qt_import.QFrame):
     """Base class for MXCuBE bricks"""
 
@@ -179,7 +468,7 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
     _instance_user_id = INSTANCE_USERID_UNKNOWN
     _instance_mirror = INSTANCE_MIRROR_UNKNOWN
     _filter_installed = False
-    _events_cache = {}
+    _events_cache = EventsCache()
     _menu_background_color = None
     _menubar = None
     _toolbar = None
@@ -190,34 +479,36 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
 
     _application_event_filter = InstanceEventFilter(None)
 
+    # Bricks of hidden containers are built when they are first shown.
+    # Bricks that have to follow events from startup on set it to False
+    defer_construction = True
+
     widgetSynchronizeSignal = qt_import.pyqtSignal([])
 
     @staticmethod
     def set_run_mode(mode):
         if mode:
             BaseWidget._run_mode = True
-            for widget in qt_import.QApplication.allWidgets():
-                if isinstance(widget, BaseWidget):
-                    widget.__run()
-                    try:
-                        widget.set_expert_mode(False)
-                    except BaseException:
-                        logging.getLogger().exception(
-                            "Could not set %s to user mode", widget.name()
-                        )
+            for widget in WIDGET_REGISTRY.get_bricks():
+                widget.__run()
+                try:
+                    widget.set_expert_mode(False)
+                except BaseException:
+                    logging.getLogger().exception(
+                        "Could not set %s to user mode", widget.name()
+                    )
 
         else:
             BaseWidget._run_mode = False
-            for widget in qt_import.QApplication.allWidgets():
-                if isinstance(widget, BaseWidget):
-                    widget.__stop()
-                    try:
-                        widget.set_expert_mode(True)
-                    except Exception as ex:
-                        logging.getLogger().exception(
-                            "Could not set %s to expert mode: %s"
-                            % (str(widget), str(ex))
-                        )
+            for widget in WIDGET_REGISTRY.get_bricks():
+                widget.__stop()
+                try:
+                    widget.set_expert_mode(True)
+                except Exception as ex:
+                    logging.getLogger().exception(
+                        "Could not set %s to expert mode: %s"
+                        % (str(widget), str(ex))
+                    )
 
     @staticmethod
     def is_running():
@@ -259,13 +550,12 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
     @staticmethod
     def set_instance_mode(mode):
         BaseWidget._instance_mode = mode
-        for widget in qt_import.QApplication.allWidgets():
-            if isinstance(widget, BaseWidget):
-                widget._instance_mode_changed(mode)
-                if widget["instanceAllowAlways"]:
-                    widget.setEnabled(True)
-                else:
-                    widget.setEnabled(mode == BaseWidget.INSTANCE_MODE_MASTER)
+        for widget in WIDGET_REGISTRY.get_bricks():
+            widget._instance_mode_changed(mode)
+            if widget["instanceAllowAlways"]:
+                widget.setEnabled(True)
+            else:
+                widget.setEnabled(mode == BaseWidget.INSTANCE_MODE_MASTER)
         if BaseWidget._instance_mode == BaseWidget.INSTANCE_MODE_MASTER:
             if BaseWidget._filter_installed:
                 qt_import.QApplication.instance().removeEventFilter(
@@ -275,6 +565,8 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
                 BaseWidget.synchronize_with_cache()  # why?
         else:
             if not BaseWidget._filter_installed:
+                # Reparenting was not followed while the filter was removed
+                BaseWidget._application_event_filter.clear_cache()
                 qt_import.QApplication.instance().installEventFilter(
                     BaseWidget._application_event_filter
                 )
@@ -467,24 +759,22 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
         if role == BaseWidget._instance_role:
             return
         BaseWidget._instance_role = role
-        for widget in qt_import.QApplication.allWidgets():
-            if isinstance(widget, BaseWidget):
-                # try:
-                widget.instance_role_changed(role)
-                # except:
-                #    pass
+        for widget in WIDGET_REGISTRY.get_bricks():
+            # try:
+            widget.instance_role_changed(role)
+            # except:
+            #    pass
 
     @staticmethod
     def set_instance_location(location):
         if location == BaseWidget._instance_location:
             return
         BaseWidget._instance_location = location
-        for widget in qt_import.QApplication.allWidgets():
-            if isinstance(widget, BaseWidget):
-                # try:
-                widget.instance_location_changed(location)
-                # except:
-                #    pass
+        for widget in WIDGET_REGISTRY.get_bricks():
+            # try:
+            widget.instance_location_changed(location)
+            # except:
+            #    pass
 
     @staticmethod
     def set_instance_user_id(user_id):
@@ -492,12 +782,11 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
             return
         BaseWidget._instance_user_id = user_id
 
-        for widget in qt_import.QApplication.allWidgets():
-            if isinstance(widget, BaseWidget):
-                # try:
-                widget.instance_user_id_changed(user_id)
-                # except:
-                #    pass
+        for widget in WIDGET_REGISTRY.get_bricks():
+            # try:
+            widget.instance_user_id_changed(user_id)
+            # except:
+            #    pass
         BaseWidget.update_menu_bar_color()
 
     @staticmethod
@@ -509,9 +798,8 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
         if mirror == BaseWidget.INSTANCE_MIRROR_ALLOW:
             BaseWidget.synchronize_with_cache()
 
-        for widget in qt_import.QApplication.allWidgets():
-            if isinstance(widget, BaseWidget):
-                widget.instance_mirror_changed(mirror)
+        for widget in WIDGET_REGISTRY.get_bricks():
+            widget.instance_mirror_changed(mirror)
 
     def instance_mirror_changed(self, mirror):
         pass
@@ -539,30 +827,22 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
 
     @staticmethod
     def update_whats_this():
-        for widget in qt_import.QApplication.allWidgets():
-            if isinstance(widget, BaseWidget):
-                msg = "%s (%s)\n%s" % (
-                    widget.objectName(),
-                    widget.__class__.__name__,
-                    widget.get_hardware_objects_info(),
-                )
-                widget.setWhatsThis(msg)
+        for widget in WIDGET_REGISTRY.get_bricks():
+            msg = "%s (%s)\n%s" % (
+                widget.objectName(),
+                widget.__class__.__name__,
+                widget.get_hardware_objects_info(),
+            )
+            widget.setWhatsThis(msg)
         qt_import.QWhatsThis.enterWhatsThisMode()
 
     @staticmethod
     def update_widget(brick_name, widget_name, method_name, method_args, master_sync):
-        for widget in qt_import.QApplication.allWidgets():
-            try:
-                if hasattr(widget, "configuration"):
-                    top_level_widget = widget
-                    break
-            except NameError:
-                continue
-
         if (
             not master_sync
             or BaseWidget._instance_mode == BaseWidget.INSTANCE_MODE_MASTER
         ):
+            top_level_widget = WIDGET_REGISTRY.get_main_window()
             top_level_widget.brickChangedSignal.emit(
                 brick_name, widget_name, method_name, method_args, master_sync
             )
@@ -570,9 +850,9 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
     @staticmethod
     def update_tab_widget(tab_name, tab_index):
         if BaseWidget._instance_mode == BaseWidget.INSTANCE_MODE_MASTER:
-            for widget in qt_import.QApplication.allWidgets():
-                if hasattr(widget, "configuration"):
-                    widget.tabChangedSignal.emit(tab_name, tab_index)
+            top_level_widget = WIDGET_REGISTRY.get_main_window()
+            if top_level_widget is not None:
+                top_level_widget.tabChangedSignal.emit(tab_name, tab_index)
 
     @staticmethod
     def widget_groupbox_toggled(brick_name, widget_name, master_sync, state):
@@ -621,6 +901,7 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
             widget = self
         else:
             widget = getattr(self, widget_name)
+        WIDGET_REGISTRY.register_brick_widget(str(self.objectName()), widget_name, widget)
         self._widget_events.append((widget, widget_name, master_sync))
 
     def instance_synchronize(self, *args, **kwargs):
@@ -633,30 +914,21 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
 
     @staticmethod
     def add_event_to_cache(timestamp, method, *args):
-        try:
-            method_to_add = WeakMethod(method)
-        except TypeError:
-            method_to_add = method
-        BaseWidget._events_cache[method_to_add] = (timestamp, method_to_add, args)
+        BaseWidget._events_cache.add(timestamp, method, args)
+
+    @staticmethod
+    def set_events_cache_size(max_size):
+        """Limits the number of cached events, None for no limit"""
+        BaseWidget._events_cache.max_size = max_size
 
     @staticmethod
     def synchronize_with_cache():
-        events = list(BaseWidget._events_cache.values())
-        ordered_events = sorted(events, key=operator.itemgetter(0))
-        for event_timestamp, event_method, event_args in ordered_events:
-            try:
-                method = event_method()
-                if method is not None:
-                    method(*event_args)
-            except BaseException:
-                pass
-        BaseWidget._events_cache = {}
+        BaseWidget._events_cache.replay()
 
     @staticmethod
     def set_gui_enabled(enabled):
-        for widget in qt_import.QApplication.allWidgets():
-            if isinstance(widget, BaseWidget):
-                widget.setEnabled(enabled)
+        for widget in WIDGET_REGISTRY.get_bricks():
+            widget.setEnabled(enabled)
 
     def __init__(self, parent=None, widget_name=""):
 
@@ -664,6 +936,7 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
         qt_import.QFrame.__init__(self, parent)
         self.setObjectName(widget_name)
         self.property_bag = property_bag.PropertyBag()
+        WIDGET_REGISTRY.register(self)
 
         self.__enabled_state = True
         self.__loaded_hardware_objects = []
@@ -671,6 +944,7 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
         self.__use_progress_dialog = False
         self._signal_slot_filters = {}
         self._widget_events = []
+        self._connected_hardware_objects = []
 
         self.setWhatsThis("%s (%s)\n" % (widget_name, self.__class__.__name__))
 
@@ -767,6 +1041,8 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
         if not isinstance(sender, qt_import.QObject):
             if isinstance(sender, HardwareObject):
                 sender.connect(signal, slot)
+                if sender not in self._connected_hardware_objects:
+                    self._connected_hardware_objects.append(sender)
                 return
             else:
                 _sender = emitter(sender)
@@ -1056,9 +1332,7 @@ class BaseWidget(connectable.Connectable, qt_import.QFrame):
             self.setEnabled(True)
 
     def get_window_display_widget(self):
-        for widget in qt_import.QApplication.allWidgets():
-            if hasattr(widget, "configuration"):
-                return widget
+        return WIDGET_REGISTRY.get_main_window()
 
     def set_background_color(self, color):
         colors.set_widget_color(self, color, qt_import.QPalette.Background)
@@ -1088,3 +1362,83 @@ class NullBrick(BaseWidget):
             painter.setPen(qt_import.QPen(qt_import.Qt.black, 1))
             painter.drawLine(0, 0, self.width(), self.height())
             painter.drawLine(0, self.height(), self.width(), 0)
+
+
+class DeferredBrick(qt_import.QWidget):
+    """Takes the place of a brick of a hidden container. The brick is built
+       by build_function when the placeholder is shown or when a brick
+       or the instance server addresses it, and is put in the placeholder.
+    """
+
+    def __init__(self, brick_name, build_function):
+        qt_import.QWidget.__init__(self)
+        self.setObjectName(brick_name)
+        self.brick = None
+        self._build_function = build_function
+        # (signal name, slot) of connections with the brick as sender
+        self._sender_connections = []
+
+        _main_vlayout = qt_import.QVBoxLayout(self)
+        _main_vlayout.setSpacing(0)
+        _main_vlayout.setContentsMargins(0, 0, 0, 0)
+
+        WIDGET_REGISTRY.register(self)
+
+    def showEvent(self, event):
+        self.get_brick()
+        qt_import.QWidget.showEvent(self, event)
+
+    def get_brick(self):
+        """Builds the brick if it does not exist yet and returns it"""
+        if self.brick is not None:
+            return self.brick
+
+        self.brick = self._build_function(str(self.objectName()))
+        self.layout().addWidget(self.brick)
+        self.setSizePolicy(self.brick.sizePolicy())
+
+        if not isinstance(self.brick, NullBrick):
+            for signal_name, slot in self._sender_connections:
+                getattr(self.brick, signal_name).connect(slot)
+        self._sender_connections = []
+
+        if BaseWidget.is_running():
+            self.brick._BaseWidget__run()
+            try:
+                self.brick.set_expert_mode(False)
+            except BaseException:
+                logging.getLogger().exception(
+                    "Could not set %s to user mode", self.objectName()
+                )
+
+        # Values the brick missed by being built after the startup
+        for hwobj in self.brick._connected_hardware_objects:
+            try:
+                hwobj.force_emit_signals()
+            except BaseException:
+                logging.getLogger().exception(
+                    "Could not update %s from %s", self.objectName(), hwobj.name()
+                )
+        return self.brick
+
+    def connect_signal(self, signal_name, slot):
+        """Connects signal of the brick to slot once the brick is built"""
+        if self.brick is None:
+            self._sender_connections.append((signal_name, slot))
+        elif not isinstance(self.brick, NullBrick):
+            getattr(self.brick, signal_name).connect(slot)
+
+    def get_slot(self, slot_name):
+        """Returns a slot that builds the brick before calling its slot_name"""
+
+        def deferred_slot(*args):
+            try:
+                slot = getattr(self.get_brick(), slot_name)
+            except AttributeError:
+                logging.getLogger().error(
+                    "No slot '%s' in receiver %s", slot_name, self.objectName()
+                )
+            else:
+                return slot(*args)
+
+        return deferred_slot
@@ -19,6 +19,7 @@
 
 """Module contains classes defining graphical objects in MXCuBE"""
 
+from mxcubeqt.base_components import WIDGET_REGISTRY, DeferredBrick
 from mxcubeqt.utils import property_bag, qt_import
 
 DEFAULT_MARGIN = 2
@@ -334,6 +335,10 @@ class BrickCfg(_CfgItem):
             self.set_properties(brick.property_bag)
 
     def set_properties(self, properties):
+        if isinstance(self.brick, DeferredBrick):
+            # applied when the brick is built
+            self.properties = properties
+            return
         self.brick.set_persistent_property_bag(properties)
         self.properties = self.brick.property_bag
 
@@ -342,3 +347,4 @@ class BrickCfg(_CfgItem):
 
         if self.brick is not None:
             self.brick.setObjectName(new_name)
+            WIDGET_REGISTRY.register(self.brick)
@@ -36,6 +36,10 @@ __license__ = "LGPLv3+"
 __category__ = "EMBL"
 
 
+# Minimal interval (ms) between two grid view refreshes during a collection
+GRID_VIEW_UPDATE_INTERVAL = 100
+
+
 class SsxResultsBrick(BaseWidget):
     def __init__(self, *args):
 
@@ -59,6 +63,8 @@ class SsxResultsBrick(BaseWidget):
         self.score_type_list = ("score", "spots_resolution", "spots_num")
         self.grid_table_item_fixed = False
         self.comp_table_item_fixed = False
+        self.grid_view_update_timer = qt_import.QTimer(self)
+        self.grid_view_update_timer.setSingleShot(True)
 
         # Properties ----------------------------------------------------------
         self.add_property("cell_size", "integer", 22)
@@ -143,6 +149,7 @@ class SsxResultsBrick(BaseWidget):
         self.hit_map_plot.mouseMovedSignal.connect(self.hit_map_mouse_moved)
         self.grid_graphics_view.mouseMovedSignal.connect(self.grid_view_mouse_moved)
         self.save_grid_view_button.clicked.connect(self.save_grid_view)
+        self.grid_view_update_timer.timeout.connect(self.refresh_grid_view)
 
         # Other ---------------------------------------------------------------
         self.grid_table.setEditTriggers(qt_import.QAbstractItemView.NoEditTriggers)
@@ -505,23 +512,39 @@ class SsxResultsBrick(BaseWidget):
 
     def processing_frame_changed(self, frame_num):
         """
-        Redraws grid view
+        Schedules redraw of grid view
         :param frame_num: int
         :return: None
         """
         self.processing_frame_num = frame_num
-        self.update_gui()
-        self.grid_graphics_view.scene().update()
+        self.schedule_grid_view_refresh()
 
     def collect_frame_changed(self, frame_num):
         """
-        Redraws grid view
+        Schedules redraw of grid view
         :param frame_num: int
         :return: None
         """
         self.collect_frame_num = frame_num
+        self.schedule_grid_view_refresh()
+
+    def schedule_grid_view_refresh(self):
+        """
+        Frames arrive much faster than the screen refresh rate: all frame
+        changes received within GRID_VIEW_UPDATE_INTERVAL are coalesced
+        into one refresh
+        :return: None
+        """
+        if not self.grid_view_update_timer.isActive():
+            self.grid_view_update_timer.start(GRID_VIEW_UPDATE_INTERVAL)
+
+    def refresh_grid_view(self):
+        """
+        Redraws tables and grid view with the last frame numbers
+        :return: None
+        """
         self.update_gui()
-        self.grid_graphics_view.scene().update()
+        self.grid_graphics_overlay.update_overlay()
 
     def update_gui(self):
         """
@@ -725,6 +748,9 @@ class GridViewGraphicsItem(qt_import.QGraphicsItem):
         self.size_chip_y = None
         self.images_per_crystal = 1
 
+        # Static chip layout, rendered once per chip configuration
+        self.layout_pixmap = None
+
     def boundingRect(self):
         """Returns adjusted rect
 
@@ -733,27 +759,57 @@ class GridViewGraphicsItem(qt_import.QGraphicsItem):
         return self.rect.adjusted(0, 0, 40, 40)
 
     def paint(self, painter, option, widget):
-        """Main beam painter method
-           Draws ellipse or rectangle with a cross in the middle
-        """
-        if self.size_hole:
-            self.custom_brush.setColor(qt_import.Qt.lightGray)
-            painter.setBrush(self.custom_brush)
-            for comp_y in range(self.num_comp_y):
-                for comp_x in range(self.num_comp_x):
-                    for hole_y in range(1, self.num_holes_y + 1):
-                        for hole_x in range(1, self.num_holes_x + 1):
-                            # comp_y = self.num_comp_y - comp_y + 1
-                            hole_y = self.num_holes_y - hole_y + 1
-                            corner_x = (
-                                comp_x * (self.size_comp_x + self.offset_comp)
-                            ) + (hole_x * (self.size_hole + self.offset_hole))
-                            corner_y = (
-                                comp_y * (self.size_comp_y + self.offset_comp)
-                            ) + (hole_y * (self.size_hole + self.offset_hole))
-                            painter.drawRect(
+        """
+        Draws cached chip layout
+        """
+        if self.layout_pixmap is not None:
+            painter.drawPixmap(0, 0, self.layout_pixmap)
+
+    def get_image_size(self):
+        """
+        Returns size in pixels of the full chip
+        :return: (int, int)
+        """
+        return int(self.size_chip_x) + 1, int(self.size_chip_y) + 1
+
+    def get_hole_corner(self, comp_x, comp_y, hole_x, hole_y):
+        """
+        Returns top left corner of a hole
+        :return: (float, float)
+        """
+        corner_x = (comp_x * (self.size_comp_x + self.offset_comp)) + (
+            hole_x * (self.size_hole + self.offset_hole)
+        )
+        corner_y = (comp_y * (self.size_comp_y + self.offset_comp)) + (
+            hole_y * (self.size_hole + self.offset_hole)
+        )
+        return corner_x, corner_y
+
+    def render_layout(self):
+        """
+        Renders all holes of the chip in the layout pixmap
+        :return: None
+        """
+        width, height = self.get_image_size()
+        self.layout_pixmap = qt_import.QPixmap(width, height)
+        self.layout_pixmap.fill(qt_import.Qt.transparent)
+
+        painter = qt_import.QPainter(self.layout_pixmap)
+        self.custom_brush.setColor(qt_import.Qt.lightGray)
+        painter.setBrush(self.custom_brush)
+        for comp_y in range(self.num_comp_y):
+            for comp_x in range(self.num_comp_x):
+                for hole_y in range(1, self.num_holes_y + 1):
+                    for hole_x in range(1, self.num_holes_x + 1):
+                        corner_x, corner_y = self.get_hole_corner(
+                            comp_x, comp_y, hole_x, hole_y
+                        )
+                        painter.drawRect(
+                            qt_import.QRectF(
                                 corner_x, corner_y, self.size_hole, self.size_hole
                             )
+                        )
+        painter.end()
 
     def init_item(self, params_dict, results=None):
         """
@@ -781,6 +837,10 @@ class GridViewGraphicsItem(qt_import.QGraphicsItem):
             self.num_comp_y + 0.5
         )
 
+        self.prepareGeometryChange()
+        self.rect = qt_import.QRectF(0, 0, self.size_chip_x, self.size_chip_y)
+        self.render_layout()
+
         self.scene().setSceneRect(0, 0, self.size_chip_x + 10, self.size_chip_y + 10)
 
     def set_results(self, params_dict, results):
@@ -796,16 +856,29 @@ class GridViewGraphicsItem(qt_import.QGraphicsItem):
 
 class GridViewOverlayItem(GridViewGraphicsItem):
     """
-    Overlay to draw fits over the grid view
+    Overlay to draw fits over the grid view.
+    Hits are drawn from a numpy ARGB image: its size depends on the chip
+    size in pixels and not on the number of holes or hits.
     """
 
+    HIT_COLOR = 0xFF0000FF
+
+    def __init__(self):
+        GridViewGraphicsItem.__init__(self)
+
+        self.overlay_image = None
+        self.overlay_array = None
+        # Pixel column/row to hole cell lookup tables
+        self.pixel_to_cell_x = None
+        self.pixel_to_cell_y = None
+
     def calc_hole_coordinates(self, image_index):
         """
         Calculates hole coordinates
-        :param img_index:
+        :param img_index: int or numpy array of ints
         :return:
         """
-        image_index = int(image_index)
+        image_index = np.asarray(image_index, dtype=int)
         image_number = image_index // self.images_per_crystal
 
         comp_serial = image_number // (self.num_holes_x * self.num_holes_y)
@@ -819,11 +892,98 @@ class GridViewOverlayItem(GridViewGraphicsItem):
         timepoint_x = timepoint_serial % 2 + 1
         timepoint_y = timepoint_serial // 2 + 1
 
-        if not hole_y & 1:
-            hole_x = self.num_holes_x - hole_x + 1
+        hole_x = np.where(hole_y & 1, hole_x, self.num_holes_x - hole_x + 1)
 
         return (comp_x, comp_y, hole_x, hole_y, timepoint_x, timepoint_y)
 
+    def render_layout(self):
+        """
+        Builds lookup tables from pixel to hole cell.
+        Columns are looked up for both horizontal timepoints, as
+        the second one overlaps the gap between holes
+        :return: None
+        """
+        width, height = self.get_image_size()
+        num_cells_x = self.num_comp_x * self.num_holes_x
+        num_cells_y = self.num_comp_y * self.num_holes_y
+
+        # Last cell is used for pixels outside of holes
+        self.pixel_to_cell_x = np.full((2, width), num_cells_x, dtype=int)
+        self.pixel_to_cell_y = np.full(height, num_cells_y, dtype=int)
+
+        for comp_x in range(self.num_comp_x):
+            for hole_x in range(1, self.num_holes_x + 1):
+                cell = comp_x * self.num_holes_x + hole_x - 1
+                corner_x = self.get_hole_corner(comp_x, 0, hole_x, 0)[0]
+                for timepoint in range(2):
+                    start = int(corner_x + timepoint * self.size_hole)
+                    self.pixel_to_cell_x[
+                        timepoint, start : int(start + self.size_hole) + 1
+                    ] = cell
+
+        for comp_y in range(self.num_comp_y):
+            for hole_y in range(1, self.num_holes_y + 1):
+                cell = comp_y * self.num_holes_y + hole_y - 1
+                corner_y = self.get_hole_corner(0, comp_y, 0, hole_y)[1]
+                start = int(corner_y)
+                self.pixel_to_cell_y[start : int(start + self.size_hole) + 1] = cell
+
+        self.overlay_array = np.zeros((height, width), dtype=np.uint32)
+        self.overlay_image = None
+
+    def update_overlay(self):
+        """
+        Recomputes hit image from results and schedules a repaint
+        :return: None
+        """
+        if self.results is None or self.pixel_to_cell_x is None:
+            self.overlay_image = None
+            self.update()
+            return
+
+        num_cells_x = self.num_comp_x * self.num_holes_x
+        num_cells_y = self.num_comp_y * self.num_holes_y
+        hits = np.zeros((num_cells_y + 1, num_cells_x + 1, 2), dtype=bool)
+
+        hitlist = np.where(self.results["score"] > 0)[0]
+        if hitlist.size:
+            (
+                comp_x,
+                comp_y,
+                hole_x,
+                hole_y,
+                timepoint_x,
+                timepoint_y,
+            ) = self.calc_hole_coordinates(hitlist)
+            valid = (timepoint_y <= 1) & (comp_y < self.num_comp_y)
+            hits[
+                comp_y[valid] * self.num_holes_y + hole_y[valid] - 1,
+                comp_x[valid] * self.num_holes_x + hole_x[valid] - 1,
+                timepoint_x[valid] - 1,
+            ] = True
+
+        row_hits = hits[self.pixel_to_cell_y]
+        mask = (
+            row_hits[:, self.pixel_to_cell_x[0], 0]
+            | row_hits[:, self.pixel_to_cell_x[1], 1]
+        )
+        self.overlay_array[:] = np.where(mask, self.HIT_COLOR, 0)
+
+        height, width = self.overlay_array.shape
+        # QImage does not copy the buffer: overlay_array is kept alive
+        self.overlay_image = qt_import.QImage(
+            self.overlay_array.data,
+            width,
+            height,
+            width * 4,
+            qt_import.QImage.Format_ARGB32,
+        )
+        self.update()
+
+    def set_results(self, params_dict, results):
+        GridViewGraphicsItem.set_results(self, params_dict, results)
+        self.update_overlay()
+
     def paint(self, painter, option, widget):
         """
         Main pain method
@@ -832,47 +992,5 @@ class GridViewOverlayItem(GridViewGraphicsItem):
         :param widget:
         :return:
         """
-        self.custom_brush.setColor(qt_import.Qt.blue)
-        painter.setBrush(self.custom_brush)
-
-        def draw_hole_timeseries(
-            comp_x, comp_y, hole_x, hole_y, subpixel_x, subpixel_y
-        ):
-            """
-            Draws holes
-            :param comp_x:
-            :param comp_y:
-            :param hole_x:
-            :param hole_y:
-            :param subpixel_x:
-            :param subpixel_y:
-            :return:
-            """
-            # comp_y = self.num_comp_y - comp_y +1
-            # hole_y        = self.num_holes_y - hole_y +1
-            # subpixel_y    = self.no_subpixels_y - subpixel_y +1
-
-            corner_x = (
-                comp_x * (self.size_comp_x + self.offset_comp)
-                + (hole_x * (self.size_hole + self.offset_hole))
-                + ((subpixel_x - 1) * self.size_hole)
-            )
-
-            corner_y = (
-                comp_y * (self.size_comp_y + self.offset_comp)
-                + (hole_y * (self.size_hole + self.offset_hole))
-                + ((subpixel_y - 1) * self.size_hole)
-            )
-
-            painter.drawRect(corner_x, corner_y, self.size_hole, self.size_hole)
-
-        if self.results is not None:
-            hitlist = np.where(self.results["score"] > 0)[0]
-            for hit in hitlist:
-                comp_x, comp_y, hole_x, hole_y, timepoint_x, timepoint_y = self.calc_hole_coordinates(
-                    hit
-                )
-                if timepoint_y <= 1:
-                    draw_hole_timeseries(
-                        comp_x, comp_y, hole_x, hole_y, timepoint_x, timepoint_y
-                    )
+        if self.overlay_image is not None:
+            painter.drawImage(0, 0, self.overlay_image)
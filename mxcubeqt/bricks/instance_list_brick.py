@@ -21,8 +21,10 @@
 
 import os
 import sys
+import time
 import smtplib
 import gevent
+import uuid
 import logging
 import collections
 
@@ -31,8 +33,13 @@ if sys.version_info[0] == 3:
 else:
     from email import Utils as utils
 
-from mxcubeqt.base_components import BaseWidget
-from mxcubeqt.utils import colors, icons, qt_import
+from mxcubeqt.base_components import BaseWidget, WIDGET_REGISTRY
+from mxcubeqt.utils import colors, icons, instance_codec, qt_import
+from mxcubeqt.utils.instance_sync import (
+    BrickUpdateBatcher,
+    MirrorState,
+    MirrorStateReceiver,
+)
 from mxcubecore.HardwareObjects import QtInstanceServer
 
 __credits__ = ["MXCuBE collaboration"]
@@ -149,6 +156,22 @@ class InstanceListBrick(BaseWidget):
         self.my_proposal = None
         self.in_control = None
         self.connections = {}
+        self.brick_update_batcher = BrickUpdateBatcher(
+            self.send_brick_update, batch_function=self.send_brick_updates
+        )
+        # Mirrored states sent by the server and applied by clients
+        self.mirror_state = MirrorState()
+        self.mirror_state_receiver = MirrorStateReceiver(
+            self.apply_mirrored_state, self.send_state_resync_request
+        )
+        # Key - (id of widget, method name),
+        # value - (brick name, widget name, method name) of mirror_state
+        self.mirror_state_keys = {}
+        # Codec of the state messages, negotiated with the clients
+        self.codec_token = uuid.uuid4().hex
+        self.codec_version = instance_codec.LEGACY_CODEC_VERSION
+        # Key - codec token of a client, value - codec versions of the client
+        self.client_codec_versions = {}
         self.server_icon = icons.load_icon("Home2")
         self.client_icon = icons.load_icon("User2")
 
@@ -448,14 +471,7 @@ class InstanceListBrick(BaseWidget):
             local = BaseWidget.INSTANCE_LOCATION_EXTERNAL
         BaseWidget.set_instance_location(local)
 
-        for widget in qt_import.QApplication.allWidgets():
-            try:
-                if hasattr(widget, "configuration"):
-                    active_window = widget
-                    break
-            except NameError:
-                logging.getLogger().warning("Widget {} has no attribute {}"
-                                            .format(widget, "configuration"))
+        active_window = WIDGET_REGISTRY.get_main_window()
         active_window.brickChangedSignal.connect(self.application_brick_changed)
         active_window.tabChangedSignal.connect(self.application_tab_changed)
 
@@ -463,6 +479,7 @@ class InstanceListBrick(BaseWidget):
         self, connected, server_id=None, my_nickname=None, quiet=False
     ):
         if connected is None:
+            self.mirror_state_receiver.reset()
             BaseWidget.set_instance_role(BaseWidget.INSTANCE_ROLE_CLIENTCONNECTING)
             BaseWidget.set_instance_mode(BaseWidget.INSTANCE_MODE_SLAVE)
         elif not connected:
@@ -491,6 +508,7 @@ class InstanceListBrick(BaseWidget):
             item.setFlags(qt_import.Qt.ItemIsEnabled)
             self.have_control(False, gui_only=True)
             self.init_name(my_nickname)
+            self.announce_codec_versions()
 
             msg_event = MsgDialogEvent(
                 qt_import.QMessageBox.Information,
@@ -542,6 +560,7 @@ class InstanceListBrick(BaseWidget):
 
     def widget_update(self, timestamp, method, method_args, master_sync=True):
         if self.instance_server_hwobj.isServer():
+            self.update_mirror_state(method, method_args, master_sync)
             BaseWidget.add_event_to_cache(timestamp, method, *method_args)
             if not master_sync or BaseWidget.should_run_event():
                 try:
@@ -617,6 +636,184 @@ class InstanceListBrick(BaseWidget):
             )
             qt_import.QApplication.postEvent(self, brick_event)
 
+    def send_brick_updates(self, updates):
+        """Sends the brick updates of a batcher window, returns the number
+           of sent messages. The server sends them as deltas of the mirror
+           state in one message, clients send each update to the server
+        """
+        if self.instance_server_hwobj is None:
+            return 0
+        if not self.instance_server_hwobj.isServer():
+            for update in updates:
+                self.send_brick_update(*update)
+            return len(updates)
+
+        deltas = []
+        for brick_name, widget_name, method_name, method_args, master_sync in updates:
+            widget = WIDGET_REGISTRY.get_brick_widget(brick_name, widget_name)
+            if widget is not None:
+                self.mirror_state_keys[(id(widget), method_name)] = (
+                    brick_name,
+                    widget_name,
+                    method_name,
+                )
+            deltas.append(
+                self.mirror_state.update(
+                    brick_name, widget_name, method_name, method_args, master_sync
+                )
+            )
+        message_type, message = instance_codec.encode_deltas(
+            self.codec_version, deltas
+        )
+        if message_type == instance_codec.DELTA:
+            self.send_state_message("apply_state_delta", message)
+        else:
+            self.send_state_message("apply_state_deltas", message)
+        return 1
+
+    def send_brick_update(
+        self, brick_name, widget_name, method_name, method_args, master_sync
+    ):
+        """Sends a brick update of a client to the server"""
+        self.instance_server_hwobj.sendBrickUpdateMessage(
+            brick_name, widget_name, method_name, method_args, master_sync
+        )
+
+    def send_state_message(self, method_name, *method_args):
+        """Calls method_name of the instance list brick of the other
+           instances. State messages go through brick update messages of
+           the instance server, addressed to this brick
+        """
+        self.instance_server_hwobj.sendBrickUpdateMessage(
+            str(self.objectName()), "", method_name, method_args, False
+        )
+
+    def update_mirror_state(self, method, method_args, master_sync):
+        """Keeps the mirror state of a widget changed by a client. The
+           change is already sent to the other clients by the server
+        """
+        widget = getattr(method, "__self__", None)
+        if widget is self:
+            # State messages of the clients (codec versions, resync
+            # requests) are not widget states
+            return
+        method_name = getattr(method, "__name__", None)
+        key = self.mirror_state_keys.get((id(widget), method_name))
+        if key is None:
+            # Widget not updated by the server yet
+            widget_names = WIDGET_REGISTRY.get_brick_widget_names(widget)
+            if widget_names is None:
+                return
+            key = widget_names + (method_name,)
+            self.mirror_state_keys[(id(widget), method_name)] = key
+        self.mirror_state.set_state(*(key + (method_args, master_sync)))
+
+    def send_state_snapshot(self):
+        self.brick_update_batcher.flush()
+        self.send_state_message(
+            "apply_state_snapshot",
+            instance_codec.encode_message(
+                self.codec_version,
+                instance_codec.SNAPSHOT,
+                self.mirror_state.get_snapshot(),
+            ),
+        )
+
+    def send_state_resync_request(self, sequence_number):
+        logging.getLogger("GUI").debug(
+            "Mirrored state update missing after %s, resynchronizing"
+            % sequence_number
+        )
+        self.send_state_message("resync_state", sequence_number)
+
+    def resync_state(self, sequence_number):
+        """Sends the deltas following sequence_number, or a snapshot if
+           they are not kept anymore. Called by clients
+        """
+        if not self.instance_server_hwobj.isServer():
+            return
+        deltas = self.mirror_state.get_deltas_since(sequence_number)
+        if deltas is None:
+            self.send_state_snapshot()
+        elif deltas:
+            self.send_state_message(
+                "apply_state_deltas",
+                instance_codec.encode_message(
+                    self.codec_version, instance_codec.DELTAS, deltas
+                ),
+            )
+
+    def apply_state_snapshot(self, snapshot):
+        if not self.instance_server_hwobj.isServer():
+            self.mirror_state_receiver.apply_snapshot(
+                instance_codec.decode_message(snapshot)
+            )
+
+    def apply_state_delta(self, delta):
+        if not self.instance_server_hwobj.isServer():
+            self.mirror_state_receiver.apply_delta(
+                instance_codec.decode_message(delta)
+            )
+
+    def apply_state_deltas(self, deltas):
+        if not self.instance_server_hwobj.isServer():
+            self.mirror_state_receiver.apply_deltas(
+                instance_codec.decode_message(deltas)
+            )
+
+    def announce_codec_versions(self):
+        """Sends the codec versions of this client to the server"""
+        self.send_state_message(
+            "set_client_codec_versions",
+            self.codec_token,
+            instance_codec.get_codec_versions(),
+        )
+
+    def request_codec_versions(self):
+        if not self.instance_server_hwobj.isServer():
+            self.announce_codec_versions()
+
+    def set_client_codec_versions(self, codec_token, codec_versions):
+        if self.instance_server_hwobj.isServer():
+            self.client_codec_versions[codec_token] = codec_versions
+            self.update_codec_version()
+
+    def update_codec_version(self):
+        """Uses the highest codec version of all clients. State messages
+           are sent in the legacy format as long as a client has not sent
+           its codec versions
+        """
+        if self.connections and len(self.client_codec_versions) >= len(
+            self.connections
+        ):
+            codec_version = instance_codec.negotiate_codec_version(
+                self.client_codec_versions.values()
+            )
+        else:
+            codec_version = instance_codec.LEGACY_CODEC_VERSION
+        if codec_version != self.codec_version:
+            logging.getLogger("GUI").debug(
+                "Instance state messages codec version %d" % codec_version
+            )
+            self.codec_version = codec_version
+
+    def apply_mirrored_state(
+        self, brick_name, widget_name, method_name, method_args, master_sync
+    ):
+        widget = WIDGET_REGISTRY.get_brick_widget(brick_name, widget_name)
+        if widget is None:
+            logging.getLogger("GUI").debug(
+                "Mirrored widget %s.%s not found" % (brick_name, widget_name)
+            )
+            return
+        self.widget_update(
+            time.time(), getattr(widget, method_name), method_args, master_sync
+        )
+
+    def get_sync_statistics(self):
+        """Returns message counters and rates of mirrored brick updates"""
+        return self.brick_update_batcher.get_statistics()
+
     def init_name(self, new_name):
         self.nickname_ledit.blockSignals(True)
         self.nickname_ledit.setText(new_name)
@@ -681,6 +878,11 @@ class InstanceListBrick(BaseWidget):
         )
         item.setFlags(qt_import.Qt.ItemIsEnabled)
         self.connections[client_id[0]] = (item, client_id[1])
+        if self.instance_server_hwobj.isServer():
+            # Legacy format until the new client sends its codec versions
+            self.update_codec_version()
+            # Clients already up to date ignore the snapshot
+            self.send_state_snapshot()
 
     def client_closed(self, client_id):
         try:
@@ -692,6 +894,12 @@ class InstanceListBrick(BaseWidget):
         else:
             self.connections.pop(client_id[0])
             self.users_listwidget.takeItem(self.users_listwidget.row(item))
+        if self.instance_server_hwobj.isServer():
+            # Codec token of the closed client is unknown, clients send
+            # their codec versions again
+            self.client_codec_versions = {}
+            self.update_codec_version()
+            self.send_state_message("request_codec_versions")
 
     def client_changed(self, old_client_id, new_client_id):
         try:
@@ -734,10 +942,9 @@ class InstanceListBrick(BaseWidget):
 
     def have_control(self, have_control, gui_only=False):
         camera_brick = None
-        for widget in qt_import.QApplication.allWidgets():
-            if isinstance(widget, BaseWidget):
-                if "CameraBrick" in str(widget.__class__):
-                    widget.set_control_mode(have_control)
+        for widget in WIDGET_REGISTRY.get_bricks():
+            if "CameraBrick" in str(widget.__class__):
+                widget.set_control_mode(have_control)
 
         if not gui_only:
             if have_control:
@@ -970,7 +1177,7 @@ class InstanceListBrick(BaseWidget):
                     self.instance_server_hwobj.initializeInstance()
 
             elif event.type() == APP_BRICK_EVENT:
-                self.instance_server_hwobj.sendBrickUpdateMessage(
+                self.brick_update_batcher.add(
                     event.brick_name,
                     event.widget_name,
                     event.method_name,
@@ -979,6 +1186,8 @@ class InstanceListBrick(BaseWidget):
                 )
 
             elif event.type() == APP_TAB_EVENT:
+                # Brick updates are sent before the tab change
+                self.brick_update_batcher.flush()
                 self.instance_server_hwobj.sendTabUpdateMessage(
                     event.tab_name, event.tab_index
                 )
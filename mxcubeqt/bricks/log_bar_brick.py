@@ -39,6 +39,9 @@ class LogBarBrick(BaseWidget):
         logging.CRITICAL: qt_import.Qt.red,
     }
 
+    # Log records are only kept until the registered viewers get them
+    defer_construction = False
+
     def __init__(self, *args):
 
         BaseWidget.__init__(self, *args)
@@ -82,8 +85,9 @@ class LogBarBrick(BaseWidget):
         self.test_mode = True
 
     def customEvent(self, event):
-        """Event to add a new log record"""
-        self.append_log_record(event.record)
+        """Event to add a batch of log records"""
+        for record in event.records:
+            self.append_log_record(record)
 
     def append_log_record(self, record):
         """Appends a new log line to the text edit
@@ -79,57 +79,187 @@ __license__ = "LGPLv3+"
 __category__ = "Log"
 
 
-class CustomTreeWidget(qt_import.QTreeWidget):
+class LogTableModel(qt_import.QAbstractTableModel):
+    """Keeps log records and exposes them as table rows.
+       Text of a row is only built when the row is displayed.
+    """
+
+    HEADER_LABELS = ("Level", "Date", "Time", "Message")
+
+    def __init__(self, parent=None):
+        qt_import.QAbstractTableModel.__init__(self, parent)
+
+        self.max_log_lines = None
+        self._records = []
+        # Number of records removed from the top since the last clear.
+        # Used to keep the row background stable when trimming
+        self._first_row_number = 0
+
+    def rowCount(self, parent=qt_import.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._records)
+
+    def columnCount(self, parent=qt_import.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(LogTableModel.HEADER_LABELS)
+
+    def headerData(self, section, orientation, role=qt_import.Qt.DisplayRole):
+        if (
+            role == qt_import.Qt.DisplayRole
+            and orientation == qt_import.Qt.Horizontal
+        ):
+            return LogTableModel.HEADER_LABELS[section]
+        return None
+
+    def data(self, index, role=qt_import.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == qt_import.Qt.DisplayRole:
+            return self.get_text(index.row(), index.column())
+        elif role == qt_import.Qt.BackgroundRole:
+            if (self._first_row_number + index.row() + 1) % 10 == 0:
+                return qt_import.QBrush(colors.LIGHT_2_GRAY)
+        return None
+
+    def get_text(self, row, column):
+        """Returns the text displayed in a cell"""
+        record, msg = self._records[row]
+        if column == 0:
+            return record.getLevelName()
+        elif column == 1:
+            return record.getDate()
+        elif column == 2:
+            return record.getTime()
+        return msg
+
+    def add_records(self, records):
+        """Appends a batch of records and trims the oldest ones if
+           max_log_lines is exceeded
+        """
+        if not records:
+            return
+
+        first_row = len(self._records)
+        self.beginInsertRows(
+            qt_import.QModelIndex(), first_row, first_row + len(records) - 1
+        )
+        for record in records:
+            self._records.append(
+                (record, record.getMessage().replace("\n", " ").strip())
+            )
+        self.endInsertRows()
+
+        if self.max_log_lines and self.max_log_lines > 0:
+            self.remove_first_rows(len(self._records) - self.max_log_lines)
+
+    def remove_first_rows(self, num_rows):
+        """Removes num_rows oldest records in one step"""
+        if num_rows <= 0:
+            return
+        self.beginRemoveRows(qt_import.QModelIndex(), 0, num_rows - 1)
+        del self._records[:num_rows]
+        self._first_row_number += num_rows
+        self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._records = []
+        self._first_row_number = 0
+        self.endResetModel()
+
+
+class LogTableView(qt_import.QTableView):
+    """Displays log records of a LogTableModel. Only visible rows are
+       rendered, records are appended in batches.
+    """
+
     def __init__(self, parent, tab_label):
-        qt_import.QTreeWidget.__init__(self, parent)
+        qt_import.QTableView.__init__(self, parent)
 
-        self.setSizePolicy(qt_import.QSizePolicy.Minimum, qt_import.QSizePolicy.Expanding)
+        self.setSizePolicy(
+            qt_import.QSizePolicy.Minimum, qt_import.QSizePolicy.Expanding
+        )
         self.tab_label = tab_label
         self.unread_messages = 0
-        self.max_log_lines = None
 
-        self.setColumnCount(4)
-        self.setRootIsDecorated(False)
-        self.setHeaderLabels(["Level", "Date", "Time", "Message"])
+        self.log_model = LogTableModel(self)
+        self.filter_model = qt_import.QSortFilterProxyModel(self)
+        self.filter_model.setSourceModel(self.log_model)
+        self.filter_model.setFilterKeyColumn(-1)
+        self.filter_model.setFilterCaseSensitivity(qt_import.Qt.CaseInsensitive)
+        self.setModel(self.filter_model)
+
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setSelectionBehavior(qt_import.QAbstractItemView.SelectRows)
+        self.setVerticalScrollMode(qt_import.QAbstractItemView.ScrollPerPixel)
+        self.verticalHeader().hide()
+        # Fixed row height: rows are not measured one by one
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 4)
+        if hasattr(self.verticalHeader(), "setSectionResizeMode"):
+            self.verticalHeader().setSectionResizeMode(qt_import.QHeaderView.Fixed)
+        else:
+            self.verticalHeader().setResizeMode(qt_import.QHeaderView.Fixed)
+        self.horizontalHeader().setStretchLastSection(True)
 
         self.contextMenuEvent = self.show_context_menu
         self.clipboard = qt_import.QApplication.clipboard()
 
     def add_log_line(self, record):
-        msg = record.getMessage().replace("\n", " ").strip()
-        info_str_list = []
-
-        info_str_list.append(record.getLevelName())
-        info_str_list.append(record.getDate())
-        info_str_list.append(record.getTime())
-        info_str_list.append(msg)
-        new_item = qt_import.QTreeWidgetItem(info_str_list)
-        self.addTopLevelItem(new_item)
-        if self.topLevelItemCount() % 10 == 0:
-            for col in range(4):
-                new_item.setBackground(col, qt_import.QBrush(colors.LIGHT_2_GRAY))
+        self.add_log_lines([record])
 
-        if self.max_log_lines and self.max_log_lines > 0:
-            if self.topLevelItemCount() > self.max_log_lines:
-                self.takeTopLevelItem(0)
+    def add_log_lines(self, records):
+        """Appends a batch of records and scrolls to the last one"""
+        self.log_model.add_records(records)
         self.scrollToBottom()
 
     def set_max_log_lines(self, max_log_lines):
-        self.max_log_lines = max_log_lines
+        self.log_model.max_log_lines = max_log_lines
+
+    def set_filter_text(self, filter_text):
+        """Shows only rows containing filter_text (case insensitive)"""
+        self.filter_model.setFilterFixedString(filter_text)
+        self.scrollToBottom()
+
+    def clear(self):
+        self.log_model.clear()
 
     def show_context_menu(self, context_menu_event):
         menu = qt_import.QMenu(self)
         menu.addAction("Clear", self.clear)
         menu.addAction("Copy", self.copy_log)
         menu.addAction("Save log", self.save_log)
+        menu.addAction("Filter...", self.edit_filter)
         menu.popup(qt_import.QCursor.pos())
 
+    def edit_filter(self):
+        filter_text, ok = qt_import.QInputDialog.getText(
+            self,
+            "Filter log",
+            "Show messages containing:",
+            qt_import.QLineEdit.Normal,
+            self.filter_model.filterRegExp().pattern(),
+        )
+        if ok:
+            self.set_filter_text(str(filter_text))
+
     def copy_log(self):
         self.clipboard.clear(mode=self.clipboard.Clipboard)
-        text = ""
-        for item_index in range(self.topLevelItemCount()):
-            for col in range(4):
-                text += "%s%s" % (self.topLevelItem(item_index).text(col), chr(9))
+        lines = []
+        for row in range(self.filter_model.rowCount()):
+            source_row = self.filter_model.mapToSource(
+                self.filter_model.index(row, 0)
+            ).row()
+            lines.append(
+                "".join(
+                    "%s%s" % (self.log_model.get_text(source_row, col), chr(9))
+                    for col in range(self.log_model.columnCount())
+                )
+            )
+        text = "\n".join(lines)
+        if lines:
             text += "\n"
         self.clipboard.setText(text, mode=self.clipboard.Clipboard)
 
@@ -271,6 +401,9 @@ class LogViewBrick(BaseWidget):
         "debug": "Debug messages; please disregard them",
     }
 
+    # Log records are only kept until the registered viewers get them
+    defer_construction = False
+
     incUnreadMessagesSignal = qt_import.pyqtSignal(int, bool)
     resetUnreadMessagesSignal = qt_import.pyqtSignal(bool)
 
@@ -305,9 +438,9 @@ class LogViewBrick(BaseWidget):
         # Graphic elements ----------------------------------------------------
         self.tab_widget = qt_import.QTabWidget(self)
 
-        self.details_log = CustomTreeWidget(self.tab_widget, "Errors and warnings")
-        self.info_log = CustomTreeWidget(self.tab_widget, "Information")
-        self.debug_log = CustomTreeWidget(self.tab_widget, "Debug")
+        self.details_log = LogTableView(self.tab_widget, "Errors and warnings")
+        self.info_log = LogTableView(self.tab_widget, "Information")
+        self.debug_log = LogTableView(self.tab_widget, "Debug")
         self.feedback_log = Submitfeedback(
             self.tab_widget, self["emailAddresses"], "Submit feedback"
         )
@@ -365,27 +498,44 @@ class LogViewBrick(BaseWidget):
                 self.resetUnreadMessagesSignal.emit(True)
 
     def append_log_record(self, record):
-        rec_level = record.getLevel()
+        self.append_log_records([record])
+
+    def append_log_records(self, records):
+        """Routes a batch of records to the tabs according to their level.
+           Each tab is updated once per batch.
+        """
+        tab_records = {}
+        tab_order = []
+        for record in records:
+            rec_level = record.getLevel()
+
+            if rec_level == logging.DEBUG and not self["showDebug"]:
+                continue
+            elif rec_level < self.filter_level:
+                continue
+
+            tab = self.tab_levels[rec_level]
+            if tab not in tab_records:
+                tab_records[tab] = []
+                tab_order.append(tab)
+            tab_records[tab].append(record)
+
+        for tab in tab_order:
+            new_records = tab_records[tab]
+            tab.add_log_lines(new_records)
 
-        if rec_level == logging.DEBUG and not self["showDebug"]:
-            return
-        else:
-            if rec_level < self.filter_level:
-                return
-
-        tab = self.tab_levels[rec_level]
-        tab.add_log_line(record)
-
-        if self["appearance"] == "tabs":
-            if self.tab_widget.currentWidget() != tab:
-                if self["autoSwitchTabs"]:
-                    self.tab_widget.setCurrentWidget(tab)
-                else:
-                    tab.unread_messages += 1
-                    tab_label = "%s (%d)" % (tab.tab_label, tab.unread_messages)
-                    self.tab_widget.setTabText(self.tab_widget.indexOf(tab), tab_label)
-        elif self["appearance"] == "list":
-            self.incUnreadMessagesSignal.emit(1, True)
+            if self["appearance"] == "tabs":
+                if self.tab_widget.currentWidget() != tab:
+                    if self["autoSwitchTabs"]:
+                        self.tab_widget.setCurrentWidget(tab)
+                    else:
+                        tab.unread_messages += len(new_records)
+                        tab_label = "%s (%d)" % (tab.tab_label, tab.unread_messages)
+                        self.tab_widget.setTabText(
+                            self.tab_widget.indexOf(tab), tab_label
+                        )
+            elif self["appearance"] == "list":
+                self.incUnreadMessagesSignal.emit(len(new_records), True)
 
     def resetUnreadMessages(self, tab_index):
         selected_tab = self.tab_widget.widget(tab_index)
@@ -394,7 +544,7 @@ class LogViewBrick(BaseWidget):
 
     def customEvent(self, event):
         if self.is_running():
-            self.append_log_record(event.record)
+            self.append_log_records(event.records)
 
     def blockSignals(self, block):
         pass
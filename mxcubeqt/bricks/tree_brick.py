@@ -21,10 +21,16 @@ import logging
 # from collections import namedtuple
 
 from mxcubeqt.base_components import BaseWidget
-from mxcubeqt.utils import queue_item, colors, qt_import
+from mxcubeqt.utils import queue_autosave, queue_item, colors, qt_import
+from mxcubeqt.utils.sample_filter import SampleFilter
+from mxcubeqt.utils.sample_filter_criteria import (
+    COMBO_FILTER_FIELDS,
+    parse_filter_text,
+)
 from mxcubeqt.utils.sample_changer_helper import SC_STATE_COLOR, SampleChanger
 from mxcubeqt.widgets.dc_tree_widget import DataCollectTree
 
+from mxcubecore.HardwareObjects import queue_entry
 from mxcubecore.HardwareObjects.queue_model_enumerables import CENTRING_METHOD
 
 from mxcubecore import HardwareRepository as HWR
@@ -34,6 +40,9 @@ __credits__ = ["MXCuBE collaboration"]
 __license__ = "LGPLv3+"
 __category__ = "General"
 
+# Filter text is applied once typing stopped for FILTER_TEXT_DELAY ms
+FILTER_TEXT_DELAY = 250
+
 
 class TreeBrick(BaseWidget):
 
@@ -85,6 +94,8 @@ class TreeBrick(BaseWidget):
         self.filtered_lims_samples = None
         self.compression_state = True
         self.queue_autosave_action = None
+        self.queue_autosave = queue_autosave.QueueAutosave(self.save_queue_to_redis)
+        self.queue_serializer = queue_autosave.QueueSerializer()
         self.queue_undo_action = None
         self.queue_redo_action = None
         self.queue_sync_action = None
@@ -160,6 +171,11 @@ class TreeBrick(BaseWidget):
         self.dc_tree_widget = DataCollectTree(self)
         self.dc_tree_widget.selection_changed_cb = self.selection_changed_cb
         self.dc_tree_widget.run_cb = self.run
+        self.sample_filter = SampleFilter(self.dc_tree_widget)
+        self.filter_timer = qt_import.QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(FILTER_TEXT_DELAY)
+        self.filter_timer.timeout.connect(self.apply_filter_text)
         # self.dc_tree_widget.clear_centred_positions_cb = \
         #    self.clear_centred_positions
 
@@ -362,6 +378,8 @@ class TreeBrick(BaseWidget):
         self.hide_workflow_tab.emit(True)
         self.hide_advanced_tab.emit(True)
 
+        self.dc_tree_widget.load_history_queue_from_file()
+
     def property_changed(self, property_name, old_value, new_value):
         if property_name == "useFilterWidget":
             self.sample_changer_widget.filter_label.setVisible(new_value)
@@ -736,7 +754,7 @@ class TreeBrick(BaseWidget):
         sample_model = root_model.get_children()[0]
 
         sample_model.init_from_lims_object(self.filtered_lims_samples[index])
-        self.dc_tree_widget.sample_tree_widget.clear()
+        self.dc_tree_widget.clear_tree()
         self.dc_tree_widget.populate_free_pin(sample_model)
 
     def get_sc_content(self):
@@ -1002,6 +1020,12 @@ class TreeBrick(BaseWidget):
             qt_import.QMessageBox.Ok,
         )
 
+    def bulk_enqueue(self):
+        """Returns a context manager that postpones tree updates and
+           queue autosave until all tasks have been added
+        """
+        return self.dc_tree_widget.bulk_update()
+
     def select_last_added_item(self):
         self.dc_tree_widget.select_last_added_item()
 
@@ -1021,6 +1045,8 @@ class TreeBrick(BaseWidget):
            11: XRF spectrum
         """
         self.sample_changer_widget.filter_ledit.setEnabled(filter_index in (2, 3, 4))
+        self.filter_timer.stop()
+        self.dc_tree_widget.sample_tree_widget.setUpdatesEnabled(False)
         self.clear_filter()
         if filter_index > 0:
             item_iterator = qt_import.QTreeWidgetItemIterator(
@@ -1067,41 +1093,30 @@ class TreeBrick(BaseWidget):
                 item = item_iterator.value()
 
         self.dc_tree_widget.hide_empty_baskets()
+        self.dc_tree_widget.sample_tree_widget.setUpdatesEnabled(True)
 
     def filter_text_changed(self, new_text):
-        item_iterator = qt_import.QTreeWidgetItemIterator(
-            self.dc_tree_widget.sample_tree_widget
-        )
-        item = item_iterator.value()
+        """Filter is applied when typing stops"""
+        self.filter_timer.start()
+
+    def apply_filter_text(self):
+        """Shows samples matching the filter text. Words of the filter
+           text filter on the field selected in the filter combo, words
+           like barcode:ABC or collected:yes add other criteria
+           (see sample_filter_criteria.parse_filter_text)
+        """
+        self.filter_timer.stop()
         filter_index = self.sample_changer_widget.filter_combo.currentIndex()
+        if filter_index not in COMBO_FILTER_FIELDS:
+            return
 
-        while item:
-            hide = False
-            new_text = str(new_text)
-            if filter_index == 2:
-                if isinstance(item, queue_item.SampleQueueItem):
-                    hide = not new_text in item.text(0)
-            elif filter_index == 3:
-                if isinstance(item, queue_item.SampleQueueItem):
-                    hide = not new_text in item.get_model().crystals[0].protein_acronym
-            elif filter_index == 4:
-                if isinstance(item, queue_item.BasketQueueItem):
-                    if new_text.isdigit():
-                        # Display one basket
-                        hide = int(new_text) != item.get_model().location[0]
-                    else:
-                        # Display several baskets. Separated with ","
-                        enable_baskat_list = new_text.split(",")
-                        if len(enable_baskat_list) > 1:
-                            hide = (
-                                item.get_model().location[0] not in enable_baskat_list
-                            )
-            item.set_hidden(hide)
-            item_iterator += 1
-            item = item_iterator.value()
-
-        if filter_index != 3:
-            self.dc_tree_widget.hide_empty_baskets()
+        criteria = parse_filter_text(
+            self.sample_changer_widget.filter_ledit.text(),
+            COMBO_FILTER_FIELDS[filter_index],
+        )
+        self.dc_tree_widget.set_items_hidden(
+            self.sample_filter.get_visibility(criteria)
+        )
 
     def clear_filter(self):
         item_iterator = qt_import.QTreeWidgetItemIterator(
@@ -1196,19 +1211,46 @@ class TreeBrick(BaseWidget):
     def save_queue(self):
         """Saves queue in the file"""
         if self.redis_client_hwobj is not None:
+            # Pending auto save is included
+            self.queue_autosave.cancel()
             self.redis_client_hwobj.save_queue()
         # else:
         #    self.dc_tree_widget.save_queue()
 
-    def auto_save_queue(self):
-        """Saves queue in the file"""
+    def save_queue_to_redis(self, changed_nodes=None):
+        """Called by the queue autosave. Encodes the task groups holding
+           changed_nodes (all if None) and writes the queue.
+           Returns the written queue payload.
+        """
+        if self.redis_client_hwobj is None or not self.redis_client_hwobj.active:
+            return None
+
+        sample_entries = [
+            entry
+            for entry in HWR.beamline.queue_manager.get_queue_entry_list()
+            if isinstance(entry, queue_entry.SampleQueueEntry)
+        ]
+        queue_list = self.queue_serializer.get_queue_list(
+            sample_entries, changed_nodes
+        )
+        return queue_autosave.write_queue(
+            self.redis_client_hwobj.redis_client,
+            (self.redis_client_hwobj.proposal_id, self.redis_client_hwobj.beamline_name),
+            self.dc_tree_widget.queue_model_name or "",
+            queue_list,
+        )
+
+    def auto_save_queue(self, node=None):
+        """Marks the queue (or node) as changed. Changes are saved
+           together after queue_autosave.AUTOSAVE_DELAY
+        """
         if self.queue_autosave_action is not None:
             if (
                 self.queue_autosave_action.isChecked()
                 and self.dc_tree_widget.samples_initialized
             ):
                 if self.redis_client_hwobj is not None:
-                    self.redis_client_hwobj.save_queue()
+                    self.queue_autosave.mark_dirty(node)
                 # else:
                 #    self.dc_tree_widget.save_queue()
 
@@ -1220,7 +1262,7 @@ class TreeBrick(BaseWidget):
             loaded_model = self.redis_client_hwobj.load_queue()
 
             if loaded_model is not None:
-                self.dc_tree_widget.sample_tree_widget.clear()
+                self.dc_tree_widget.clear_tree()
                 model_map = {"free-pin": 0, "ispyb": 1, "plate": 2}
                 self.sample_changer_widget.filter_cbox.setCurrentIndex(
                     model_map[loaded_model]
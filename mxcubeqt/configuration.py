@@ -21,9 +21,11 @@
 """
 
 import imp
+import time
 import logging
 import pprint
 import pickle
+import collections
 
 import json
 
@@ -35,34 +37,123 @@ except ImportError:
 
 from mxcubeqt import base_layout_items
 from mxcubeqt.utils.property_bag import PropertyBag
-from mxcubeqt.base_components import NullBrick
+from mxcubeqt.base_components import BaseWidget, DeferredBrick, NullBrick
 
 
 __credits__ = ["MXCuBE collaboration"]
 __license__ = "LGPLv3+"
 
 
-def load_module(brick_name):
-    """Loads module"""
+# Key - brick type, value - (path name, description) returned by find_module
+MODULE_LOCATIONS = {}
+# Key - brick type, value - imported module
+LOADED_MODULES = {}
+
+
+class PhaseTimer(object):
+    """Accumulates time spent in named phases and reports it"""
+
+    def __init__(self):
+        self.phases = collections.OrderedDict()
+        self._current = {}
+
+    def start(self, phase_name):
+        self._current[phase_name] = time.time()
+
+    def stop(self, phase_name):
+        start_time = self._current.pop(phase_name, None)
+        if start_time is not None:
+            self.add(phase_name, time.time() - start_time)
+
+    def add(self, phase_name, duration):
+        self.phases[phase_name] = self.phases.get(phase_name, 0) + duration
+
+    def clear(self):
+        self.phases.clear()
+        self._current.clear()
+
+    def report(self, logger_name="HWR"):
+        logger = logging.getLogger(logger_name)
+        logger.info("Startup timing:")
+        for phase_name, duration in self.phases.items():
+            logger.info("    - %-28s %7.3f s" % (phase_name, duration))
+        logger.info("    - %-28s %7.3f s" % ("total", sum(self.phases.values())))
+
+
+STARTUP_TIMER = PhaseTimer()
+
+
+def find_module_location(brick_type):
+    """Returns cached (path name, description) of a brick module"""
+    try:
+        return MODULE_LOCATIONS[brick_type]
+    except KeyError:
+        fp, path_name, description = imp.find_module(brick_type)
+        if fp:
+            fp.close()
+        MODULE_LOCATIONS[brick_type] = (path_name, description)
+        return MODULE_LOCATIONS[brick_type]
+
+
+def load_module(brick_name, reload=False):
+    """Loads module. The module is executed only once unless reload
+       is True: bricks of the same type share it.
+    """
+    if not reload and brick_name in LOADED_MODULES:
+        return LOADED_MODULES[brick_name]
+
     fp = None
     try:
-        fp, path_name, description = imp.find_module(brick_name)
+        if reload:
+            MODULE_LOCATIONS.pop(brick_name, None)
+        path_name, description = find_module_location(brick_name)
+        if description[2] in (imp.PY_SOURCE, imp.PY_COMPILED):
+            fp = open(path_name, description[1])
         mod = imp.load_module(brick_name, fp, path_name, description)
     except BaseException:
-        if fp:
-            fp.close()
         logging.getLogger().exception("Cannot import module %s", brick_name)
         return None
     else:
+        LOADED_MODULES[brick_name] = mod
         return mod
+    finally:
+        if fp:
+            fp.close()
+
+
+def load_modules(brick_types):
+    """Imports brick modules before the bricks are built.
+       Module code is executed in the GUI thread, as brick modules create
+       Qt objects (icons, pixmaps) at import time.
+    """
+    STARTUP_TIMER.start("import brick modules")
+    for brick_type in collections.OrderedDict.fromkeys(brick_types):
+        load_module(brick_type)
+    STARTUP_TIMER.stop("import brick modules")
 
 
-def load_brick(brick_type, brick_name):
+def get_brick_class_name(brick_type):
+    """Returns class name of a brick type: sample_view_brick - SampleViewBrick"""
+    temp = brick_type.split('_')
+    return temp[0].title() + ''.join(ele.title() for ele in temp[1:])
+
+
+def can_defer_brick(brick_type):
+    """Returns True if a brick of an imported module can be built when it
+       is first shown
+    """
+    class_obj = getattr(
+        LOADED_MODULES.get(brick_type), get_brick_class_name(brick_type), None
+    )
+    return isinstance(class_obj, type) and issubclass(class_obj, BaseWidget) and \
+        class_obj.defer_construction
+
+
+def load_brick(brick_type, brick_name, reload=False):
     """Loads brick"""
- 
-    module = load_module(brick_type)
-    temp = brick_type.split('_') 
-    brick_class_name = temp[0].title() + ''.join(ele.title() for ele in temp[1:])
+
+    module = load_module(brick_type, reload)
+    brick_class_name = get_brick_class_name(brick_type)
 
     if module is not None:
         try:
@@ -112,9 +203,15 @@ class Configuration:
         "vsplitter": base_layout_items.SplitterCfg,
     }
 
-    def __init__(self, config=None):
-        """__init__ method"""
+    def __init__(self, config=None, defer_hidden_bricks=False):
+        """__init__ method
+
+        :param defer_hidden_bricks: build bricks of hidden tab pages when
+                                    they are first shown (execution mode)
+        :type defer_hidden_bricks: bool
+        """
         self.has_changed = False
+        self.defer_hidden_bricks = defer_hidden_bricks
 
         if config is None:
             self.windows_list = []
@@ -563,14 +660,33 @@ class Configuration:
         self.has_changed = False
         self.windows_list = config
 
-        def load_children(children):
-            """Loads children"""
+        def get_brick_types(children):
+            """Returns brick types of the configuration tree"""
+            brick_types = []
+            for child in children:
+                if "brick" in child:
+                    brick_types.append(child["type"])
+                brick_types.extend(get_brick_types(child["children"]))
+            return brick_types
+
+        def load_children(children, hidden=False, tab_pages=False):
+            """Loads children. Pages of a tab other than the first one
+               are hidden when the gui is shown.
+            """
             index = 0
             for child in children:
                 new_item = None
+                child_hidden = hidden or (tab_pages and index > 0)
 
                 if "brick" in child:
-                    brick = load_brick(child["type"], child["name"])
+                    if (
+                        child_hidden
+                        and self.defer_hidden_bricks
+                        and can_defer_brick(child["type"])
+                    ):
+                        brick = DeferredBrick(child["name"], self.build_deferred_brick)
+                    else:
+                        brick = load_brick(child["type"], child["name"])
                     child["brick"] = brick
 
                     new_item = base_layout_items.BrickCfg(child["name"], child["type"])
@@ -615,10 +731,26 @@ class Configuration:
                     #    new_item.signals = new_item_signals
                     #    children[index] = new_item
                     children[index] = new_item
-                    load_children(child["children"])
+                    load_children(
+                        child["children"], child_hidden, child["type"] == "tab"
+                    )
                 index += 1
 
+        load_modules(get_brick_types(self.windows_list))
+
+        STARTUP_TIMER.start("build bricks")
         load_children(self.windows_list)
+        STARTUP_TIMER.stop("build bricks")
+
+    def build_deferred_brick(self, brick_name):
+        """Builds a brick that was deferred by load and applies its
+           properties. Called by the DeferredBrick placeholder.
+        """
+        brick_cfg = self.bricks[brick_name]
+        brick = load_brick(brick_cfg["type"], brick_name)
+        brick_cfg["brick"] = brick
+        brick_cfg.set_properties(brick_cfg["properties"])
+        return brick
 
     def is_container(self, item):
         """
@@ -656,7 +788,7 @@ class Configuration:
         parent, index = self.find_parent(brick_name, self.windows_list)
 
         if parent is not None:
-            brick = load_brick(brick_type, brick_name)
+            brick = load_brick(brick_type, brick_name, reload=True)
 
             old_brick_cfg = parent["children"][index]
             new_brick_cfg = base_layout_items.BrickCfg(brick_name, brick_type, brick)
@@ -24,7 +24,6 @@ import stat
 import json
 import pickle
 import logging
-import collections
 
 try:
     import ruamel.yaml as yaml
@@ -33,7 +32,12 @@ except ImportError:
 
 from mxcubeqt import configuration, gui_builder
 from mxcubeqt.utils import gui_display, icons, colors, qt_import
-from mxcubeqt.base_components import BaseWidget, NullBrick
+from mxcubeqt.base_components import (
+    BaseWidget,
+    DeferredBrick,
+    NullBrick,
+    WIDGET_REGISTRY,
+)
 
 from mxcubecore import HardwareRepository as HWR
 
@@ -174,6 +178,7 @@ class GUISupervisor(qt_import.QWidget):
         """Loads gui"""
         self.configuration = configuration.Configuration()
         self.gui_config_file = gui_config_file
+        configuration.STARTUP_TIMER.clear()
 
         if self.gui_config_file:
             load_from_dict = gui_config_file.endswith(".json") or gui_config_file.endswith(
@@ -255,6 +260,7 @@ class GUISupervisor(qt_import.QWidget):
                     failed_msg += "Starting in designer mode with clean GUI."
 
                     raw_config = None
+                    configuration.STARTUP_TIMER.start("read configuration")
                     try:
                         if gui_config_file.endswith(".json"):
                             raw_config = json.load(gui_file)
@@ -264,17 +270,23 @@ class GUISupervisor(qt_import.QWidget):
                             raw_config = eval(gui_file.read())
                     except BaseException:
                         logging.getLogger().exception(failed_msg)
+                    configuration.STARTUP_TIMER.stop("read configuration")
 
                     self.splash_screen.set_message("Gathering H/O info...")
                     self.splash_screen.set_progress_value(10)
+                    configuration.STARTUP_TIMER.start("require hardware objects")
                     mnemonics = __get_mnemonics(raw_config)
                     self.hardware_repository.require(mnemonics)
+                    configuration.STARTUP_TIMER.stop("require hardware objects")
                     gui_file.close()
 
                     try:
                         self.splash_screen.set_message("Building GUI configuration...")
                         self.splash_screen.set_progress_value(20)
-                        config = configuration.Configuration(raw_config)
+                        config = configuration.Configuration(
+                            raw_config,
+                            defer_hidden_bricks=not self.launch_in_design_mode
+                        )
                     except BaseException:
                         logging.getLogger("GUI").exception(failed_msg)
                         qt_import.QMessageBox.warning(
@@ -370,13 +382,16 @@ class GUISupervisor(qt_import.QWidget):
         """Start in execution mode"""
         self.splash_screen.set_message("Executing configuration...")
         self.splash_screen.set_progress_value(90)
+        configuration.STARTUP_TIMER.start("display windows")
         self.display()
+        configuration.STARTUP_TIMER.stop("display windows")
 
         main_window = None
 
         if len(self.windows) > 0:
             main_window = self.windows[0]
             main_window.configuration = config
+            WIDGET_REGISTRY.set_main_window(main_window)
             qt_import.QApplication.setActiveWindow(main_window)
             if self.no_border:
                 main_window.move(0, 0)
@@ -385,24 +400,19 @@ class GUISupervisor(qt_import.QWidget):
                 main_window.resize(qt_import.QSize(width, height))
 
             # make connections
-            widgets_dict = dict(
-                [
-                    (
-                        isinstance(w.objectName, collections.Callable)
-                        and str(w.objectName())
-                        or None,
-                        w,
-                    )
-                    for w in qt_import.QApplication.allWidgets()
-                ]
-            )
+            def get_widget(name):
+                """Returns registered widget, raises KeyError if not found"""
+                widget = WIDGET_REGISTRY.get_widget_by_name(name)
+                if widget is None:
+                    raise KeyError(name)
+                return widget
 
             def make_connections(items_list):
                 """Creates connections"""
 
                 for item in items_list:
                     try:
-                        sender = widgets_dict[item["name"]]
+                        sender = get_widget(item["name"])
                     except KeyError:
                         logging.getLogger().error(
                             "Could not find receiver widget %s" % item["name"]
@@ -413,14 +423,17 @@ class GUISupervisor(qt_import.QWidget):
                                 connection["receiver"] or connection["receiverWindow"]
                             )
                             try:
-                                receiver = widgets_dict[_receiver]
+                                receiver = get_widget(_receiver)
                             except KeyError:
                                 logging.getLogger().error(
                                     "Could not find " + "receiver widget %s", _receiver
                                 )
                             else:
                                 try:
-                                    slot = getattr(receiver, connection["slot"])
+                                    if isinstance(receiver, DeferredBrick):
+                                        slot = receiver.get_slot(connection["slot"])
+                                    else:
+                                        slot = getattr(receiver, connection["slot"])
                                     # etattr(sender, connection["signal"]).connect(slot)
                                 except AttributeError:
                                     logging.getLogger().error(
@@ -428,7 +441,9 @@ class GUISupervisor(qt_import.QWidget):
                                         + "in receiver %s" % _receiver
                                     )
                                 else:
-                                    if not isinstance(sender, NullBrick):
+                                    if isinstance(sender, DeferredBrick):
+                                        sender.connect_signal(connection["signal"], slot)
+                                    elif not isinstance(sender, NullBrick):
                                         getattr(sender, connection["signal"]).connect(slot)
                                     # sender.connect(sender,
                                     #    QtCore.SIGNAL(connection["signal"]),
@@ -437,12 +452,16 @@ class GUISupervisor(qt_import.QWidget):
 
             self.splash_screen.set_progress_value(95)
             self.splash_screen.set_message("Connecting bricks...")
+            configuration.STARTUP_TIMER.start("connect bricks")
             make_connections(config.windows_list)
+            configuration.STARTUP_TIMER.stop("connect bricks")
 
             # set run mode for every brick
             self.splash_screen.set_progress_value(100)
             self.splash_screen.set_message("Setting run mode...")
+            configuration.STARTUP_TIMER.start("set run mode")
             BaseWidget.set_run_mode(True)
+            configuration.STARTUP_TIMER.stop("set run mode")
 
             if self.show_maximized:
                 main_window.showMaximized()
@@ -456,7 +475,10 @@ class GUISupervisor(qt_import.QWidget):
         if BaseWidget._menubar:
             BaseWidget._menubar.set_exp_mode(False)
 
+        configuration.STARTUP_TIMER.start("emit hardware signals")
         HWR.beamline.force_emit_signals()
+        configuration.STARTUP_TIMER.stop("emit hardware signals")
+        configuration.STARTUP_TIMER.report()
 
         return main_window
 
@@ -77,6 +77,9 @@ def set_widget_color(widget, color, color_role=None):
     if color_role is None:
         color_role = QPalette.Window
     widget_palette = widget.palette()
+    if widget.autoFillBackground() and widget_palette.color(color_role) == color:
+        # Setting the same palette again forces a repolish of the widget
+        return
     widget_palette.setColor(color_role, color)
     widget.setAutoFillBackground(True)
     widget.setPalette(widget_palette)
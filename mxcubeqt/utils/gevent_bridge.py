@@ -0,0 +1,189 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Integration of the gevent hub with the Qt event loop.
+
+Qt owns the main loop. The gevent loop is only run when it has something
+to do:
+
+ - the backend file descriptor of the gevent loop (epoll/kqueue) is watched
+   by a QSocketNotifier, so socket activity and cross-thread async watchers
+   of gevent wake up Qt immediately,
+ - greenlets spawned and callbacks scheduled from Qt slots are run when the
+   Qt event dispatcher is about to block,
+ - a Qt timer runs gevent timers, which are not backed by a file
+   descriptor (gevent.sleep, spawn_later, timeouts...). Gevent does not
+   tell when its next timer expires, so the timer ticks every
+   TIMER_INTERVAL while the gevent loop has active watchers (timers,
+   waiting sockets) and every FALLBACK_INTERVAL otherwise.
+
+Gevent is always run with a zero timeout, so Qt input is never blocked.
+If the gevent loop does not expose its backend descriptor or its pending
+callbacks, the legacy 0 ms polling timer is used.
+"""
+
+import logging
+
+import gevent
+
+from mxcubeqt.utils import qt_import
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+# Interval (ms) used to run gevent timers while gevent has active watchers
+TIMER_INTERVAL = 10
+# Interval (ms) used otherwise, for watchers not counted as active
+FALLBACK_INTERVAL = 50
+
+(MODE_NOTIFIER, MODE_TIMER) = ("notifier", "timer")
+
+
+def get_hub_fileno():
+    """Returns the backend file descriptor of the gevent loop or None"""
+    loop = gevent.get_hub().loop
+    try:
+        fileno = loop.fileno()
+    except (AttributeError, NotImplementedError):
+        return None
+    if fileno is None or fileno < 0:
+        return None
+    return fileno
+
+
+def can_get_pending_callbacks():
+    """Returns True if the gevent loop tells if callbacks are pending"""
+    return hasattr(gevent.get_hub().loop, "_callbacks")
+
+
+def has_pending_callbacks():
+    """Returns True if callbacks (spawned greenlets...) wait for the gevent
+       loop. gevent does not have a public call for it, both the libev and
+       the libuv loops keep them in _callbacks
+    """
+    return len(gevent.get_hub().loop._callbacks) > 0
+
+
+def has_active_watchers():
+    """Returns True if the gevent loop has active watchers (timers,
+       callbacks, waiting sockets...)
+    """
+    return gevent.get_hub().loop.activecnt > 0
+
+
+def do_gevent(timeout=0.01):
+    """Can't call gevent.run inside inner event loops (message boxes...)"""
+
+    if qt_import.QEventLoop():
+        try:
+            gevent.wait(timeout=timeout)
+        except AssertionError:
+            pass
+    else:
+        # all that I tried with gevent here fails! => seg fault
+        pass
+
+
+class GeventBridge(qt_import.QObject):
+    """Lets the gevent hub and the Qt event loop wake each other"""
+
+    def __init__(
+        self,
+        parent=None,
+        timer_interval=TIMER_INTERVAL,
+        fallback_interval=FALLBACK_INTERVAL,
+    ):
+        qt_import.QObject.__init__(self, parent)
+
+        self.mode = None
+        self.timer_interval = timer_interval
+        self.fallback_interval = fallback_interval
+        self.run_count = 0
+
+        self._notifier = None
+        self._dispatcher = None
+
+        self._timer = qt_import.QTimer(self)
+
+    def start(self, force_timer=False):
+        """Starts the bridge. If force_timer is True or the gevent loop
+           does not expose its backend descriptor or pending callbacks the
+           legacy polling timer is used.
+        """
+        hub_fileno = None
+        if not force_timer and can_get_pending_callbacks():
+            hub_fileno = get_hub_fileno()
+
+        if hub_fileno is None:
+            if not force_timer:
+                logging.getLogger("HWR").debug(
+                    "gevent loop can not be watched, polling it from Qt"
+                )
+            self.mode = MODE_TIMER
+            self._timer.timeout.connect(do_gevent)
+            self._timer.start(0)
+            return
+
+        self.mode = MODE_NOTIFIER
+
+        self._notifier = qt_import.QSocketNotifier(
+            hub_fileno, qt_import.QSocketNotifier.Read, self
+        )
+        self._notifier.activated.connect(self.run_gevent)
+
+        self._dispatcher = qt_import.QAbstractEventDispatcher.instance()
+        self._dispatcher.aboutToBlock.connect(self.run_pending_callbacks)
+
+        self._timer.timeout.connect(self.run_gevent)
+        self._timer.start(self.fallback_interval)
+
+    def stop(self):
+        """Stops the bridge"""
+        self._timer.stop()
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier = None
+        if self._dispatcher is not None:
+            self._dispatcher.aboutToBlock.disconnect(self.run_pending_callbacks)
+            self._dispatcher = None
+        self.mode = None
+
+    def run_gevent(self):
+        """Runs ready greenlets without blocking Qt"""
+        self.run_count += 1
+        # The loop time is only updated when gevent runs. Timers expired
+        # since then would wait for the next run otherwise
+        gevent.get_hub().loop.update_now()
+        do_gevent(timeout=0)
+
+    def run_pending_callbacks(self):
+        """Runs gevent before Qt waits for events, if greenlets were
+           spawned or callbacks scheduled since gevent last ran. Then sets
+           the timer interval for the gevent timers
+        """
+        if has_pending_callbacks():
+            self.run_gevent()
+        if has_active_watchers():
+            interval = self.timer_interval
+        else:
+            interval = self.fallback_interval
+        if self._timer.interval() != interval:
+            self._timer.start(interval)
@@ -28,7 +28,7 @@ import collections
 from functools import partial
 
 from mxcubeqt.utils import icons, colors, property_editor, qt_import
-from mxcubeqt.base_components import BaseWidget
+from mxcubeqt.base_components import BaseWidget, WIDGET_REGISTRY
 from mxcubeqt.base_layout_items import BrickCfg, SpacerCfg, WindowCfg, ContainerCfg, TabCfg
 
 from mxcubecore import HardwareRepository as HWR
@@ -395,6 +395,7 @@ class CustomGroupBox(qt_import.QGroupBox):
     def __init__(self, *args, **kwargs):
         qt_import.QGroupBox.__init__(self, args[0])
         self.setObjectName(args[1])
+        WIDGET_REGISTRY.register(self)
         self.setSizePolicy(
             qt_import.QSizePolicy.Expanding, qt_import.QSizePolicy.Expanding
         )
@@ -420,6 +421,7 @@ class Spacer(qt_import.QFrame):
         """init"""
         qt_import.QFrame.__init__(self, args[0])
         self.setObjectName(args[1])
+        WIDGET_REGISTRY.register(self)
 
         self.orientation = kwargs.get("orientation", "horizontal")
         self.execution_mode = kwargs.get("execution_mode", False)
@@ -496,6 +498,7 @@ class CustomFrame(qt_import.QFrame):
         qt_import.QFrame.__init__(self, args[0])
 
         self.setObjectName(args[1])
+        WIDGET_REGISTRY.register(self)
         self.pinned = True
         self.dialog = None
         self.origin_parent = self.parent()
@@ -554,6 +557,7 @@ class CustomSplitter(qt_import.QSplitter):
         qt_import.QFrame.__init__(self, args[0])
 
         self.setObjectName(args[1])
+        WIDGET_REGISTRY.register(self)
         self.origin_parent = self.parent()
         execution_mode = kwargs.get("execution_mode", False)
 
@@ -578,6 +582,7 @@ class CustomTabWidget(qt_import.QTabWidget):
 
         qt_import.QTabWidget.__init__(self, args[0])
         self.setObjectName(args[1])
+        WIDGET_REGISTRY.register(self)
         self.open_in_dialog_button = None
         self.close_tab_button = None
         self.pinned = True
@@ -1349,10 +1354,10 @@ class WindowDisplayWidget(qt_import.QScrollArea):
         parent = self.central_widget
 
         self.setObjectName(container_cfg["name"])
+        WIDGET_REGISTRY.register(self)
         self.preview_items.append(self)
 
         if isinstance(container_cfg, WindowCfg):
-            self.setObjectName(container_cfg["name"])
             if container_cfg.properties["menubar"]:
                 self.set_menu_bar(
                     container_cfg.properties["menudata"],
@@ -19,6 +19,7 @@
 
 import logging
 import time
+import collections
 import weakref
 import gevent
 
@@ -31,34 +32,65 @@ __license__ = "LGPLv3+"
 GUI_LOG_HANDLER = None
 TIMER = None
 
+# Maximum number of records kept while waiting to be delivered to viewers
+BUFFER_CAPACITY = 5000
+# Number of records delivered per drain cycle when the buffer is quiet
+MIN_BATCH_SIZE = 50
+# Upper limit of records delivered per drain cycle during log storms
+MAX_BATCH_SIZE = 1000
+# Drain period (s) when the buffer is quiet and during log storms
+MAX_SLEEP_TIME = 0.2
+MIN_SLEEP_TIME = 0.02
+
 
 class LogEvent(qt_import.QEvent):
+    """Delivers a batch of log records to a viewer"""
 
-    def __init__(self, record):
+    def __init__(self, records):
 
         qt_import.QEvent.__init__(self, qt_import.QEvent.User)
-        self.record = record
+        self.records = records
 
-def process_log_messages():
-    i = 0
-    while i < 10:
-        if len(GUI_LOG_HANDLER.buffer) <= i:
-            break
+    @property
+    def record(self):
+        """Last record of the batch, kept for single record viewers"""
+        return self.records[-1]
 
-        record = GUI_LOG_HANDLER.buffer[i]
 
-        for viewer in GUI_LOG_HANDLER.registeredViewers:
-            qt_import.QApplication.postEvent(viewer, LogEvent(record))
+def get_batch_size(backlog):
+    """Returns the number of records to deliver in one drain cycle.
+       The batch grows with the backlog so that a full buffer is emptied
+       in a few cycles.
+    """
+    return max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, backlog // 4))
 
-        i += 1
 
-    del GUI_LOG_HANDLER.buffer[0:i]
+def get_sleep_time(backlog):
+    """Returns the time to wait before the next drain cycle"""
+    if backlog > MIN_BATCH_SIZE:
+        return MIN_SLEEP_TIME
+    return MAX_SLEEP_TIME
+
+
+def process_log_messages():
+    """Moves a batch of records from the buffer to the registered viewers.
+       Each viewer receives one event per call.
+       Returns the number of records left in the buffer.
+    """
+    batch_size = get_batch_size(len(GUI_LOG_HANDLER.buffer))
+    records = GUI_LOG_HANDLER.pop_records(batch_size)
 
+    if records:
+        for viewer in list(GUI_LOG_HANDLER.registeredViewers.keys()):
+            qt_import.QApplication.postEvent(viewer, LogEvent(records))
 
-def do_process_log_messages(sleep_time):
+    return len(GUI_LOG_HANDLER.buffer)
+
+
+def do_process_log_messages(sleep_time=MAX_SLEEP_TIME):
     while True:
-        process_log_messages()
-        time.sleep(sleep_time)
+        backlog = process_log_messages()
+        time.sleep(min(sleep_time, get_sleep_time(backlog)))
 
 
 def GUILogHandler():
@@ -69,7 +101,7 @@ def GUILogHandler():
     if GUI_LOG_HANDLER is None:
         GUI_LOG_HANDLER = __GUILogHandler()
 
-        TIMER = gevent.spawn(do_process_log_messages, 0.2)
+        TIMER = gevent.spawn(do_process_log_messages, MAX_SLEEP_TIME)
         # _timer = qt_import.QtCore.QTimer()
         # QtCore.QObject.connect(_timer, QtCore.SIGNAL("timeout()"), processLogMessages)
         # _timer.start(10)
@@ -106,18 +138,68 @@ class LogRecord:
 
 
 class __GUILogHandler(logging.Handler):
+    """Keeps log records in a fixed size ring buffer until they are
+       delivered to the viewers. When the buffer is full the oldest records
+       are dropped and counted.
+    """
 
-
-    def __init__(self):
+    def __init__(self, capacity=BUFFER_CAPACITY):
         logging.Handler.__init__(self)
 
-        self.buffer = []
+        self.buffer = collections.deque(maxlen=capacity)
         self.registeredViewers = weakref.WeakKeyDictionary()
 
+        # Total number of records dropped because the buffer was full
+        self.dropped_count = 0
+        # Number of times the buffer overflowed
+        self.overflow_count = 0
+        # Records dropped since the last drain, reported to the viewers
+        self._pending_dropped = 0
+
     def register(self, viewer):
         self.registeredViewers[viewer] = ""
         for rec in self.buffer:
             viewer.append_log_record(rec)
 
     def emit(self, record):
+        if len(self.buffer) == self.buffer.maxlen:
+            if self._pending_dropped == 0:
+                self.overflow_count += 1
+            self._pending_dropped += 1
+            self.dropped_count += 1
         self.buffer.append(LogRecord(record))
+
+    def pop_records(self, max_records):
+        """Removes and returns up to max_records oldest records.
+           If records have been dropped since the last call a warning
+           record is added at the beginning of the batch.
+        """
+        records = []
+        if self._pending_dropped:
+            records.append(self._get_dropped_record(self._pending_dropped))
+            self._pending_dropped = 0
+
+        for i in range(min(max_records, len(self.buffer))):
+            records.append(self.buffer.popleft())
+        return records
+
+    def get_statistics(self):
+        """Returns buffer usage and drop counters"""
+        return {
+            "capacity": self.buffer.maxlen,
+            "size": len(self.buffer),
+            "dropped": self.dropped_count,
+            "overflows": self.overflow_count,
+        }
+
+    def _get_dropped_record(self, dropped):
+        record = logging.LogRecord(
+            "GUI",
+            logging.WARNING,
+            __file__,
+            0,
+            "Log buffer overflow: %d message(s) dropped",
+            (dropped,),
+            None,
+        )
+        return LogRecord(record)
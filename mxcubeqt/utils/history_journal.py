@@ -0,0 +1,139 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Append-only journal of executed queue entries"""
+
+import io
+import os
+import json
+import logging
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+FORMAT_NAME = "mxcubeqt-history"
+FORMAT_VERSION = 1
+# sample name, date, time, entry type, status, details
+ENTRY_LENGTH = 6
+
+
+class HistoryJournal(object):
+    """Collection history stored as one JSON list per line.
+
+       Entries are only appended, so adding an entry does not rewrite the
+       file. When the journal is opened the file is scanned once and the
+       byte offsets of entries are indexed by date, so entries of a day
+       can be read when needed without keeping the whole history in memory.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        # Key - date, value - list of line offsets, in the order written
+        self.day_index = {}
+        self.entry_count = 0
+        self._file = None
+        self._ends_with_new_line = True
+        self._open()
+
+    def _open(self):
+        new_file = not os.path.exists(self.filename) or \
+            os.path.getsize(self.filename) == 0
+        if not new_file:
+            self._build_index()
+        self._file = io.open(self.filename, "ab")
+        if not new_file and not self._ends_with_new_line:
+            self._file.write(b"\n")
+        if new_file:
+            self._write_line(
+                {"format": FORMAT_NAME, "version": FORMAT_VERSION}
+            )
+
+    def _build_index(self):
+        with io.open(self.filename, "rb") as journal_file:
+            header_line = journal_file.readline()
+            try:
+                header = json.loads(header_line.decode("utf-8"))
+            except ValueError:
+                header = None
+            if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+                raise ValueError("%s is not a history journal" % self.filename)
+
+            offset = journal_file.tell()
+            line = header_line
+            for line in journal_file:
+                entry = self._decode(line)
+                if entry is not None:
+                    self.day_index.setdefault(entry[1], []).append(offset)
+                    self.entry_count += 1
+                offset += len(line)
+            self._ends_with_new_line = line.endswith(b"\n")
+
+    def _decode(self, line):
+        try:
+            entry = json.loads(line.decode("utf-8"))
+        except ValueError:
+            # Line partially written when the application stopped
+            logging.getLogger("HWR").warning(
+                "Skipping invalid line in history journal %s" % self.filename
+            )
+            return None
+        if isinstance(entry, list) and len(entry) == ENTRY_LENGTH:
+            return entry
+
+    def _write_line(self, document):
+        line = json.dumps(document, separators=(",", ":")) + "\n"
+        self._file.write(line.encode("utf-8"))
+        self._file.flush()
+
+    def append(self, entry):
+        """Appends one entry: sample name, date, time, type, status, details"""
+        entry = [str(value) for value in entry]
+        if len(entry) != ENTRY_LENGTH:
+            raise ValueError("History entry needs %d values" % ENTRY_LENGTH)
+        offset = self._file.tell()
+        self._write_line(entry)
+        self.day_index.setdefault(entry[1], []).append(offset)
+        self.entry_count += 1
+
+    def get_dates(self):
+        """Returns dates with entries, oldest first"""
+        return sorted(self.day_index.keys())
+
+    def read_day(self, date):
+        """Returns entries of a day in the order they were written"""
+        entries = []
+        offsets = self.day_index.get(date, ())
+        if not offsets:
+            return entries
+        self._file.flush()
+        with io.open(self.filename, "rb") as journal_file:
+            for offset in offsets:
+                journal_file.seek(offset)
+                entry = self._decode(journal_file.readline())
+                if entry is not None:
+                    entries.append(tuple(entry))
+        return entries
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -18,38 +18,133 @@
 #  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
-from mxcubeqt.utils.qt_import import QPixmap, QIcon
+from mxcubeqt.utils.qt_import import QPixmap, QIcon, QSize, Qt
 
 
 ROOT_DIR_PARTS = os.path.dirname(os.path.abspath(__file__)).split(os.sep)
 ROOT_DIR = os.path.join(*ROOT_DIR_PARTS[1:-2])
 ICONS_DIR = os.path.join("/", ROOT_DIR, "mxcubeqt/icons")
 
+ICON_EXTENSIONS = ("png", "xpm", "gif", "bmp")
 
-def load(icon_name):
+# Key - icon name with and without extension, value - icon path.
+# Built once from ICONS_DIR
+PATH_INDEX = None
+# Key - (icon name, size), value - QPixmap or QIcon
+PIXMAP_CACHE = {}
+ICON_CACHE = {}
+CACHE_STATISTICS = {"hits": 0, "misses": 0}
+
+
+def build_path_index(icons_dir=None):
     """
-    Try to load an icon from file and return the QPixmap object
+    Lists the icon directory once and indexes icons by file name and by
+    name without extension
     """
+    global PATH_INDEX
+
+    if icons_dir is None:
+        icons_dir = ICONS_DIR
+
+    PATH_INDEX = {}
+    try:
+        filenames = sorted(os.listdir(icons_dir))
+    except OSError:
+        return PATH_INDEX
+
+    for filename in filenames:
+        PATH_INDEX[filename] = os.path.join(icons_dir, filename)
+
+    # Extensions are looked for in ICON_EXTENSIONS order
+    for ext in reversed(ICON_EXTENSIONS):
+        for filename in filenames:
+            name, file_ext = os.path.splitext(filename)
+            if file_ext == "." + ext and name not in filenames:
+                PATH_INDEX[name] = os.path.join(icons_dir, filename)
+    return PATH_INDEX
+
+
+def clear_cache():
+    """Clears cached pixmaps and icons and the path index"""
+    global PATH_INDEX
+
+    PATH_INDEX = None
+    PIXMAP_CACHE.clear()
+    ICON_CACHE.clear()
+    CACHE_STATISTICS["hits"] = 0
+    CACHE_STATISTICS["misses"] = 0
+
+
+def get_cache_statistics():
+    """Returns a copy of hit/miss counters and the number of cached items"""
+    statistics = dict(CACHE_STATISTICS)
+    statistics["pixmaps"] = len(PIXMAP_CACHE)
+    statistics["icons"] = len(ICON_CACHE)
+    return statistics
+
+
+def _get_size_key(size):
+    if size is None:
+        return None
+    if isinstance(size, QSize):
+        return (size.width(), size.height())
+    if isinstance(size, int):
+        return (size, size)
+    return tuple(size)
+
+
+def _read_pixmap(icon_name, size_key):
     filename = get_icon_path(icon_name)
 
     try:
-        icon = QPixmap(filename)
+        pixmap = QPixmap(filename)
     except BaseException:
-        return QPixmap(os.path.join(ICONS_DIR, "brick.png"))
+        pixmap = QPixmap(os.path.join(ICONS_DIR, "brick.png"))
+    else:
+        if pixmap.isNull():
+            pixmap = QPixmap(os.path.join(ICONS_DIR, "brick.png"))
+
+    if size_key is not None and not pixmap.isNull():
+        pixmap = pixmap.scaled(
+            size_key[0], size_key[1], Qt.KeepAspectRatio, Qt.SmoothTransformation
+        )
+    return pixmap
+
+
+def load(icon_name, size=None):
+    """
+    Try to load an icon from file and return the QPixmap object.
+    Pixmaps are read once and cached by name and size; a shallow copy
+    of the cached pixmap is returned, Qt detaches it if it is modified.
+    """
+    key = (icon_name, _get_size_key(size))
+    try:
+        pixmap = PIXMAP_CACHE[key]
+    except KeyError:
+        CACHE_STATISTICS["misses"] += 1
+        pixmap = _read_pixmap(icon_name, key[1])
+        PIXMAP_CACHE[key] = pixmap
     else:
-        if icon.isNull():
-            return QPixmap(os.path.join(ICONS_DIR, "brick.png"))
-        else:
-            return icon
+        CACHE_STATISTICS["hits"] += 1
+    return QPixmap(pixmap)
 
 
 def get_icon_path(icon_name):
     """
     Return path to an icon
     """
+    if PATH_INDEX is None:
+        build_path_index()
+
+    try:
+        return PATH_INDEX[icon_name]
+    except KeyError:
+        pass
+
+    # Absolute paths and icons outside of the index
     filename = os.path.join(ICONS_DIR, icon_name)
     if not os.path.exists(filename):
-        for ext in ["png", "xpm", "gif", "bmp"]:
+        for ext in ICON_EXTENSIONS:
             f = ".".join([filename, ext])
             if os.path.exists(f):
                 filename = f
@@ -58,9 +153,17 @@ def get_icon_path(icon_name):
         return filename
 
 
-def load_icon(icon_name):
-    return QIcon(load(icon_name))
+def load_icon(icon_name, size=None):
+    key = (icon_name, _get_size_key(size))
+    try:
+        icon = ICON_CACHE[key]
+    except KeyError:
+        icon = QIcon(load(icon_name, size))
+        ICON_CACHE[key] = icon
+    else:
+        CACHE_STATISTICS["hits"] += 1
+    return QIcon(icon)
 
 
-def load_pixmap(icon_name):
-    return load(icon_name)
+def load_pixmap(icon_name, size=None):
+    return load(icon_name, size)
@@ -0,0 +1,356 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""Binary encoding of the mirrored state messages of instance mode"""
+
+import struct
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+# Messages are sent as python objects, pickled by the instance server
+LEGACY_CODEC_VERSION = 0
+
+MAGIC = b"MXQ"
+
+# Message types
+DELTA = 1
+DELTAS = 2
+SNAPSHOT = 3
+
+_HEADER = struct.Struct("!3sBBH")
+_NAME = struct.Struct("!B")
+_COUNT = struct.Struct("!I")
+_SEQUENCE = struct.Struct("!Q")
+_DELTA = struct.Struct("!IHHHB")
+_STATE = struct.Struct("!HHHB")
+_BYTE = struct.Struct("!B")
+_INT8 = struct.Struct("!b")
+_INT = struct.Struct("!q")
+_FLOAT = struct.Struct("!d")
+
+
+class BinaryCodec(object):
+    """Version 1 of the binary encoding.
+
+       A frame is the header (MAGIC, codec version, message type, number
+       of names), the table of brick, widget and method names used in the
+       frame and the message. Deltas hold their sequence number as an
+       offset to the first one of the frame. A state is made of the name
+       indexes, a flags byte (master sync) and the method arguments.
+       Arguments may be None, bool, int (64 bit), float, str, bytes and
+       tuples or lists of these. encode raises TypeError or ValueError
+       for other values.
+    """
+
+    version = 1
+
+    def __init__(self):
+        # Key - type of value, value - encoding function
+        self._encoders = {
+            type(None): self._encode_none,
+            bool: self._encode_bool,
+            int: self._encode_int,
+            float: self._encode_float,
+            str: self._encode_str,
+            bytes: self._encode_bytes,
+            tuple: self._encode_sequence,
+            list: self._encode_sequence,
+        }
+
+    def encode(self, message_type, message):
+        names = {}
+        body = []
+        try:
+            if message_type == DELTA:
+                body.append(_SEQUENCE.pack(message[0]))
+                self._encode_delta(message, message[0], names, body)
+            elif message_type == DELTAS:
+                first_sequence_number = message[0][0] if message else 0
+                body.append(_SEQUENCE.pack(first_sequence_number))
+                body.append(_COUNT.pack(len(message)))
+                for delta in message:
+                    self._encode_delta(delta, first_sequence_number, names, body)
+            elif message_type == SNAPSHOT:
+                sequence_number, states = message
+                body.append(_SEQUENCE.pack(sequence_number))
+                body.append(_COUNT.pack(len(states)))
+                for state in states:
+                    body.append(
+                        _STATE.pack(
+                            names.setdefault(state[0], len(names)),
+                            names.setdefault(state[1], len(names)),
+                            names.setdefault(state[2], len(names)),
+                            bool(state[4]),
+                        )
+                    )
+                    self._encode_sequence(tuple(state[3]), body)
+            else:
+                raise ValueError("Unknown message type %s" % message_type)
+
+            table = [_HEADER.pack(MAGIC, self.version, message_type, len(names))]
+            for name in sorted(names, key=names.get):
+                if not isinstance(name, str):
+                    raise TypeError("Names have to be strings")
+                encoded_name = name.encode("utf-8")
+                table.append(_NAME.pack(len(encoded_name)))
+                table.append(encoded_name)
+        except struct.error as error:
+            raise ValueError(str(error))
+        return b"".join(table + body)
+
+    def decode(self, data):
+        magic, version, message_type, count = _HEADER.unpack_from(data, 0)
+        offset = _HEADER.size
+        names = []
+        for index in range(count):
+            (length,) = _NAME.unpack_from(data, offset)
+            offset += _NAME.size
+            names.append(data[offset : offset + length].decode("utf-8"))
+            offset += length
+
+        if message_type == DELTA:
+            (first_sequence_number,) = _SEQUENCE.unpack_from(data, offset)
+            offset += _SEQUENCE.size
+            message, offset = self._decode_delta(
+                data, offset, first_sequence_number, names
+            )
+        elif message_type == DELTAS:
+            first_sequence_number, count = struct.unpack_from("!QI", data, offset)
+            offset += _SEQUENCE.size + _COUNT.size
+            message = []
+            for index in range(count):
+                delta, offset = self._decode_delta(
+                    data, offset, first_sequence_number, names
+                )
+                message.append(delta)
+        elif message_type == SNAPSHOT:
+            sequence_number, count = struct.unpack_from("!QI", data, offset)
+            offset += _SEQUENCE.size + _COUNT.size
+            states = []
+            for index in range(count):
+                brick_index, widget_index, method_index, flags = _STATE.unpack_from(
+                    data, offset
+                )
+                method_args, offset = self._decode_value(data, offset + _STATE.size)
+                states.append(
+                    (
+                        names[brick_index],
+                        names[widget_index],
+                        names[method_index],
+                        method_args,
+                        bool(flags & 1),
+                    )
+                )
+            message = (sequence_number, states)
+        else:
+            raise ValueError("Unknown message type %s" % message_type)
+        if offset != len(data):
+            raise ValueError("Unexpected data at the end of the message")
+        return message_type, message
+
+    def _encode_delta(self, delta, first_sequence_number, names, body):
+        body.append(
+            _DELTA.pack(
+                delta[0] - first_sequence_number,
+                names.setdefault(delta[1], len(names)),
+                names.setdefault(delta[2], len(names)),
+                names.setdefault(delta[3], len(names)),
+                bool(delta[5]),
+            )
+        )
+        self._encode_sequence(tuple(delta[4]), body)
+
+    def _decode_delta(self, data, offset, first_sequence_number, names):
+        sequence_offset, brick_index, widget_index, method_index, flags = \
+            _DELTA.unpack_from(data, offset)
+        method_args, offset = self._decode_value(data, offset + _DELTA.size)
+        delta = (
+            first_sequence_number + sequence_offset,
+            names[brick_index],
+            names[widget_index],
+            names[method_index],
+            method_args,
+            bool(flags & 1),
+        )
+        return delta, offset
+
+    def _encode_value(self, value, body):
+        encoder = self._encoders.get(type(value))
+        if encoder is None:
+            # Subclasses of the supported types
+            for value_type in (bool, int, float, str, bytes, tuple, list):
+                if isinstance(value, value_type):
+                    encoder = self._encoders[value_type]
+                    break
+            else:
+                raise TypeError("Unable to encode %s" % type(value).__name__)
+        encoder(value, body)
+
+    def _encode_none(self, value, body):
+        body.append(b"N")
+
+    def _encode_bool(self, value, body):
+        body.append(b"T" if value else b"F")
+
+    def _encode_int(self, value, body):
+        if -128 <= value < 128:
+            body.append(b"b" + _INT8.pack(value))
+        else:
+            body.append(b"i" + _INT.pack(value))
+
+    def _encode_float(self, value, body):
+        body.append(b"d" + _FLOAT.pack(value))
+
+    def _encode_str(self, value, body):
+        value = value.encode("utf-8")
+        if len(value) < 256:
+            body.append(b"s" + _BYTE.pack(len(value)) + value)
+        else:
+            body.append(b"S" + _COUNT.pack(len(value)) + value)
+
+    def _encode_bytes(self, value, body):
+        body.append(b"y" + _COUNT.pack(len(value)) + bytes(value))
+
+    def _encode_sequence(self, value, body):
+        if len(value) < 256:
+            tag = b"t" if isinstance(value, tuple) else b"l"
+            body.append(tag + _BYTE.pack(len(value)))
+        else:
+            tag = b"u" if isinstance(value, tuple) else b"m"
+            body.append(tag + _COUNT.pack(len(value)))
+        encoders = self._encoders
+        for item in value:
+            encoder = encoders.get(type(item))
+            if encoder is None:
+                self._encode_value(item, body)
+            else:
+                encoder(item, body)
+
+    def _decode_value(self, data, offset):
+        tag = data[offset : offset + 1]
+        offset += 1
+        if tag == b"s":
+            length = _BYTE.unpack_from(data, offset)[0]
+            offset += 1
+            return data[offset : offset + length].decode("utf-8"), offset + length
+        elif tag == b"d":
+            return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+        elif tag == b"b":
+            return _INT8.unpack_from(data, offset)[0], offset + 1
+        elif tag == b"i":
+            return _INT.unpack_from(data, offset)[0], offset + _INT.size
+        elif tag == b"N":
+            return None, offset
+        elif tag == b"T":
+            return True, offset
+        elif tag == b"F":
+            return False, offset
+        elif tag in (b"t", b"l"):
+            length = _BYTE.unpack_from(data, offset)[0]
+            offset += 1
+        elif tag in (b"S", b"y", b"u", b"m"):
+            length = _COUNT.unpack_from(data, offset)[0]
+            offset += _COUNT.size
+            if tag == b"S":
+                value = data[offset : offset + length].decode("utf-8")
+                return value, offset + length
+            elif tag == b"y":
+                return bytes(data[offset : offset + length]), offset + length
+        else:
+            raise ValueError("Unknown value tag %r" % tag)
+        items = []
+        for index in range(length):
+            item, offset = self._decode_value(data, offset)
+            items.append(item)
+        return (tuple(items) if tag in (b"t", b"u") else items), offset
+
+
+# Key - codec version, value - codec
+CODECS = {}
+
+
+def register_codec(codec):
+    CODECS[codec.version] = codec
+
+
+register_codec(BinaryCodec())
+
+
+def get_codec_versions():
+    """Returns the versions of the codecs available here"""
+    return sorted(CODECS)
+
+
+def negotiate_codec_version(peer_versions):
+    """Returns the highest codec version available here and in all peers
+       (each a list of versions), LEGACY_CODEC_VERSION if there is none
+    """
+    versions = set(CODECS)
+    for peer in peer_versions:
+        versions.intersection_update(peer)
+    return max(versions) if versions else LEGACY_CODEC_VERSION
+
+
+def encode_message(version, message_type, message):
+    """Encodes a message with the codec version. Messages of the legacy
+       version, or with values the codec can not encode, are returned as
+       they are
+    """
+    codec = CODECS.get(version)
+    if codec is None:
+        return message
+    try:
+        return codec.encode(message_type, message)
+    except (TypeError, ValueError):
+        return message
+
+
+def encode_deltas(version, deltas):
+    """Returns (message type, message) to send the deltas of a batch.
+       Several deltas are encoded as one DELTAS message. A single delta is
+       sent in the legacy format, it is smaller pickled than in a frame
+    """
+    if len(deltas) == 1:
+        return DELTA, deltas[0]
+    return DELTAS, encode_message(version, DELTAS, deltas)
+
+
+def is_encoded(data):
+    return isinstance(data, bytes) and data[: len(MAGIC)] == MAGIC
+
+
+def decode_message(data):
+    """Returns the message of a frame, or data itself if it was not
+       encoded (legacy version)
+    """
+    if not is_encoded(data):
+        return data
+    version = bytearray(data[len(MAGIC) : len(MAGIC) + 1])[0]
+    codec = CODECS.get(version)
+    if codec is None:
+        raise ValueError("Unknown instance message codec version %d" % version)
+    try:
+        return codec.decode(data)[1]
+    except (struct.error, IndexError, UnicodeDecodeError) as error:
+        raise ValueError("Invalid instance message: %s" % error)
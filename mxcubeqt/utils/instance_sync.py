@@ -0,0 +1,320 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""Coalescing and state transfer of brick updates mirrored to other
+instances"""
+
+import time
+import logging
+import collections
+
+import gevent
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+# Updates within SYNC_WINDOW seconds are sent together (about 3 frames)
+SYNC_WINDOW = 0.05
+# Message rates are computed over the last RATE_WINDOW seconds
+RATE_WINDOW = 10.0
+# Number of deltas kept by MirrorState to answer resync requests
+DELTA_HISTORY_SIZE = 1000
+
+
+class BrickUpdateBatcher(object):
+    """Merges brick updates before they are sent to other instances.
+
+       Mirrored widget methods (setText, setValue, setChecked,
+       setCurrentIndex, widget_synchronize) set a state, so of successive
+       updates of the same widget method only the last one needs to be
+       sent. add() keeps the last arguments per (brick, widget, method) and
+       starts the window if none is running. When the window expires
+       flush() sends the pending updates in the order they were last
+       changed, so typing in a mirrored line edit sends one message per
+       window instead of one per character.
+
+       send_function(brick name, widget name, method name, method args,
+       master sync) sends one update. If batch_function is given it is
+       called instead with the list of these tuples of the window, and
+       returns the number of messages it has sent.
+    """
+
+    def __init__(self, send_function, window=SYNC_WINDOW, batch_function=None):
+        self.send_function = send_function
+        self.batch_function = batch_function
+        self.window = window
+        # Key - (brick name, widget name, method name),
+        # value - (method args, master sync)
+        self._pending = collections.OrderedDict()
+        self._timer = None
+        self._sent_times = collections.deque()
+        self._update_times = collections.deque()
+        self.statistics = {
+            "update_count": 0,
+            "message_count": 0,
+            "merged_count": 0,
+            "batch_count": 0,
+            "error_count": 0,
+        }
+
+    def add(self, brick_name, widget_name, method_name, method_args, master_sync):
+        key = (brick_name, widget_name, method_name)
+        if key in self._pending:
+            del self._pending[key]
+            self.statistics["merged_count"] += 1
+        self._pending[key] = (method_args, master_sync)
+        self.statistics["update_count"] += 1
+        self._add_time(self._update_times)
+        if self._timer is None:
+            self._timer = gevent.spawn_later(self.window, self.flush)
+
+    def get_pending_count(self):
+        return len(self._pending)
+
+    def flush(self):
+        """Sends pending updates now"""
+        if self._timer is not None and self._timer is not gevent.getcurrent():
+            self._timer.kill(block=False)
+        self._timer = None
+        if not self._pending:
+            return
+        pending = self._pending
+        self._pending = collections.OrderedDict()
+        self.statistics["batch_count"] += 1
+        if self.batch_function is not None:
+            self._send_batch(pending)
+            return
+        for (brick_name, widget_name, method_name), (
+            method_args,
+            master_sync,
+        ) in pending.items():
+            try:
+                self.send_function(
+                    brick_name, widget_name, method_name, method_args, master_sync
+                )
+            except Exception:
+                self.statistics["error_count"] += 1
+                logging.getLogger("GUI").exception(
+                    "Unable to send update of %s.%s" % (brick_name, widget_name)
+                )
+            else:
+                self.statistics["message_count"] += 1
+                self._add_time(self._sent_times)
+
+    def _send_batch(self, pending):
+        updates = [key + state for key, state in pending.items()]
+        try:
+            message_count = self.batch_function(updates)
+        except Exception:
+            self.statistics["error_count"] += 1
+            logging.getLogger("GUI").exception(
+                "Unable to send %d brick updates" % len(updates)
+            )
+        else:
+            self.statistics["message_count"] += message_count
+            for index in range(message_count):
+                self._add_time(self._sent_times)
+
+    def cancel(self):
+        """Forgets pending updates"""
+        if self._timer is not None:
+            self._timer.kill(block=False)
+            self._timer = None
+        self._pending.clear()
+
+    def _add_time(self, times):
+        now = time.time()
+        times.append(now)
+        while times and now - times[0] > RATE_WINDOW:
+            times.popleft()
+
+    def _get_rate(self, times):
+        now = time.time()
+        while times and now - times[0] > RATE_WINDOW:
+            times.popleft()
+        return len(times) / RATE_WINDOW
+
+    def get_statistics(self):
+        """Returns counters and the update and message rates (per second)
+           of the last RATE_WINDOW seconds
+        """
+        statistics = dict(self.statistics)
+        statistics["pending_count"] = len(self._pending)
+        statistics["update_rate"] = self._get_rate(self._update_times)
+        statistics["message_rate"] = self._get_rate(self._sent_times)
+        return statistics
+
+
+class MirrorState(object):
+    """State of the mirrored bricks kept by the server instance.
+
+       Each update gets a sequence number and replaces the previous state
+       of the same (brick, widget, method). A late joining client gets a
+       snapshot of the latest states instead of the whole session, and
+       then the deltas with the following sequence numbers. The last
+       DELTA_HISTORY_SIZE deltas are kept, so a client that missed a few
+       deltas gets only these.
+
+       A delta is a tuple (sequence number, brick name, widget name,
+       method name, method args, master sync). A snapshot is a tuple
+       (sequence number, list of (brick name, widget name, method name,
+       method args, master sync)) in update order.
+    """
+
+    def __init__(self, history_size=DELTA_HISTORY_SIZE):
+        self.sequence_number = 0
+        # Key - (brick name, widget name, method name),
+        # value - (method args, master sync), in update order
+        self._states = collections.OrderedDict()
+        self._history = collections.deque(maxlen=history_size)
+
+    def __len__(self):
+        return len(self._states)
+
+    def update(self, brick_name, widget_name, method_name, method_args, master_sync):
+        """Records an update and returns its delta"""
+        key = (brick_name, widget_name, method_name)
+        self._states.pop(key, None)
+        self._states[key] = (method_args, master_sync)
+        self.sequence_number += 1
+        delta = (self.sequence_number,) + key + (method_args, master_sync)
+        self._history.append(delta)
+        return delta
+
+    def set_state(self, brick_name, widget_name, method_name, method_args, master_sync):
+        """Records a state already mirrored by other means (a client change
+           relayed by the server), without a new sequence number
+        """
+        key = (brick_name, widget_name, method_name)
+        self._states.pop(key, None)
+        self._states[key] = (method_args, master_sync)
+
+    def get_snapshot(self):
+        return (
+            self.sequence_number,
+            [key + state for key, state in self._states.items()],
+        )
+
+    def get_deltas_since(self, sequence_number):
+        """Returns deltas following sequence_number, None if some of them
+           are not kept anymore (a snapshot is needed then)
+        """
+        if sequence_number is None or sequence_number > self.sequence_number:
+            return None
+        if sequence_number == self.sequence_number:
+            return []
+        if not self._history or self._history[0][0] > sequence_number + 1:
+            return None
+        return [delta for delta in self._history if delta[0] > sequence_number]
+
+    def clear(self):
+        self._states.clear()
+        self._history.clear()
+
+
+class MirrorStateReceiver(object):
+    """Applies snapshots and deltas of MirrorState on a client instance.
+
+       Deltas are applied in sequence order. A delta received before the
+       first snapshot, or after a gap in the sequence numbers, is kept
+       until the missing state arrives. On a gap resync_function(last
+       sequence number) is called once, the server answers with the
+       missing deltas or a snapshot. apply_function(brick name, widget
+       name, method name, method args, master sync) applies one state.
+    """
+
+    def __init__(self, apply_function, resync_function):
+        self.apply_function = apply_function
+        self.resync_function = resync_function
+        self.sequence_number = None
+        self.resyncing = False
+        # Key - sequence number, value - delta
+        self._pending = {}
+        self.statistics = {
+            "snapshot_count": 0,
+            "delta_count": 0,
+            "duplicate_count": 0,
+            "gap_count": 0,
+        }
+
+    def apply_snapshot(self, snapshot):
+        sequence_number, states = snapshot
+        if self.sequence_number is not None and (
+            sequence_number < self.sequence_number
+            or (sequence_number == self.sequence_number and not self.resyncing)
+        ):
+            # Snapshot sent for another client
+            return
+        self.statistics["snapshot_count"] += 1
+        for state in states:
+            self._apply(state)
+        self.sequence_number = sequence_number
+        self.resyncing = False
+        self._apply_pending()
+
+    def apply_deltas(self, deltas):
+        for delta in deltas:
+            self.apply_delta(delta)
+
+    def apply_delta(self, delta):
+        sequence_number = delta[0]
+        if self.sequence_number is not None and \
+                sequence_number <= self.sequence_number:
+            self.statistics["duplicate_count"] += 1
+            return
+        self._pending[sequence_number] = delta
+        if self.sequence_number is None:
+            # Waiting for the first snapshot
+            return
+        self._apply_pending()
+        if self._pending and not self.resyncing:
+            self.statistics["gap_count"] += 1
+            self.resyncing = True
+            self.resync_function(self.sequence_number)
+
+    def _apply_pending(self):
+        for sequence_number in sorted(self._pending):
+            if sequence_number <= self.sequence_number:
+                del self._pending[sequence_number]
+            elif sequence_number == self.sequence_number + 1:
+                self._apply(self._pending.pop(sequence_number)[1:])
+                self.sequence_number = sequence_number
+                self.statistics["delta_count"] += 1
+            else:
+                break
+        if not self._pending:
+            self.resyncing = False
+
+    def _apply(self, state):
+        try:
+            self.apply_function(*state)
+        except Exception:
+            logging.getLogger("GUI").exception(
+                "Unable to apply mirrored state of %s.%s" % (state[0], state[1])
+            )
+
+    def reset(self):
+        """Forgets the state, the next snapshot is applied"""
+        self.sequence_number = None
+        self.resyncing = False
+        self._pending.clear()
@@ -0,0 +1,128 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Index of queue path templates used to find path collisions"""
+
+import os
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+def get_path_key(path_template):
+    """Returns the key under which a path template is indexed.
+       Path templates can only collide if their keys are equal.
+    """
+    return (
+        os.path.normpath(path_template.directory),
+        path_template.get_prefix(),
+        path_template.run_number,
+    )
+
+
+class PathCollisionIndex(object):
+    """Path templates of queue entries grouped by directory, prefix and
+       run number.
+
+       A collision query compares a path template only with the path
+       templates of its group instead of all path templates of the queue.
+       Path templates are edited in place, so entries have to be updated
+       with update() (or all of them with update_all()) after an edit.
+    """
+
+    def __init__(self):
+        # Key - id of the owner, value - (owner, path template, path key)
+        self._entries = {}
+        # Key - path key, value - dict of owner id: path template
+        self._groups = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, owner, path_template):
+        """Adds (or replaces) path template of the owner, usually a
+           queue model node
+        """
+        self.remove(owner)
+        if path_template is None:
+            return
+        key = get_path_key(path_template)
+        self._entries[id(owner)] = (owner, path_template, key)
+        self._groups.setdefault(key, {})[id(owner)] = path_template
+
+    def remove(self, owner):
+        """Removes path template of the owner"""
+        entry = self._entries.pop(id(owner), None)
+        if entry is None:
+            return
+        group = self._groups[entry[2]]
+        del group[id(owner)]
+        if not group:
+            del self._groups[entry[2]]
+
+    def update(self, owner, path_template=None):
+        """Moves path template of the owner to its current group after the
+           path template or the owner path template has been edited
+        """
+        entry = self._entries.get(id(owner))
+        if path_template is None:
+            if entry is None:
+                return
+            path_template = entry[1]
+        if (
+            entry is None
+            or entry[1] is not path_template
+            or entry[2] != get_path_key(path_template)
+        ):
+            self.add(owner, path_template)
+
+    def update_all(self):
+        """Updates all entries, returns the number of moved entries"""
+        moved = 0
+        for owner, path_template, key in list(self._entries.values()):
+            if get_path_key(path_template) != key:
+                self.add(owner, path_template)
+                moved += 1
+        return moved
+
+    def clear(self):
+        self._entries.clear()
+        self._groups.clear()
+
+    def get_collisions(self, path_template):
+        """Returns indexed path templates colliding with path_template.
+           path_template itself is never reported.
+        """
+        group = self._groups.get(get_path_key(path_template))
+        if not group:
+            return []
+        return [
+            indexed_path_template
+            for indexed_path_template in group.values()
+            if indexed_path_template is not path_template
+            and path_template.intersection(indexed_path_template)
+        ]
+
+    def has_collision(self, path_template):
+        """Returns True if path_template collides with an indexed path
+           template. Same as queue_model.check_for_path_collisions
+        """
+        return len(self.get_collisions(path_template)) > 0
@@ -119,6 +119,9 @@ if (qt_variant == "PyQt5") or (qt_variant is None and not qt_imported):
             pyqtSlot,
             PYQT_VERSION_STR,
             Qt,
+            QAbstractEventDispatcher,
+            QAbstractItemModel,
+            QAbstractTableModel,
             QCoreApplication,
             QDir,
             QEvent,
@@ -129,7 +132,10 @@ if (qt_variant == "PyQt5") or (qt_variant is None and not qt_imported):
             QRect,
             QRectF,
             QRegExp,
+            QModelIndex,
             QSize,
+            QSocketNotifier,
+            QSortFilterProxyModel,
             QT_VERSION_STR,
             QTimer,
             QUrl,
@@ -266,9 +272,13 @@ if (qt_variant == "PyQt4") or (qt_variant is None and not qt_imported):
             pyqtSlot,
             PYQT_VERSION_STR,
             Qt,
+            QAbstractEventDispatcher,
+            QAbstractItemModel,
+            QAbstractTableModel,
             QDir,
             QEvent,
             QEventLoop,
+            QModelIndex,
             QUrl,
             QObject,
             QPoint,
@@ -277,6 +287,7 @@ if (qt_variant == "PyQt4") or (qt_variant is None and not qt_imported):
             QRectF,
             QRegExp,
             QSize,
+            QSocketNotifier,
             QStringList,
             QT_VERSION_STR,
             QTimer,
@@ -351,6 +362,7 @@ if (qt_variant == "PyQt4") or (qt_variant is None and not qt_imported):
             QShortcut,
             QSizePolicy,
             QSlider,
+            QSortFilterProxyModel,
             QSpacerItem,
             QSpinBox,
             QSplashScreen,
@@ -0,0 +1,269 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Coalesced queue autosave"""
+
+import time
+import logging
+
+import gevent
+import jsonpickle
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+# Changes done within AUTOSAVE_DELAY seconds are saved together
+AUTOSAVE_DELAY = 2.0
+
+# Redis keys of the queue, as read by the load_queue of the redis client
+QUEUE_MODEL_KEY = "mxcube:%s:%s:queue_model"
+QUEUE_CURRENT_KEY = "mxcube:%s:%s:queue_current"
+
+
+def get_data_size(data):
+    """Returns the size of the saved data if the save function returned it"""
+    if isinstance(data, int) and not isinstance(data, bool):
+        return data
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+class QueueAutosave(object):
+    """Saves the queue once for all changes done within a time window.
+
+       mark_dirty() records a changed node and starts the time window if no
+       save is pending. When the window expires save_function is called
+       once in a greenlet of the GUI thread, so the queue is not changed
+       while it is serialized. save_function gets the list of changed nodes,
+       or None if a change was not attributed to a node, and has to save
+       before it returns. Its I/O has to be cooperative (gevent sockets)
+       to keep the GUI responsive.
+       Nodes changed while a save is running are saved in the next window.
+       If save_function returns the saved data (or its size) the size is
+       reported in the statistics.
+    """
+
+    def __init__(self, save_function, delay=AUTOSAVE_DELAY):
+        self.save_function = save_function
+        self.delay = delay
+        self.enabled = True
+        # Key - id of a changed node, value - node. None for unknown changes
+        self._dirty_nodes = {}
+        self._timer = None
+        self._saving = False
+        self.statistics = {
+            "save_count": 0,
+            "change_count": 0,
+            "error_count": 0,
+            "last_save_time": None,
+            "last_save_size": None,
+            "total_save_time": 0.0,
+        }
+
+    def mark_dirty(self, node=None):
+        """Records a change of node (or of the queue if node is None)"""
+        if not self.enabled:
+            return
+        self._dirty_nodes[id(node)] = node
+        self.statistics["change_count"] += 1
+        if self._timer is None and not self._saving:
+            self._timer = gevent.spawn_later(self.delay, self._save)
+
+    def is_dirty(self):
+        return len(self._dirty_nodes) > 0
+
+    def get_dirty_nodes(self):
+        return [node for node in self._dirty_nodes.values() if node is not None]
+
+    def cancel(self):
+        """Forgets pending changes"""
+        if self._timer is not None:
+            self._timer.kill(block=False)
+            self._timer = None
+        self._dirty_nodes.clear()
+
+    def flush(self):
+        """Saves pending changes now and waits for the save"""
+        if self._timer is not None:
+            self._timer.kill(block=False)
+            self._timer = None
+        if self._saving:
+            while self._saving:
+                gevent.sleep(0.01)
+            if self._timer is not None:
+                self._timer.kill(block=False)
+                self._timer = None
+        if self.is_dirty():
+            self._save()
+
+    def _save(self):
+        self._timer = None
+        self._saving = True
+        dirty_nodes = self._dirty_nodes
+        self._dirty_nodes = {}
+        if id(None) in dirty_nodes:
+            changed_nodes = None
+        else:
+            changed_nodes = list(dirty_nodes.values())
+
+        start = time.time()
+        try:
+            data = self.save_function(changed_nodes)
+        except Exception:
+            # Changes are saved again with the next change
+            self.statistics["error_count"] += 1
+            dirty_nodes.update(self._dirty_nodes)
+            self._dirty_nodes = dirty_nodes
+            logging.getLogger("HWR").exception("Unable to save the queue")
+        else:
+            save_time = time.time() - start
+            self.statistics["save_count"] += 1
+            self.statistics["last_save_time"] = save_time
+            self.statistics["last_save_size"] = get_data_size(data)
+            self.statistics["total_save_time"] += save_time
+            message = "Queue with %d changed node(s) saved in %.3f s" % (
+                len(dirty_nodes),
+                save_time,
+            )
+            if self.statistics["last_save_size"] is not None:
+                message += " (%d bytes)" % self.statistics["last_save_size"]
+            logging.getLogger("HWR").debug(message)
+            if self._dirty_nodes:
+                # Nodes changed during the save
+                self._timer = gevent.spawn_later(self.delay, self._save)
+        finally:
+            self._saving = False
+
+    def get_statistics(self):
+        statistics = dict(self.statistics)
+        statistics["dirty_node_count"] = len(self._dirty_nodes)
+        return statistics
+
+
+def encode_task_group(task_group):
+    """jsonpickle encoding of task_group. The link to the sample is left
+       out, as through it the whole queue would be encoded. The loader
+       adds the task group to the sample again.
+    """
+    parent = task_group._parent
+    task_group._parent = None
+    try:
+        return jsonpickle.encode(task_group)
+    finally:
+        task_group._parent = parent
+
+
+class QueueSerializer(object):
+    """Builds the queue list written to redis: one record with the sample
+       location and the jsonpickle encoded task group per task group.
+       Encoded task groups are kept, so a save only encodes again the task
+       groups holding changed nodes.
+    """
+
+    def __init__(self, encode_function=encode_task_group):
+        self.encode_function = encode_function
+        # Key - id of a task group, value - (task group, encoded task group)
+        self._encoded = {}
+        self.statistics = {"encoded_count": 0, "reused_count": 0}
+
+    def clear(self):
+        self._encoded.clear()
+
+    def _forget(self, changed_nodes, sample_ids):
+        """Drops encoded task groups holding changed nodes. All of them are
+           dropped if a node is not in a task group (sample, basket)
+        """
+        for node in changed_nodes:
+            task_group = node
+            parent = node.get_parent()
+            while parent is not None and id(parent) not in sample_ids:
+                task_group = parent
+                parent = parent.get_parent()
+            if parent is None:
+                self._encoded.clear()
+                return
+            self._encoded.pop(id(task_group), None)
+
+    def get_queue_list(self, sample_entries, changed_nodes=None):
+        """Returns the queue list of sample_entries (sample queue entries in
+           queue order). changed_nodes are the nodes changed since the last
+           call, None to encode every task group.
+        """
+        samples = [sample_entry.get_data_model() for sample_entry in sample_entries]
+        if changed_nodes is None:
+            self._encoded.clear()
+        else:
+            self._forget(changed_nodes, set(id(sample) for sample in samples))
+
+        encoded = {}
+        queue_list = []
+        for sample_entry, sample in zip(sample_entries, samples):
+            for task_entry in sample_entry.get_queue_entry_list():
+                task_group = task_entry.get_data_model()
+                try:
+                    encoded_group, data = self._encoded[id(task_group)]
+                except KeyError:
+                    encoded_group = None
+                if encoded_group is task_group:
+                    self.statistics["reused_count"] += 1
+                else:
+                    data = self.encode_function(task_group)
+                    self.statistics["encoded_count"] += 1
+                encoded[id(task_group)] = (task_group, data)
+                queue_list.append(
+                    {"sample_location": sample.location, "task_group_entry": data}
+                )
+        # Removed task groups are forgotten
+        self._encoded = encoded
+        return queue_list
+
+
+def write_queue(redis_connection, key_args, model_name, queue_list):
+    """Writes the queue under the keys of the redis client.
+       key_args is (proposal id, beamline name). Returns the written
+       queue payload.
+    """
+    payload = repr(queue_list)
+    redis_connection.set(QUEUE_MODEL_KEY % key_args, model_name)
+    redis_connection.set(QUEUE_CURRENT_KEY % key_args, payload)
+    return payload
+
+
+class MemoryQueueStore(object):
+    """In memory stand-in for the redis connection (set and get) of the
+       redis client hardware object. Used to run the autosave without a
+       redis server.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.set_count = 0
+
+    def set(self, key, value):
+        self.data[key] = value
+        self.set_count += 1
+        return True
+
+    def get(self, key):
+        return self.data.get(key)
@@ -0,0 +1,297 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Streaming queue file format.
+
+A queue file is a text file (gzip compressed if the name ends with .gz)
+with one JSON document per line:
+
+    {"format": "mxcubeqt-queue", "version": 1, "node_count": 3, "model": "ispyb"}
+    {"id": 1, "parent": 0, "class": "Sample", "state": {...}}
+    {"id": 2, "parent": 1, "class": "TaskGroup", "state": {...}}
+    {"id": 3, "parent": 2, "class": "DataCollection", "state": {...}}
+
+"model" is the name of the queue model the queue was saved from.
+Nodes are written parent first, 0 is the root node of the queue. The state
+of a node is its attributes flattened with jsonpickle, parent and children
+are written as null and rebuilt from the parent ids. Each node can be
+decoded and added to the queue as soon as its line has been read.
+
+The file is written next to the target and renamed when complete, so an
+interrupted save does not destroy the previous queue file.
+"""
+
+import io
+import os
+import logging
+import gzip
+import json
+
+import jsonpickle
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+FORMAT_NAME = "mxcubeqt-queue"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".mxq"
+ROOT_ID = 0
+# Attributes linking a node to the tree, rebuilt when loading
+TREE_ATTRIBUTES = ("_parent", "_children")
+RECORD_KEYS = ("id", "parent", "class", "state")
+# Nodes standing for the samples of the sample changer
+SAMPLE_CLASS = "Sample"
+BASKET_CLASS = "Basket"
+
+
+class QueueFileError(ValueError):
+    """Raised when a file is not a valid queue file"""
+
+
+def get_node_classes():
+    """Returns classes allowed in a queue file, by name"""
+    from mxcubecore.HardwareObjects import queue_model_objects
+
+    return dict(
+        (name, cls)
+        for name, cls in vars(queue_model_objects).items()
+        if isinstance(cls, type) and issubclass(cls, queue_model_objects.TaskNode)
+    )
+
+
+def open_file(filename, mode="r", compressed=None):
+    if compressed is None:
+        compressed = filename.endswith(".gz")
+    if compressed:
+        return io.TextIOWrapper(gzip.open(filename, mode + "b"), encoding="utf-8")
+    return io.open(filename, mode, encoding="utf-8")
+
+
+def iter_nodes(root_node):
+    """Yields (node, parent) of all nodes below root_node, parents first"""
+    stack = [(child, root_node) for child in reversed(root_node.get_children())]
+    while stack:
+        node, parent = stack.pop()
+        yield node, parent
+        stack.extend((child, node) for child in reversed(node.get_children()))
+
+
+def encode_node(node, node_id, parent_id, pickler=None):
+    if pickler is None:
+        pickler = jsonpickle.pickler.Pickler()
+    # Tree attributes keep their place, so decoded nodes have the same
+    # attribute order
+    state = dict(
+        (key, None if key in TREE_ATTRIBUTES else value)
+        for key, value in node.__dict__.items()
+    )
+    return {
+        "id": node_id,
+        "parent": parent_id,
+        "class": node.__class__.__name__,
+        "state": pickler.flatten(state, reset=True),
+    }
+
+
+def decode_node(record, node_classes, unpickler=None):
+    if unpickler is None:
+        unpickler = jsonpickle.unpickler.Unpickler()
+    try:
+        cls = node_classes[record["class"]]
+    except KeyError:
+        raise QueueFileError("Unknown queue node class %s" % record["class"])
+    state = unpickler.restore(record["state"], reset=True)
+    state["_parent"] = None
+    state["_children"] = []
+    node = cls.__new__(cls)
+    node.__dict__.update(state)
+    return node
+
+
+def dump_line(document):
+    return json.dumps(document, separators=(",", ":")) + "\n"
+
+
+def save_queue(root_node, filename, model_name=None):
+    """Writes all nodes below root_node, returns the number of nodes.
+       model_name is the name of the queue model of root_node
+    """
+    nodes = list(iter_nodes(root_node))
+    node_ids = {id(root_node): ROOT_ID}
+    pickler = jsonpickle.pickler.Pickler()
+    temp_filename = "%s.%d.tmp" % (filename, os.getpid())
+
+    try:
+        with open_file(temp_filename, "w", filename.endswith(".gz")) as queue_file:
+            queue_file.write(
+                dump_line(
+                    {
+                        "format": FORMAT_NAME,
+                        "version": FORMAT_VERSION,
+                        "node_count": len(nodes),
+                        "model": model_name,
+                    }
+                )
+            )
+            for node_id, (node, parent) in enumerate(nodes, ROOT_ID + 1):
+                node_ids[id(node)] = node_id
+                queue_file.write(
+                    dump_line(
+                        encode_node(node, node_id, node_ids[id(parent)], pickler)
+                    )
+                )
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+    return len(nodes)
+
+
+def read_header(queue_file):
+    line = queue_file.readline()
+    try:
+        header = json.loads(line)
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+        raise QueueFileError("Not a queue file")
+    if header.get("version") != FORMAT_VERSION:
+        raise QueueFileError(
+            "Unsupported queue file version %s" % header.get("version")
+        )
+    return header
+
+
+def get_model_name(filename):
+    """Returns the name of the queue model saved in the file, or None"""
+    with open_file(filename) as queue_file:
+        return read_header(queue_file).get("model")
+
+
+def is_queue_file(filename):
+    """Returns True if filename has been written by save_queue"""
+    try:
+        with open_file(filename) as queue_file:
+            read_header(queue_file)
+    except (IOError, OSError, QueueFileError, UnicodeDecodeError):
+        return False
+    return True
+
+
+def iter_records(filename):
+    """Yields validated node records of a queue file"""
+    with open_file(filename) as queue_file:
+        header = read_header(queue_file)
+        known_ids = set([ROOT_ID])
+        count = 0
+        for line_number, line in enumerate(queue_file, 2):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as ex:
+                raise QueueFileError("Line %d: %s" % (line_number, ex))
+            if (
+                not isinstance(record, dict)
+                or any(key not in record for key in RECORD_KEYS)
+                or not isinstance(record["id"], int)
+                or not isinstance(record["parent"], int)
+                or not isinstance(record["state"], dict)
+            ):
+                raise QueueFileError("Line %d: invalid node record" % line_number)
+            if record["parent"] not in known_ids:
+                raise QueueFileError(
+                    "Line %d: parent %s is not defined before its children"
+                    % (line_number, record["parent"])
+                )
+            if record["id"] in known_ids:
+                raise QueueFileError(
+                    "Line %d: node %s defined twice" % (line_number, record["id"])
+                )
+            known_ids.add(record["id"])
+            count += 1
+            yield record
+        if count != header.get("node_count", count):
+            raise QueueFileError(
+                "Queue file truncated: %d of %d nodes"
+                % (count, header["node_count"])
+            )
+
+
+def load_queue(filename, queue_model, node_classes=None, progress_callback=None,
+               progress_interval=200, samples=None):
+    """Adds the nodes of a queue file to queue_model while reading it.
+
+       Each node is added with queue_model.add_child, so views connected to
+       child_added are filled progressively. progress_callback(count) is
+       called every progress_interval nodes, for example to process GUI
+       events.
+
+       samples (key - sample location, value - sample node) are the
+       samples already in queue_model. If given, the nodes below a saved
+       sample are added to the sample with the same location, as done by
+       the .dat loader of the queue model. Saved samples and baskets are
+       not added, and the nodes of samples not in samples are skipped.
+
+       Returns the list of loaded nodes added to the root node, or to the
+       samples if given.
+    """
+    if node_classes is None:
+        node_classes = get_node_classes()
+    unpickler = jsonpickle.unpickler.Unpickler()
+    root_node = queue_model.get_model_root()
+    nodes = {ROOT_ID: root_node}
+    # Ids of the nodes that are in queue_model before loading
+    existing_ids = set([ROOT_ID])
+    top_level_nodes = []
+    skipped_samples = []
+
+    for count, record in enumerate(iter_records(filename), 1):
+        parent = nodes.get(record["parent"])
+        if parent is None:
+            # Below a skipped sample
+            nodes[record["id"]] = None
+        elif samples is not None and record["class"] == BASKET_CLASS:
+            nodes[record["id"]] = root_node
+            existing_ids.add(record["id"])
+        elif samples is not None and record["class"] == SAMPLE_CLASS:
+            location = decode_node(record, node_classes, unpickler).location
+            nodes[record["id"]] = samples.get(location)
+            if nodes[record["id"]] is None:
+                skipped_samples.append(location)
+            else:
+                existing_ids.add(record["id"])
+        else:
+            node = decode_node(record, node_classes, unpickler)
+            queue_model.add_child(parent, node)
+            nodes[record["id"]] = node
+            if record["parent"] in existing_ids:
+                top_level_nodes.append(node)
+        if progress_callback is not None and count % progress_interval == 0:
+            progress_callback(count)
+    if skipped_samples:
+        logging.getLogger("HWR").warning(
+            "Queue file %s: samples %s are not available, their tasks are "
+            "not loaded" % (filename, ", ".join(map(str, skipped_samples)))
+        )
+    return top_level_nodes
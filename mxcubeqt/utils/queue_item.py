@@ -32,6 +32,85 @@ BALL_FAILED = icons.load_icon("sphere_red")
 BALL_FINISHED = icons.load_icon("sphere_green")
 
 
+def get_data_collection_version(dc_model):
+    """Returns a key that changes when a value shown in the tool tip of
+       the data collection changes. Reads attributes only, so it is much
+       cheaper than as_dict and the html formatting of the tool tip
+    """
+    parameters = dc_model.acquisitions[0].acquisition_parameters
+    return (
+        parameters.osc_start,
+        parameters.osc_range,
+        parameters.num_images,
+        parameters.exp_time,
+        parameters.energy,
+        parameters.resolution,
+        parameters.transmission,
+        len(dc_model.processing_msg_list),
+    )
+
+
+def get_data_collection_tool_tip(dc_model):
+    """Returns html tool tip with the parameters and processing
+       results of a data collection
+    """
+    dc_parameters = dc_model.as_dict()
+    dc_parameters_table = """<b>Collection parameters:</b>
+         <table border='0.5'>
+         <tr><td>Osc start</td><td>%.2f</td></tr>
+         <tr><td>Osc range</td><td>%.2f</td></tr>
+         <tr><td>Num images</td><td>%d</td></tr>
+         <tr><td>Exposure time</td><td>%.4fs</td></tr>
+         <tr><td>Energy</td><td>%.2f keV</td></tr>
+         <tr><td>Resolution</td><td>%.2f Ang</td></tr>
+         <tr><td>Transmission</td><td>%.2f %%</td></tr>
+         </table>
+      """ % (
+        dc_parameters["osc_start"],
+        dc_parameters["osc_range"],
+        dc_parameters["num_images"],
+        dc_parameters["exp_time"],
+        dc_parameters["energy"],
+        dc_parameters["resolution"],
+        dc_parameters["transmission"],
+    )
+
+    processing_table = ""
+    if len(dc_model.processing_msg_list) > 0:
+        processing_table = """</br></br>
+             <b>Processing info:</b>
+             <table border='0.5'>
+          """
+        for msg in dc_model.processing_msg_list:
+            if msg[2] in ("failed"):
+                proc_msg = "<font color=#FE0000>%s: %s %s</font>" % (
+                    msg[1],
+                    msg[2],
+                    msg[3],
+                )
+            else:
+                proc_msg = "%s: %s" % (msg[1], msg[2])
+            processing_table += "<tr><td>%s</td><td>%s</td></tr>" % (
+                msg[0],
+                proc_msg,
+            )
+
+        processing_table += "</table>"
+
+    tool_tip = """<!DOCTYPE html PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN">
+                <html lang="en">
+                <body>
+                   %s
+                   %s
+                </body>
+                </html>""" % (
+        dc_parameters_table,
+        processing_table,
+    )
+
+    return tool_tip
+
+
 class QueueItem(qt_import.QTreeWidgetItem):
     """
     Use this class to create a new type of item for the collect tree/queue.
@@ -302,6 +381,8 @@ class DataCollectionGroupQueueItem(TaskQueueItem):
 class DataCollectionQueueItem(TaskQueueItem):
     def __init__(self, *args, **kwargs):
         TaskQueueItem.__init__(self, *args, **kwargs)
+        self._tool_tip = None
+        self._tool_tip_version = None
 
     def init_processing_info(self):
         dc_model = self.get_model()
@@ -315,62 +396,24 @@ class DataCollectionQueueItem(TaskQueueItem):
         self.update_tool_tip()
 
     def update_tool_tip(self):
-        dc_model = self.get_model()
-        dc_parameters = dc_model.as_dict()
-        dc_parameters_table = """<b>Collection parameters:</b>
-             <table border='0.5'>
-             <tr><td>Osc start</td><td>%.2f</td></tr>
-             <tr><td>Osc range</td><td>%.2f</td></tr>
-             <tr><td>Num images</td><td>%d</td></tr>
-             <tr><td>Exposure time</td><td>%.4fs</td></tr>
-             <tr><td>Energy</td><td>%.2f keV</td></tr>
-             <tr><td>Resolution</td><td>%.2f Ang</td></tr>
-             <tr><td>Transmission</td><td>%.2f %%</td></tr>
-             </table>
-          """ % (
-            dc_parameters["osc_start"],
-            dc_parameters["osc_range"],
-            dc_parameters["num_images"],
-            dc_parameters["exp_time"],
-            dc_parameters["energy"],
-            dc_parameters["resolution"],
-            dc_parameters["transmission"],
-        )
-
-        processing_table = ""
-        if len(dc_model.processing_msg_list) > 0:
-            processing_table = """</br></br>
-                 <b>Processing info:</b>
-                 <table border='0.5'>
-              """
-            for msg in dc_model.processing_msg_list:
-                if msg[2] in ("failed"):
-                    proc_msg = "<font color=#FE0000>%s: %s %s</font>" % (
-                        msg[1],
-                        msg[2],
-                        msg[3],
-                    )
-                else:
-                    proc_msg = "%s: %s" % (msg[1], msg[2])
-                processing_table += "<tr><td>%s</td><td>%s</td></tr>" % (
-                    msg[0],
-                    proc_msg,
-                )
-
-            processing_table += "</table>"
+        """Drops the cached tool tip, it is built again when shown"""
+        self._tool_tip = None
 
-        tool_tip = """<!DOCTYPE html PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN">
-                    <html lang="en">
-                    <body>
-                       %s
-                       %s
-                    </body>
-                    </html>""" % (
-            dc_parameters_table,
-            processing_table,
-        )
-
-        self.setToolTip(0, tool_tip)
+    def get_tool_tip(self):
+        """Returns the tool tip, built only if the model changed since
+           it was last shown
+        """
+        version = get_data_collection_version(self.get_model())
+        if self._tool_tip is None or version != self._tool_tip_version:
+            self._tool_tip = get_data_collection_tool_tip(self.get_model())
+            self._tool_tip_version = version
+        return self._tool_tip
+
+    def data(self, column, role):
+        if role == qt_import.Qt.ToolTipRole and column == 0:
+            if self.get_model() is not None:
+                return self.get_tool_tip()
+        return TaskQueueItem.data(self, column, role)
 
 
 class CharacterisationQueueItem(TaskQueueItem):
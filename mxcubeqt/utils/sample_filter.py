@@ -0,0 +1,158 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Index of sample attributes used to filter the queue tree"""
+
+from mxcubeqt.utils import queue_item
+from mxcubeqt.utils.sample_filter_criteria import TRUE_VALUES, get_basket_indexes
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+class SampleEntry(object):
+    """Sample tree item of the filter index. Attributes are read when
+       filtering, as items are renamed and tasks change state without
+       changing the index.
+    """
+
+    __slots__ = ("item", "basket_item")
+
+    def __init__(self, item):
+        self.item = item
+        parent = item.parent()
+        if isinstance(parent, queue_item.BasketQueueItem):
+            self.basket_item = parent
+        else:
+            self.basket_item = None
+
+    @property
+    def name(self):
+        return str(self.item.text(0))
+
+    @property
+    def acronym(self):
+        try:
+            return str(self.item.get_model().crystals[0].protein_acronym or "")
+        except (AttributeError, IndexError):
+            return ""
+
+    @property
+    def basket_index(self):
+        try:
+            return int(self.item.get_model().location[0])
+        except (AttributeError, IndexError, TypeError, ValueError):
+            return None
+
+    @property
+    def barcode(self):
+        return str(getattr(self.item.get_model(), "code", "") or "")
+
+    @property
+    def collections(self):
+        collections = []
+        items = [self.item]
+        while items:
+            item = items.pop()
+            for index in range(item.childCount()):
+                child = item.child(index)
+                if isinstance(child, queue_item.DataCollectionQueueItem):
+                    collections.append(child.get_model())
+                items.append(child)
+        return collections
+
+    def is_collected(self):
+        return any(collection.is_executed() for collection in self.collections)
+
+    def is_processed(self):
+        return any(
+            len(getattr(collection, "processing_msg_list", ())) > 0
+            for collection in self.collections
+        )
+
+    def matches(self, criteria):
+        """Returns True if the sample matches all criteria"""
+        for field, value in criteria.items():
+            if field == "name":
+                if value not in self.name:
+                    return False
+            elif field == "acronym":
+                if value not in self.acronym:
+                    return False
+            elif field == "barcode":
+                if value not in self.barcode:
+                    return False
+            elif field == "basket":
+                if self.basket_index not in get_basket_indexes(value):
+                    return False
+            elif field == "collected":
+                if self.is_collected() != (value.lower() in TRUE_VALUES):
+                    return False
+            elif field == "processed":
+                if self.is_processed() != (value.lower() in TRUE_VALUES):
+                    return False
+        return True
+
+
+class SampleFilter(object):
+    """Sample and basket items indexed once from the sample tree.
+
+       The index is built again only when items were added to or removed
+       from the tree since it was built, see DataCollectTree.item_index_version.
+       Names and collection states are read from the items when filtering.
+    """
+
+    def __init__(self, dc_tree_widget):
+        self._dc_tree_widget = dc_tree_widget
+        self._entries = []
+        self._basket_items = []
+        self._version = None
+
+    def get_entries(self):
+        version = self._dc_tree_widget.item_index_version
+        if version != self._version:
+            self._entries = [
+                SampleEntry(item)
+                for item in self._dc_tree_widget.get_indexed_items(
+                    queue_item.SampleQueueItem
+                )
+            ]
+            self._basket_items = self._dc_tree_widget.get_indexed_items(
+                queue_item.BasketQueueItem
+            )
+            self._version = version
+        return self._entries
+
+    def get_visibility(self, criteria):
+        """Returns a list of (item, hidden) for all samples and baskets.
+           Baskets are hidden when none of their samples is shown.
+        """
+        entries = self.get_entries()
+        result = []
+        shown_baskets = set()
+        for entry in entries:
+            hidden = not entry.matches(criteria)
+            result.append((entry.item, hidden))
+            if not hidden and entry.basket_item is not None:
+                shown_baskets.add(id(entry.basket_item))
+        for basket_item in self._basket_items:
+            result.append((basket_item, id(basket_item) not in shown_baskets))
+        return result
@@ -0,0 +1,61 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""Parsing of the sample filter text of the queue tree (no Qt needed)"""
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+FILTER_FIELDS = ("name", "acronym", "basket", "barcode", "collected", "processed")
+# Field used for words without field name, by index of the filter combo
+COMBO_FILTER_FIELDS = {2: "name", 3: "acronym", 4: "basket"}
+TRUE_VALUES = ("1", "yes", "true", "y")
+
+
+def parse_filter_text(text, default_field):
+    """Returns criteria dict from filter text.
+
+       Words written as field:value filter on the field, for example
+       "lyso acronym:TRYP basket:1,2 collected:no". Other words are joined
+       and filter on default_field.
+    """
+    criteria = {}
+    default_words = []
+    for word in str(text).split():
+        field, separator, value = word.partition(":")
+        if separator and field in FILTER_FIELDS:
+            criteria[field] = value
+        else:
+            default_words.append(word)
+    if default_words and default_field is not None:
+        criteria[default_field] = " ".join(default_words)
+    return criteria
+
+
+def get_basket_indexes(value):
+    """Returns the set of basket indexes of a basket:1,2 criterion"""
+    basket_indexes = set()
+    for basket_index in value.split(","):
+        basket_index = basket_index.strip()
+        if basket_index.isdigit():
+            basket_indexes.add(int(basket_index))
+    return basket_indexes
@@ -0,0 +1,162 @@
+#
+#  Project: MXCuBE
+#  https://github.com/mxcube
+#
+#  This file is part of MXCuBE software.
+#
+#  MXCuBE is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  MXCuBE is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+"""Cache of sample view snapshots"""
+
+import time
+import logging
+
+import gevent
+
+from mxcubecore import HardwareRepository as HWR
+
+
+__credits__ = ["MXCuBE collaboration"]
+__license__ = "LGPLv3+"
+
+
+# Snapshots are grabbed when the selection did not change for SNAPSHOT_DELAY s
+SNAPSHOT_DELAY = 0.3
+# A snapshot is reused for the same sample view state within this window (s)
+SNAPSHOT_TIME_WINDOW = 10.0
+# Motor positions are compared with this number of decimals
+POSITION_DECIMALS = 4
+
+
+def get_sample_view_state():
+    """Returns the motor positions (zoom included) of the diffractometer
+       as a sorted tuple, None if they are not available
+    """
+    try:
+        positions = HWR.beamline.diffractometer.get_positions()
+    except Exception:
+        return None
+    state = []
+    for name, value in sorted(positions.items()):
+        if isinstance(value, float):
+            value = round(value, POSITION_DECIMALS)
+        state.append((name, value))
+    return tuple(state)
+
+
+def grab_snapshot():
+    return HWR.beamline.sample_view.get_snapshot()
+
+
+class SnapshotCache(object):
+    """Reuses sample view snapshots while the sample view does not change.
+
+       A snapshot is kept with the sample view state (motor positions and
+       zoom) and the time window it was grabbed in. get_snapshot() returns
+       the cached snapshot when the key did not change. Otherwise the grab
+       is deferred until requests stop for delay seconds, so browsing
+       through the queue grabs one image instead of one per selection.
+       Grabs run in the gevent loop of the GUI thread, as the graphics
+       scene can only be rendered there.
+    """
+
+    def __init__(
+        self,
+        grab_function=grab_snapshot,
+        state_function=get_sample_view_state,
+        delay=SNAPSHOT_DELAY,
+        time_window=SNAPSHOT_TIME_WINDOW,
+    ):
+        self.grab_function = grab_function
+        self.state_function = state_function
+        self.delay = delay
+        self.time_window = time_window
+        self._key = None
+        self._snapshot = None
+        self._callbacks = []
+        self._timer = None
+        self.statistics = {"hit_count": 0, "miss_count": 0, "grab_count": 0}
+
+    def get_key(self):
+        """Returns the cache key of the current sample view, None if the
+           state is unknown. Snapshots are not reused for unknown states
+        """
+        state = self.state_function()
+        if state is None:
+            return None
+        return (state, int(time.time() // self.time_window))
+
+    def get_snapshot(self, callback=None):
+        """Returns the snapshot of the current sample view if cached.
+           Otherwise returns the last snapshot (or None) and schedules a
+           grab, callback(snapshot) is called when it is done
+        """
+        key = self.get_key()
+        if key is not None and key == self._key:
+            self.statistics["hit_count"] += 1
+            return self._snapshot
+        self.statistics["miss_count"] += 1
+        if callback is not None:
+            self._callbacks.append(callback)
+        if self._timer is not None:
+            self._timer.kill(block=False)
+        self._timer = gevent.spawn_later(self.delay, self._grab)
+        return self._snapshot
+
+    def get_current_snapshot(self):
+        """Returns the snapshot of the current sample view, grabbed now
+           if it is not cached
+        """
+        key = self.get_key()
+        if key is not None and key == self._key:
+            self.statistics["hit_count"] += 1
+            return self._snapshot
+        self.statistics["miss_count"] += 1
+        return self._grab()
+
+    def _grab(self):
+        if self._timer is not None and self._timer is not gevent.getcurrent():
+            self._timer.kill(block=False)
+        self._timer = None
+        callbacks = self._callbacks
+        self._callbacks = []
+
+        try:
+            snapshot = self.grab_function()
+        except Exception:
+            logging.getLogger("HWR").exception("Unable to grab a snapshot")
+            snapshot = None
+            self._key = None
+        else:
+            self.statistics["grab_count"] += 1
+            self._key = self.get_key()
+        self._snapshot = snapshot
+
+        for callback in callbacks:
+            callback(snapshot)
+        return snapshot
+
+    def clear(self):
+        """Drops the cached snapshot and pending requests"""
+        if self._timer is not None:
+            self._timer.kill(block=False)
+            self._timer = None
+        self._callbacks = []
+        self._key = None
+        self._snapshot = None
+
+
+SNAPSHOT_CACHE = SnapshotCache()
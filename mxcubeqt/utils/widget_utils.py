@@ -17,6 +17,11 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import time
+import weakref
+
+import gevent
 
 from mxcubeqt.utils import colors, qt_import
 from mxcubecore.dispatcher import dispatcher
@@ -27,6 +32,150 @@ __credits__ = ["MXCuBE collaboration"]
 __license__ = "LGPLv3+"
 
 
+# Edits done within VALIDATION_DELAY ms are validated together
+VALIDATION_DELAY = 150
+# Results of file system checks are reused during PATH_CHECK_TTL seconds
+PATH_CHECK_TTL = 5.0
+
+
+class ValidationScheduler(object):
+    """Coalesces edits done within a short time window.
+
+       Each call of schedule() restarts a single shot timer. When the timer
+       expires callback is called once. Callbacks validate the whole
+       model, so listeners always get the complete list of conflicts.
+    """
+
+    def __init__(self, parent, callback, delay=VALIDATION_DELAY):
+        self._callback = callback
+        self._timer = qt_import.QTimer(parent)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.flush)
+
+    def schedule(self):
+        self._timer.start()
+
+    def is_pending(self):
+        return self._timer.isActive()
+
+    def flush(self):
+        """Runs the pending validation immediately"""
+        self._timer.stop()
+        self._callback()
+
+    def cancel(self):
+        self._timer.stop()
+
+
+class PathExistsCache(object):
+    """Caches os.path.exists results.
+
+       Checks are done in the gevent thread pool, so a slow or hanging
+       file system does not block the GUI. get() returns the last known
+       result and callbacks are called from the gevent loop when a check
+       is done.
+    """
+
+    def __init__(self, ttl=PATH_CHECK_TTL):
+        self.ttl = ttl
+        # Key - path, value - (check time, exists)
+        self._results = {}
+        # Key - path being checked, value - list of callbacks
+        self._pending = {}
+
+    def get(self, path, callback=None):
+        """Returns True or False if the path is known to exist or not,
+           None if the path has not been checked yet. If the result is
+           unknown or outdated a check is started and callback(exists)
+           is called when it is done.
+        """
+        cached = self._results.get(path)
+        if cached is not None and time.time() - cached[0] < self.ttl:
+            return cached[1]
+
+        callbacks = self._pending.get(path)
+        if callbacks is None:
+            callbacks = self._pending[path] = []
+            result = gevent.get_hub().threadpool.spawn(os.path.exists, path)
+            result.rawlink(lambda async_result: self._path_checked(path, async_result))
+        if callback is not None:
+            callbacks.append(callback)
+
+        if cached is not None:
+            return cached[1]
+
+    def clear(self):
+        self._results.clear()
+
+    def _path_checked(self, path, async_result):
+        exists = bool(async_result.successful() and async_result.value)
+        self._results[path] = (time.time(), exists)
+        for callback in self._pending.pop(path, ()):
+            callback(exists)
+
+
+PATH_EXISTS_CACHE = PathExistsCache()
+
+
+class ModelUpdateRegistry(object):
+    """Routes model_update signals only to the binders of the updated model.
+
+       The registry is the only receiver of model_update connected to the
+       dispatcher for all binders, so the cost of an update does not depend
+       on the number of binders. Binders are kept as weak references and
+       are detached when rebound to another model or destroyed.
+    """
+
+    def __init__(self):
+        # Key - id of the model, value - WeakSet of binders bound to it.
+        # Binders keep a reference to their model, so an id can not be
+        # reused while it has binders
+        self._binders = {}
+        self._connected = False
+        self.dispatch_count = 0
+
+    def attach(self, binder, model):
+        if not self._connected:
+            dispatcher.connect(self._model_updated, "model_update", dispatcher.Any)
+            self._connected = True
+        self._binders.setdefault(id(model), weakref.WeakSet()).add(binder)
+
+    def detach(self, binder, model):
+        binders = self._binders.get(id(model))
+        if binders is not None:
+            binders.discard(binder)
+            if not binders:
+                del self._binders[id(model)]
+
+    def get_binders(self, model):
+        """Returns binders currently bound to the model"""
+        return list(self._binders.get(id(model), ()))
+
+    def get_binder_count(self):
+        """Returns the number of living binders"""
+        return sum(len(binders) for binders in self._binders.values())
+
+    def get_model_count(self):
+        self._remove_empty()
+        return len(self._binders)
+
+    def _remove_empty(self):
+        for model_id in [key for key, value in self._binders.items() if not value]:
+            del self._binders[model_id]
+
+    def _model_updated(self, field_name, data_binder, sender=None):
+        binders = self._binders.get(id(sender))
+        if not binders:
+            return
+        self.dispatch_count += 1
+        for binder in list(binders):
+            binder._update_widget(field_name, data_binder)
+
+
+MODEL_UPDATE_REGISTRY = ModelUpdateRegistry()
+
+
 class DataModelInputBinder(object):
     def __init__(self, obj):
         object.__init__(self)
@@ -35,7 +184,9 @@ class DataModelInputBinder(object):
         # Key - field name/attribute name of the persistant object.
         # Value - The tuple (widget, validator, type_fn)
         self.bindings = {}
-        dispatcher.connect(self._update_widget, "model_update", dispatcher.Any)
+        # Key - field name, value - (validation key, result), see validate_all
+        self._validation_cache = {}
+        MODEL_UPDATE_REGISTRY.attach(self, obj)
 
     def __checkbox_update_value(self, field_name, new_value):
         setattr(self.__model, field_name, new_value)
@@ -89,6 +240,20 @@ class DataModelInputBinder(object):
                 dispatcher.send("model_update", self.__model, field_name, self)
 
     def __validated(self, field_name, validator, widget, new_value):
+        result = self.__validate(field_name, validator, widget, new_value)
+        self._validation_cache[field_name] = (
+            self.__get_validation_key(field_name, validator, new_value),
+            result,
+        )
+        return result
+
+    def __get_validation_key(self, field_name, validator, value):
+        if validator:
+            return (str(value), validator.bottom(), validator.top(),
+                    self.bindings[field_name][3])
+        return (str(value), None, None, self.bindings[field_name][3])
+
+    def __validate(self, field_name, validator, widget, new_value):
         if validator:
             try:
                 flt_value = float(new_value)
@@ -130,11 +295,18 @@ class DataModelInputBinder(object):
         return self.__model
 
     def set_model(self, obj):
+        MODEL_UPDATE_REGISTRY.detach(self, self.__model)
         self.__model = obj
+        MODEL_UPDATE_REGISTRY.attach(self, obj)
         self.init_bindings()
         self.clear_edit()
+        self._validation_cache.clear()
         self.validate_all()
 
+    def destroy(self):
+        """Stops receiving updates of the model"""
+        MODEL_UPDATE_REGISTRY.detach(self, self.__model)
+
     def init_bindings(self):
         for field_name in self.bindings.keys():
             self._update_widget(field_name, None)
@@ -231,6 +403,10 @@ class DataModelInputBinder(object):
             widget.setToolTip(tooltip)
 
     def validate_all(self):
+        """Returns names of fields with invalid values. Only fields whose
+           text, validator limits or edit state changed since their last
+           validation are validated again.
+        """
         result = []
 
         for item in self.bindings.items():
@@ -240,7 +416,14 @@ class DataModelInputBinder(object):
 
             # if validator:
             if isinstance(widget, qt_import.QLineEdit):
-                if not self.__validated(key, validator, widget, widget.text()):
+                text = widget.text()
+                cached = self._validation_cache.get(key)
+                if cached is not None and cached[0] == \
+                        self.__get_validation_key(key, validator, text):
+                    valid = cached[1]
+                else:
+                    valid = self.__validated(key, validator, widget, text)
+                if not valid:
                     result.append(key)
             elif isinstance(widget, qt_import.QComboBox):
                 pass
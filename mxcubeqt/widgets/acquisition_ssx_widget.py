@@ -20,7 +20,7 @@
 """AcquisitionSsxWidget is customized for ssx type acquisitions"""
 
 from mxcubeqt.utils import qt_import
-from mxcubeqt.utils.widget_utils import DataModelInputBinder
+from mxcubeqt.utils.widget_utils import DataModelInputBinder, ValidationScheduler
 
 from mxcubecore.HardwareObjects import queue_model_objects
 
@@ -82,6 +82,9 @@ class AcquisitionSsxWidget(qt_import.QWidget):
             self._path_template = path_template
 
         self._acquisition_mib = DataModelInputBinder(self._acquisition_parameters)
+        self._acq_parameters_scheduler = ValidationScheduler(
+            self, self._validate_acq_parameters
+        )
 
         self.acq_widget_layout = qt_import.load_ui_file(
             "acquisition_widget_vertical_ssx_layout.ui"
@@ -480,7 +483,15 @@ class AcquisitionSsxWidget(qt_import.QWidget):
 
     def emit_acq_parameters_changed(self):
         """
-        Emits acqParametersChangedSignal
+        Emits acqParametersChangedSignal once edits done within a short
+        time window have been validated
+        :return: None
+        """
+        self._acq_parameters_scheduler.schedule()
+
+    def _validate_acq_parameters(self):
+        """
+        Validates parameters and emits acqParametersChangedSignal
         :return: None
         """
         self.acqParametersChangedSignal.emit(self._acquisition_mib.validate_all())
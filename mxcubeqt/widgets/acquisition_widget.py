@@ -18,7 +18,7 @@
 #  along with MXCuBE.  If not, see <http://www.gnu.org/licenses/>.
 
 from mxcubeqt.utils import qt_import
-from mxcubeqt.utils.widget_utils import DataModelInputBinder
+from mxcubeqt.utils.widget_utils import DataModelInputBinder, ValidationScheduler
 from mxcubecore.HardwareObjects import queue_model_objects
 
 from mxcubecore import HardwareRepository as HWR
@@ -80,6 +80,9 @@ class AcquisitionWidget(qt_import.QWidget):
             self._path_template = path_template
 
         self._acquisition_mib = DataModelInputBinder(self._acquisition_parameters)
+        self._acq_parameters_scheduler = ValidationScheduler(
+            self, self._validate_acq_parameters
+        )
 
         if layout == "horizontal":
             self.acq_widget_layout = qt_import.load_ui_file(
@@ -782,4 +785,8 @@ class AcquisitionWidget(qt_import.QWidget):
         return self._acquisition_mib.validate_all()
 
     def emit_acq_parameters_changed(self):
+        """Edits done within a short time window are validated together"""
+        self._acq_parameters_scheduler.schedule()
+
+    def _validate_acq_parameters(self):
         self.acqParametersChangedSignal.emit(self._acquisition_mib.validate_all())
@@ -107,9 +107,11 @@ class AdvancedParametersWidget(qt_import.QWidget):
         self._acq_widget.setEnabled(not executed)
         self._data_path_widget.setEnabled(not executed)
 
-        self._acquisition_mib = DataModelInputBinder(
-            self._data_collection.acquisitions[0].acquisition_parameters
-        )
+        acquisition_parameters = data_collection.acquisitions[0].acquisition_parameters
+        if self._acquisition_mib is None:
+            self._acquisition_mib = DataModelInputBinder(acquisition_parameters)
+        else:
+            self._acquisition_mib.set_model(acquisition_parameters)
 
         # The acq_widget sends a signal to the path_widget, and it relies
         # on that both models upto date, we need to refactor this part
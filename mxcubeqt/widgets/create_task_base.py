@@ -23,6 +23,7 @@ import logging
 from copy import deepcopy
 
 from mxcubeqt.utils import queue_item, qt_import
+from mxcubeqt.utils.snapshot_cache import SNAPSHOT_CACHE
 from mxcubecore.HardwareObjects import (
     queue_model_objects,
     queue_model_enumerables,
@@ -35,6 +36,24 @@ __credits__ = ["MXCuBE collaboration"]
 __license__ = "LGPLv3+"
 
 
+def copy_acquisition_parameters(parameters):
+    """Returns a deep copy of the acquisition parameters. The snapshot image
+       of the centred position is shared instead of copied, as it is only
+       replaced and never modified
+    """
+    centred_position = getattr(parameters, "centred_position", None)
+    if centred_position is None:
+        return deepcopy(parameters)
+    snapshot_image = centred_position.snapshot_image
+    centred_position.snapshot_image = None
+    try:
+        parameters_copy = deepcopy(parameters)
+    finally:
+        centred_position.snapshot_image = snapshot_image
+    parameters_copy.centred_position.snapshot_image = snapshot_image
+    return parameters_copy
+
+
 class CreateTaskBase(qt_import.QWidget):
     """
     Base class for widgets that are used to create tasks.
@@ -72,6 +91,9 @@ class CreateTaskBase(qt_import.QWidget):
         self._current_selected_items = []
         self._path_template = None
         self._enable_compression = None
+        # Copies made by copy_models_on_write, see there
+        self._own_acquisition_parameters = None
+        self._own_path_template = None
 
         self._in_plate_mode = HWR.beamline.diffractometer.in_plate_mode()
         
@@ -209,13 +231,17 @@ class CreateTaskBase(qt_import.QWidget):
         self._data_path_widget.update_file_name()
         if self._tree_brick is not None:
             self._tree_brick.dc_tree_widget.check_for_path_collisions()
-            path_conflict = HWR.beamline.queue_model.check_for_path_collisions(
-                self._path_template
-            )
+            path_conflict = self.check_for_path_collisions(self._path_template)
             self._data_path_widget.indicate_path_conflict(path_conflict)
             self._tree_brick.data_path_changed(path_conflict)
             self.pathTempleConflictSignal.emit(path_conflict)
 
+    def check_for_path_collisions(self, path_template):
+        """Returns True if path_template collides with a queued task"""
+        if self._tree_brick is not None:
+            return self._tree_brick.dc_tree_widget.has_path_collision(path_template)
+        return HWR.beamline.queue_model.check_for_path_collisions(path_template)
+
     def set_tree_brick(self, brick):
         self._tree_brick = brick
 
@@ -402,6 +428,34 @@ class CreateTaskBase(qt_import.QWidget):
     def update_selection(self):
         self.selection_changed(self._current_selected_items)
 
+    def copy_models_on_write(self):
+        """Copies the path template and acquisition parameters before they
+           are modified for a selected sample or basket. Selecting a task
+           binds the widgets to the objects of the task, these are copied.
+           Copies already made here are not shared with tasks (tasks get
+           their own copies in _create_acq), so they are reused while
+           browsing samples and baskets.
+        """
+        if self._path_template is not self._own_path_template:
+            self._path_template = deepcopy(self._path_template)
+            self._own_path_template = self._path_template
+        if self._acquisition_parameters is not self._own_acquisition_parameters:
+            self._acquisition_parameters = copy_acquisition_parameters(
+                self._acquisition_parameters
+            )
+            self._own_acquisition_parameters = self._acquisition_parameters
+
+    def update_snapshot(self):
+        """Sets the snapshot of the sample view to the acquisition
+           parameters, from the snapshot cache or when it is grabbed
+        """
+        parameters = self._acquisition_parameters
+
+        def set_snapshot(snapshot):
+            parameters.centred_position.snapshot_image = snapshot
+
+        set_snapshot(SNAPSHOT_CACHE.get_snapshot(set_snapshot))
+
     def single_item_selection(self, tree_item):
         sample_item = self.get_sample_item(tree_item)
         if self._data_path_widget:
@@ -409,13 +463,8 @@ class CreateTaskBase(qt_import.QWidget):
 
         if isinstance(tree_item, queue_item.SampleQueueItem):
             sample_data_model = sample_item.get_model()
-            self._path_template = deepcopy(self._path_template)
-
-            self._acquisition_parameters.centred_position.snapshot_image = None
-            self._acquisition_parameters = deepcopy(self._acquisition_parameters)
-            self._acquisition_parameters.centred_position.snapshot_image = (
-                HWR.beamline.sample_view.get_snapshot()
-            )
+            self.copy_models_on_write()
+            self.update_snapshot()
 
             # Sample with lims information, use values from lims
             # to set the data path. Or has a specific user group set.
@@ -474,8 +523,7 @@ class CreateTaskBase(qt_import.QWidget):
             self.setDisabled(False)
 
         elif isinstance(tree_item, queue_item.BasketQueueItem):
-            self._path_template = deepcopy(self._path_template)
-            self._acquisition_parameters = deepcopy(self._acquisition_parameters)
+            self.copy_models_on_write()
             # (data_directory, proc_directory) = self.get_default_directory(tree_item)
             # self._path_template.directory = data_directory
             # self._path_template.process_directory = proc_directory
@@ -601,9 +649,7 @@ class CreateTaskBase(qt_import.QWidget):
     def approve_creation(self):
         result = True
 
-        path_conflict = HWR.beamline.queue_model.check_for_path_collisions(
-            self._path_template
-        )
+        path_conflict = self.check_for_path_collisions(self._path_template)
 
         if path_conflict:
             logging.getLogger("GUI").error(
@@ -825,7 +871,7 @@ class CreateTaskBase(qt_import.QWidget):
         parameters.centred_position.snapshot_image = None
         acq.acquisition_parameters = deepcopy(parameters)
         self._acquisition_parameters.centred_position.snapshot_image = (
-            HWR.beamline.sample_view.get_snapshot()
+            SNAPSHOT_CACHE.get_current_snapshot()
         )
         acq.acquisition_parameters.collect_agent = (
             queue_model_enumerables.COLLECTION_ORIGIN.MXCUBE
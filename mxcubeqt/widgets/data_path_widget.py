@@ -22,7 +22,11 @@ import string
 import logging
 
 from mxcubeqt.utils import colors, qt_import
-from mxcubeqt.utils.widget_utils import DataModelInputBinder
+from mxcubeqt.utils.widget_utils import (
+    DataModelInputBinder,
+    ValidationScheduler,
+    PATH_EXISTS_CACHE,
+)
 
 from mxcubecore.HardwareObjects import queue_model_objects
 
@@ -57,6 +61,11 @@ class DataPathWidget(qt_import.QWidget):
             self._data_model = data_model
 
         self._data_model_pm = DataModelInputBinder(self._data_model)
+        # Path template is validated by the listeners of
+        # pathTemplateChangedSignal, so edits are coalesced before emitting it
+        self._path_changed_scheduler = ValidationScheduler(
+            self, self._emit_path_template_changed
+        )
 
         # Graphic elements ----------------------------------------------------
         if layout == "vertical":
@@ -150,7 +159,7 @@ class DataPathWidget(qt_import.QWidget):
 
         self._data_model.base_prefix = str(new_value)
         self.update_file_name()
-        self.pathTemplateChangedSignal.emit()
+        self._path_changed_scheduler.schedule()
 
     def _run_number_ledit_change(self, new_value):
         if str(new_value).isdigit():
@@ -158,7 +167,7 @@ class DataPathWidget(qt_import.QWidget):
             self.data_path_layout.run_number_ledit.setText(str(new_value))
 
             self.update_file_name()
-            self.pathTemplateChangedSignal.emit()
+            self._path_changed_scheduler.schedule()
         else:
             # self.data_path_layout.run_number_ledit.setText(str(self._data_model.run_number))
             colors.set_widget_color(
@@ -197,7 +206,7 @@ class DataPathWidget(qt_import.QWidget):
         self._data_model.process_directory = new_proc_dir
         colors.set_widget_color(self.data_path_layout.folder_ledit, colors.WHITE)
 
-        self.pathTemplateChangedSignal.emit()
+        self._path_changed_scheduler.schedule()
 
     def _compression_toggled(self, state):
         if hasattr(self.parent, "_tree_brick"):
@@ -207,8 +216,16 @@ class DataPathWidget(qt_import.QWidget):
         queue_model_objects.Characterisation.set_char_compression(state)
         self._data_model.compression = state
         self.update_file_name()
+        self._path_changed_scheduler.schedule()
+
+    def _emit_path_template_changed(self):
         self.pathTemplateChangedSignal.emit()
 
+    def flush_path_template_changed(self):
+        """Emits a pending pathTemplateChangedSignal immediately"""
+        if self._path_changed_scheduler.is_pending():
+            self._path_changed_scheduler.flush()
+
     def update_file_name(self):
         """
         updates filename if prefix or run number changed
@@ -269,10 +286,20 @@ class DataPathWidget(qt_import.QWidget):
         self.data_path_layout.file_name_value_label.setText(file_name)
 
     def update_data_model(self, data_model):
+        # Edits of the previous model are validated with the previous model
+        self.flush_path_template_changed()
         self._data_model = data_model
         self.set_data_path(data_model.get_image_path())
         self._data_model_pm.set_model(data_model)
-        self.data_path_layout.browse_button.setEnabled(os.path.exists(self._base_image_dir))
+
+        base_image_dir_exists = PATH_EXISTS_CACHE.get(
+            self._base_image_dir, self._base_image_dir_checked
+        )
+        if base_image_dir_exists is not None:
+            self.data_path_layout.browse_button.setEnabled(base_image_dir_exists)
+
+    def _base_image_dir_checked(self, exists):
+        self.data_path_layout.browse_button.setEnabled(exists)
 
     def indicate_path_conflict(self, conflict):
         if conflict:
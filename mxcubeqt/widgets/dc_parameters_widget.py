@@ -102,8 +102,6 @@ class DCParametersWidget(qt_import.QWidget):
         # TODO  get tree view in another way
         dc_tree_widget = self._tree_view_item.listView().parent().parent()
         dc_tree_widget.check_for_path_collisions()
-        path_template = self._data_collection.acquisitions[0].path_template
-        HWR.beamline.queue_model.check_for_path_collisions(path_template)
 
     def mad_energy_selected(self, name, energy, state):
         path_template = self._data_collection.acquisitions[0].path_template
@@ -132,9 +130,11 @@ class DCParametersWidget(qt_import.QWidget):
         data_collection = item.get_model()
         self._tree_view_item = item
         self._data_collection = data_collection
-        self._acquisition_mib = DataModelInputBinder(
-            self._data_collection.acquisitions[0].acquisition_parameters
-        )
+        acquisition_parameters = data_collection.acquisitions[0].acquisition_parameters
+        if self._acquisition_mib is None:
+            self._acquisition_mib = DataModelInputBinder(acquisition_parameters)
+        else:
+            self._acquisition_mib.set_model(acquisition_parameters)
 
         # The acq_widget sends a signal to the path_widget, and it relies
         # on that both models upto date, we need to refactor this part
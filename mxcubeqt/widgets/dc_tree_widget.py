@@ -25,13 +25,16 @@ import os
 import time
 
 import logging
+from contextlib import contextmanager
 import gevent
 import jsonpickle
 import webbrowser
 from datetime import datetime
 from collections import namedtuple
 
-from mxcubeqt.utils import colors, icons, queue_item, qt_import
+from mxcubeqt.utils import colors, icons, queue_file, queue_item, qt_import
+from mxcubeqt.utils.history_journal import HistoryJournal
+from mxcubeqt.utils.path_collision_index import PathCollisionIndex
 from mxcubeqt.widgets.confirm_dialog import ConfirmDialog
 from mxcubeqt.widgets.plate_navigator_widget import PlateNavigatorWidget
 
@@ -55,6 +58,12 @@ SCFilterOptions = namedtuple('SCFilterOptions',
 SC_FILTER_OPTIONS = SCFilterOptions(0, 1, 2, 3)
 
 
+# Days of history shown when the history is loaded, older days are
+# loaded when their item is expanded
+HISTORY_DAYS_LOADED = 3
+HISTORY_JOURNAL_FILENAME = "queue_history.jsonl"
+
+
 class DataCollectTree(qt_import.QWidget):
 
     enableCollectSignal = qt_import.pyqtSignal(bool)
@@ -71,6 +80,8 @@ class DataCollectTree(qt_import.QWidget):
         self.enable_collect_condition = False
         self.collecting = False
         self.sample_mount_method = 0
+        # Name of the selected queue model (ispyb, plate or free-pin)
+        self.queue_model_name = None
         self.centring_method = 0
         self.sample_centring_result = gevent.event.AsyncResult()
         self.tree_brick = self.parent()
@@ -78,6 +89,14 @@ class DataCollectTree(qt_import.QWidget):
         self.user_stopped = False
         self.last_added_item = None
         self.item_copy = None
+        # Key - id of the queue model node, value - QueueItem
+        self.model_item_index = {}
+        self.path_collision_index = PathCollisionIndex()
+        # Incremented when items are added to or removed from the index
+        self.item_index_version = 0
+        # Nesting level of bulk updates, see begin_bulk_update
+        self.bulk_update_level = 0
+        self.bulk_update_save_pending = False
 
         self.selection_changed_cb = None
         self.collect_stop_cb = None
@@ -85,6 +104,13 @@ class DataCollectTree(qt_import.QWidget):
         self.run_cb = None
         self.item_menu = None
         self.item_history_list = []
+        self.history_journal = None
+        # Key - date, value - date item of the history tree
+        self.history_date_items = {}
+        # Key - (date, hour), value - hour item of the history tree
+        self.history_hour_items = {}
+        # Dates of the journal not yet loaded in the history tree
+        self.history_unloaded_dates = set()
         self.close_kappa = False
         self.show_sc_during_mount = True
 
@@ -141,6 +167,9 @@ class DataCollectTree(qt_import.QWidget):
         self.sample_tree_widget = qt_import.QTreeWidget(self.tree_splitter)
         self.history_tree_widget = qt_import.QTreeWidget(self.tree_splitter)
         self.history_tree_widget.setHidden(True)
+        self.history_resize_timer = qt_import.QTimer(self)
+        self.history_resize_timer.setSingleShot(True)
+        self.history_resize_timer.setInterval(200)
         self.history_enable_cbox = qt_import.QCheckBox("Queue history", self)
         self.history_enable_cbox.setChecked(False)
 
@@ -195,6 +224,10 @@ class DataCollectTree(qt_import.QWidget):
         #     connect(self.history_table_double_click)
         self.history_enable_cbox.stateChanged.\
             connect(self.history_tree_widget.setVisible)
+        self.history_tree_widget.itemExpanded.connect(
+            self.history_item_expanded)
+        self.history_resize_timer.timeout.connect(
+            self.resize_history_columns)
 
         self.plate_navigator_cbox.stateChanged.\
             connect(self.use_plate_navigator)
@@ -624,18 +657,47 @@ class DataCollectTree(qt_import.QWidget):
     def get_item_by_model(self, parent_node):
         """Returns tree item by its model
         """
-        it = qt_import.QTreeWidgetItemIterator(self.sample_tree_widget)
-        item = it.value()
-
-        while item:
-            if item.get_model() is parent_node:
-                return item
-
-            it += 1
-            item = it.value()
-
+        item = self.model_item_index.get(id(parent_node))
+        if item is not None and item.get_model() is parent_node:
+            return item
         return self.sample_tree_widget
 
+    def get_indexed_items(self, item_class=queue_item.QueueItem):
+        """Returns a list of tree items of the given class,
+           in the order they were added to the tree
+        """
+        return [
+            item
+            for item in self.model_item_index.values()
+            if isinstance(item, item_class)
+        ]
+
+    def index_item(self, item):
+        """Adds tree item to the model index and its path template
+           to the path collision index
+        """
+        model = item.get_model()
+        self.model_item_index[id(model)] = item
+        self.item_index_version += 1
+        self.path_collision_index.add(model, model.get_path_template())
+
+    def unindex_item(self, item):
+        """Removes tree item and all its children from the model index"""
+        for index in range(item.childCount()):
+            self.unindex_item(item.child(index))
+        model = item.get_model()
+        if self.model_item_index.get(id(model)) is item:
+            del self.model_item_index[id(model)]
+            self.item_index_version += 1
+            self.path_collision_index.remove(model)
+
+    def clear_tree(self):
+        """Removes all items from the tree"""
+        self.sample_tree_widget.clear()
+        self.model_item_index.clear()
+        self.path_collision_index.clear()
+        self.item_index_version += 1
+
     def last_top_level_item(self):
         """Returns the last top level item"""
         last_child_index = self.sample_tree_widget.topLevelItemCount() - 1
@@ -665,22 +727,62 @@ class DataCollectTree(qt_import.QWidget):
             view_item.setExpanded(True)
 
         HWR.beamline.queue_model.view_created(view_item, task)
-        # self.sample_tree_widget_selection()
-        self.toggle_collect_button_enabled()
-
+        self.index_item(view_item)
         self.last_added_item = view_item
 
-        if isinstance(view_item, queue_item.TaskQueueItem) and \
-                self.samples_initialized:
-            self.tree_brick.auto_save_queue()
+        if self.bulk_update_level > 0:
+            if isinstance(view_item, queue_item.TaskQueueItem):
+                self.bulk_update_save_pending = True
+        else:
+            # self.sample_tree_widget_selection()
+            self.toggle_collect_button_enabled()
 
-        #for col in range(2):
-        self.sample_tree_widget.resizeColumnToContents(0)
+            if isinstance(view_item, queue_item.TaskQueueItem) and \
+                    self.samples_initialized:
+                self.tree_brick.auto_save_queue(task)
+
+            #for col in range(2):
+            self.sample_tree_widget.resizeColumnToContents(0)
 
         if isinstance(task, queue_model_objects.DataCollection):
             view_item.init_tool_tip()
             view_item.init_processing_info()
 
+    def begin_bulk_update(self):
+        """Starts a bulk update. Until the matching end_bulk_update
+           added items are not painted and column resize, collect button
+           update, path collision check and queue autosave are postponed.
+           Bulk updates can be nested.
+        """
+        if self.bulk_update_level == 0:
+            self.bulk_update_save_pending = False
+            self.sample_tree_widget.setUpdatesEnabled(False)
+        self.bulk_update_level += 1
+
+    def end_bulk_update(self):
+        """Ends a bulk update and applies postponed updates once"""
+        self.bulk_update_level -= 1
+        if self.bulk_update_level > 0:
+            return
+
+        self.sample_tree_widget.setUpdatesEnabled(True)
+        self.sample_tree_widget.resizeColumnToContents(0)
+        self.check_for_path_collisions()
+        self.toggle_collect_button_enabled()
+
+        if self.bulk_update_save_pending and self.samples_initialized:
+            self.tree_brick.auto_save_queue()
+        self.bulk_update_save_pending = False
+
+    @contextmanager
+    def bulk_update(self):
+        """Context manager wrapping begin_bulk_update/end_bulk_update"""
+        self.begin_bulk_update()
+        try:
+            yield self
+        finally:
+            self.end_bulk_update()
+
     def get_selected_items(self):
         """Return a list with selected items"""
         items = self.sample_tree_widget.selectedItems()
@@ -744,15 +846,9 @@ class DataCollectTree(qt_import.QWidget):
 
     def get_mounted_sample_item(self):
         """Returns mounted sample item"""
-        it = qt_import.QTreeWidgetItemIterator(self.sample_tree_widget)
-        item = it.value()
-
-        while item:
-            if isinstance(item, queue_item.SampleQueueItem):
-                if item.mounted_style:
-                    return item
-            it += 1
-            item = it.value()
+        for item in self.get_indexed_items(queue_item.SampleQueueItem):
+            if item.mounted_style:
+                return item
 
     def get_checked_samples(self):
         res_list = []
@@ -767,12 +863,12 @@ class DataCollectTree(qt_import.QWidget):
         self.confirm_dialog.set_plate_mode(False)
         self.sample_mount_method = option
         if option == SC_FILTER_OPTIONS.SAMPLE_CHANGER:
-            self.sample_tree_widget.clear()
-            HWR.beamline.queue_model.select_model('ispyb')
+            self.clear_tree()
+            self.select_queue_model('ispyb')
             self.set_sample_pin_icon()
         elif option == SC_FILTER_OPTIONS.PLATE:
-            self.sample_tree_widget.clear()
-            HWR.beamline.queue_model.select_model('plate')
+            self.clear_tree()
+            self.select_queue_model('plate')
             self.set_sample_pin_icon()
         elif option == SC_FILTER_OPTIONS.MOUNTED_SAMPLE:
             loaded_sample_loc = None
@@ -789,29 +885,29 @@ class DataCollectTree(qt_import.QWidget):
                     loaded_sample_loc = loaded_sample.getCoords()
                 except BaseException:
                     pass
-            it = qt_import.QTreeWidgetItemIterator(self.sample_tree_widget)
-            item = it.value()
-
-            while item:
-                if isinstance(item, queue_item.SampleQueueItem):
-                    # TODO fix this to actual plate sample!!!
-                    if item.get_model().location == loaded_sample_loc:
-                        item.setSelected(True)
-                        item.setHidden(False)
-                    else:
-                        item.setHidden(True)
-
-                it += 1
-                item = it.value()
+            for item in self.get_indexed_items(queue_item.SampleQueueItem):
+                # TODO fix this to actual plate sample!!!
+                if item.get_model().location == loaded_sample_loc:
+                    item.setSelected(True)
+                    item.setHidden(False)
+                else:
+                    item.setHidden(True)
 
             self.hide_empty_baskets()
 
         elif option == SC_FILTER_OPTIONS.FREE_PIN:
-            self.sample_tree_widget.clear()
-            HWR.beamline.queue_model.select_model('free-pin')
+            self.clear_tree()
+            self.select_queue_model('free-pin')
             self.set_sample_pin_icon()
         self.sample_tree_widget_selection()
 
+    def select_queue_model(self, name):
+        """Selects the queue model name, the tree is filled with its
+           nodes
+        """
+        HWR.beamline.queue_model.select_model(name)
+        self.queue_model_name = name
+
     def set_centring_method(self, method_number):
         """Sets centring method"""
         self.centring_method = method_number
@@ -1037,26 +1133,47 @@ class DataCollectTree(qt_import.QWidget):
 
     def add_history_entry(self, sample_name, date, time, entry_type,
                           status, entry_details, view_item=None):
-        # At the top level insert date
-        date_item = None
-        for item_index in range(self.history_tree_widget.topLevelItemCount()):
-            if self.history_tree_widget.topLevelItem(item_index).text(0) == date:
-                date_item = self.history_tree_widget.topLevelItem(item_index)
-                break
-        if not date_item:
+        """Adds executed entry to the history view and to the journal"""
+        entry = (sample_name, date, time, entry_type, status, entry_details)
+        journal = self.get_history_journal()
+        if journal is not None:
+            try:
+                journal.append(entry)
+            except (IOError, OSError):
+                logging.getLogger("GUI").exception(
+                    "Cannot write history journal %s", journal.filename)
+        if date in self.history_unloaded_dates:
+            self.load_history_day(date)
+        self.add_history_view_entry(*entry)
+        self.item_history_list.append(entry)
+
+    def get_history_date_item(self, date, load_later=False):
+        """Returns the top level item of a date, created if needed"""
+        date_item = self.history_date_items.get(date)
+        if date_item is None:
             date_item = qt_import.QTreeWidgetItem()
             date_item.setText(0, date)
             self.history_tree_widget.insertTopLevelItem(0, date_item)
+            self.history_date_items[date] = date_item
+            if load_later:
+                date_item.setChildIndicatorPolicy(
+                    qt_import.QTreeWidgetItem.ShowIndicator)
+                self.history_unloaded_dates.add(date)
+        return date_item
+
+    def add_history_view_entry(self, sample_name, date, time, entry_type,
+                               status, entry_details):
+        """Adds one entry to the history view"""
+        # At the top level insert date
+        date_item = self.get_history_date_item(date)
 
-        time_item = None
-        for item_index in range(date_item.childCount()):
-            if date_item.child(item_index).text(0) == time.split(":")[0] + "h":
-                time_item = date_item.child(item_index)
-
+        hour = time.split(":")[0] + "h"
+        time_item = self.history_hour_items.get((date, hour))
         if not time_item:
             time_item = qt_import.QTreeWidgetItem()
-            time_item.setText(0, time.split(":")[0] + "h")
+            time_item.setText(0, hour)
             date_item.insertChild(0, time_item)
+            self.history_hour_items[(date, hour)] = time_item
 
         entry_item = qt_import.QTreeWidgetItem()
         entry_item.setText(0, time)
@@ -1071,19 +1188,27 @@ class DataCollectTree(qt_import.QWidget):
             entry_item.setBackground(3, qt_import.QBrush(colors.LIGHT_RED))
 
         time_item.insertChild(0, entry_item)
+        self.history_resize_timer.start()
 
+    def resize_history_columns(self):
         for col in range(1, 4):
             self.history_tree_widget.resizeColumnToContents(col)
-        """
-        self.history_tree_widget.setItem(0, 4, QTableWidgetItem(entry_details))
-        self.history_tree_widget.resizeRowsToContents()
-        self.history_tree_widget.resizeColumnsToContents()
-        self.history_tree_widget.setRowHeight(0, 17)
-        self.history_tree_widget.setVerticalHeaderItem(\
-             0, QTableWidgetItem(str(self.history_tree_widget.rowCount())))
-        """
-        self.item_history_list.append((sample_name, date, time, entry_type,
-                                       status, entry_details))
+
+    def load_history_day(self, date):
+        """Adds entries of a day from the journal to the history view"""
+        self.history_unloaded_dates.discard(date)
+        date_item = self.get_history_date_item(date)
+        date_item.setChildIndicatorPolicy(
+            qt_import.QTreeWidgetItem.DontShowIndicatorWhenChildless)
+        if self.history_journal is not None:
+            for entry in self.history_journal.read_day(date):
+                self.add_history_view_entry(*entry)
+
+    def history_item_expanded(self, item):
+        """Loads a day of the history when its item is expanded"""
+        date = str(item.text(0))
+        if item.parent() is None and date in self.history_unloaded_dates:
+            self.load_history_day(date)
 
     def queue_execution_completed(self, status):
         """Restores normal cursors, changes collect button
@@ -1176,6 +1301,7 @@ class DataCollectTree(qt_import.QWidget):
                     qe = item.get_queue_entry()
                     parent.get_queue_entry().dequeue(qe)
                     parent.takeChild(parent.indexOfChild(item))
+                    self.unindex_item(item)
 
                     if not parent.child(0):
                         parent.setOn(False)
@@ -1310,7 +1436,7 @@ class DataCollectTree(qt_import.QWidget):
     def populate_free_pin(self, sample=None):
         """Populates manualy mounted sample"""
         HWR.beamline.queue_model.clear_model('free-pin')
-        HWR.beamline.queue_model.select_model('free-pin')
+        self.select_queue_model('free-pin')
         if sample is None:
             sample = queue_model_objects.Sample()
             sample.set_name('manually-mounted')
@@ -1329,8 +1455,8 @@ class DataCollectTree(qt_import.QWidget):
 
         HWR.beamline.queue_manager.clear()
         HWR.beamline.queue_model.clear_model(mode_str)
-        self.sample_tree_widget.clear()
-        HWR.beamline.queue_model.select_model(mode_str)
+        self.clear_tree()
+        self.select_queue_model(mode_str)
 
         for basket_index, basket in enumerate(basket_list):
             HWR.beamline.queue_model.add_child(HWR.beamline.queue_model.get_model_root(), basket)
@@ -1344,23 +1470,21 @@ class DataCollectTree(qt_import.QWidget):
 
     def set_sample_pin_icon(self):
         """Updates sample icon"""
-        it = qt_import.QTreeWidgetItemIterator(self.sample_tree_widget)
-        item = it.value()
-
-        while item:
-            if self.is_mounted_sample_item(item):
-                item.setSelected(True)
-                item.set_mounted_style(True)
-                # self.sample_tree_widget.scrollTo(self.sample_tree_widget.\
-                #     indexFromItem(item))
-            elif isinstance(item, queue_item.SampleQueueItem):
-                item.set_mounted_style(False)
-
+        for item in self.get_indexed_items():
             if isinstance(item, queue_item.SampleQueueItem):
+                is_mounted = self.is_mounted_sample_item(item)
+                if is_mounted:
+                    item.setSelected(True)
+                    item.set_mounted_style(True)
+                    # self.sample_tree_widget.scrollTo(self.sample_tree_widget.\
+                    #     indexFromItem(item))
+                else:
+                    item.set_mounted_style(False)
+
                 if item.get_model().lims_location != (None, None):
                     # if item.get_model().diffraction_plan is not None:
                     #    item.setIcon(0, self.ispyb_diff_plan_icon)
-                    if not self.is_mounted_sample_item(item):
+                    if not is_mounted:
                         item.setIcon(0, self.ispyb_icon)
                     item.setText(0, item.get_model().get_display_name())
             elif isinstance(item, queue_item.BasketQueueItem):
@@ -1379,56 +1503,69 @@ class DataCollectTree(qt_import.QWidget):
                 """
 
             if item.has_star():
-                item.setIcon(0, icons.load_icon("star"))
-
-            it += 1
-            item = it.value()
+                item.setIcon(0, self.star_icon)
 
     def update_basket_selection(self):
-        it = qt_import.QTreeWidgetItemIterator(self.sample_tree_widget)
-        item = it.value()
-
-        while item:
-            if isinstance(item, queue_item.BasketQueueItem):
-                item.setExpanded(item.get_model().get_is_present() == True)
-                item.setDisabled(not item.get_model().get_is_present())
-            it += 1
-            item = it.value()
+        for item in self.get_indexed_items(queue_item.BasketQueueItem):
+            item.setExpanded(item.get_model().get_is_present() == True)
+            item.setDisabled(not item.get_model().get_is_present())
 
     def check_for_path_collisions(self):
-        """Checks for path conflicts"""
+        """Checks for path conflicts of checked items and marks
+           conflicting items with the caution icon
+        """
         conflict = False
-        it = qt_import.QTreeWidgetItemIterator(self.sample_tree_widget)
-        item = it.value()
+        checked_items = []
 
-        while item:
+        # Path templates are edited in place, so all entries of the path
+        # collision index are updated before it is queried
+        for item in self.model_item_index.values():
+            model = item.get_model()
+            pt = model.get_path_template()
+            if not pt:
+                self.path_collision_index.remove(model)
+                continue
+            self.path_collision_index.update(model, pt)
             if item.checkState(0) == qt_import.Qt.Checked:
-                pt = item.get_model().get_path_template()
-
-                if pt:
-                    path_conflict = HWR.beamline.queue_model.\
-                        check_for_path_collisions(pt)
-
-                    if path_conflict:
-                        conflict = True
-                        item.setIcon(0, self.caution_icon)
-                    else:
-                        if item.has_star():
-                            item.setIcon(0, self.star_icon)
-                        else:
-                            item.setIcon(0, qt_import.QIcon())
+                checked_items.append((item, pt))
 
-            it += 1
-            item = it.value()
+        for item, pt in checked_items:
+            if self.path_collision_index.has_collision(pt):
+                conflict = True
+                item.setIcon(0, self.caution_icon)
+            else:
+                if item.has_star():
+                    item.setIcon(0, self.star_icon)
+                else:
+                    item.setIcon(0, qt_import.QIcon())
 
         return conflict
 
+    def has_path_collision(self, path_template):
+        """Returns True if path_template collides with a path template
+           of the queue
+        """
+        return self.path_collision_index.has_collision(path_template)
+
     def select_last_added_item(self):
         """Selects last added item"""
         if self.last_added_item:
             self.sample_tree_widget.clearSelection()
             self.last_added_item.setSelected(True)
 
+    def set_items_hidden(self, item_visibility):
+        """Shows or hides items in one update of the tree.
+           item_visibility is a list of (item, hidden), only items
+           whose state changes are updated
+        """
+        self.sample_tree_widget.setUpdatesEnabled(False)
+        try:
+            for item, hidden in item_visibility:
+                if item.isHidden() != hidden:
+                    item.set_hidden(hidden)
+        finally:
+            self.sample_tree_widget.setUpdatesEnabled(True)
+
     def hide_empty_baskets(self):
         """Hides empty baskets after the tree filtering"""
         self.item_iterator = qt_import.QTreeWidgetItemIterator(
@@ -1599,58 +1736,142 @@ class DataCollectTree(qt_import.QWidget):
         return task_group_node
 
     def save_queue_in_file(self):
-        """Saves queue in the file"""
+        """Saves queue in the file. Files ending with .dat are saved
+           in the jsonpickle format of the queue model, others in the
+           streaming queue file format
+        """
         filename = str(qt_import.QFileDialog.getSaveFileName(
             self, "Choose a filename to save selected item",
             os.environ["HOME"]))
-        if not filename.endswith(".dat"):
-            filename += ".dat"
-        HWR.beamline.queue_model.save_queue(filename)
+        if not filename.endswith((".dat", queue_file.FILE_EXTENSION,
+                                  queue_file.FILE_EXTENSION + ".gz")):
+            filename += queue_file.FILE_EXTENSION
+        if filename.endswith(".dat"):
+            HWR.beamline.queue_model.save_queue(filename)
+        else:
+            queue_file.save_queue(
+                HWR.beamline.queue_model.get_model_root(), filename,
+                self.queue_model_name)
 
     def load_queue_from_file(self):
         """Loads queue from file"""
         filename = str(qt_import.QFileDialog.getOpenFileName(self,
                                                             "Open file", os.environ["HOME"],
-                                                            "Item file (*.dat)", "Choose queue file to open"))
+                                                            "Queue file (*.mxq *.mxq.gz *.dat)", "Choose queue file to open"))
         if len(filename) > 0:
-            self.sample_tree_widget.clear()
+            self.clear_tree()
+            if queue_file.is_queue_file(filename):
+                self.load_queue_file(filename)
+                return
             loaded_model = HWR.beamline.queue_model.load_queue(filename,
                                                              HWR.beamline.sample_view.get_snapshot())
             return loaded_model
 
+    def load_queue_file(self, filename):
+        """Loads a streaming queue file. As with .dat files the saved
+           queue model is selected and the task groups are added to the
+           samples with the same location. Nodes are shown in the tree
+           while the file is read
+        """
+        def show_progress(count):
+            self.end_bulk_update()
+            qt_import.QApplication.processEvents()
+            self.begin_bulk_update()
+
+        try:
+            model_name = queue_file.get_model_name(filename)
+            if model_name is None:
+                model_name = self.queue_model_name
+            if model_name is not None:
+                # Shows the samples of the model again
+                self.select_queue_model(model_name)
+
+            samples = {}
+            for node, parent in queue_file.iter_nodes(
+                    HWR.beamline.queue_model.get_model_root()):
+                if isinstance(node, queue_model_objects.Sample):
+                    samples[node.location] = node
+
+            with self.bulk_update():
+                task_group_nodes = queue_file.load_queue(
+                    filename, HWR.beamline.queue_model,
+                    progress_callback=show_progress, samples=samples)
+        except (queue_file.QueueFileError, KeyError) as ex:
+            logging.getLogger("GUI").error(
+                "Cannot load queue file %s: %s" % (filename, str(ex)))
+            return
+
+        # Snapshots are not saved in the file
+        snapshot = HWR.beamline.sample_view.get_snapshot()
+        for task_group_node in task_group_nodes:
+            for child in task_group_node.get_children():
+                child.set_snapshot(snapshot)
+
     def save_history_queue(self):
         pass
 
-    def save_history_in_file(self):
+    def get_history_journal(self):
+        """Returns the history journal of the user file directory,
+           opened at first use
+        """
+        if self.history_journal is None:
+            user_file_directory = getattr(
+                self.tree_brick, "user_file_directory", None)
+            if not user_file_directory:
+                return None
+            filename = os.path.join(user_file_directory,
+                                    HISTORY_JOURNAL_FILENAME)
+            try:
+                self.history_journal = HistoryJournal(filename)
+            except (IOError, OSError, ValueError):
+                logging.getLogger("GUI").exception(
+                    "Cannot open history journal %s", filename)
+                return None
+            self.import_history_file(journal=self.history_journal)
+        return self.history_journal
+
+    def import_history_file(self, journal):
+        """Moves entries of the jsonpickle history file to the journal"""
         filename = os.path.join(self.tree_brick.user_file_directory,
                                 "queue_history.dat")
-        save_file = None
+        if not os.path.exists(filename):
+            return
         try:
-            save_file = open(filename, 'w')
-            #items_to_save = []
-            # for item in self.item_history_list:
-            #    items_to_save.append(item.get_model())
-            # save_file.write(jsonpickle.encode(items_to_save))
-            save_file.write(jsonpickle.encode(self.item_history_list))
+            with open(filename, 'r') as load_file:
+                for item in jsonpickle.decode(load_file.read()):
+                    journal.append(item)
+            os.rename(filename, filename + ".imported")
         except BaseException:
-            logging.getLogger().exception("Cannot save file %s", filename)
-            if save_file:
-                save_file.close()
+            logging.getLogger().exception("Cannot import history file %s",
+                                          filename)
+
+    def save_history_in_file(self):
+        """Entries are written to the history journal when added,
+           nothing is left to save
+        """
+        pass
 
     def load_history_queue_from_file(self):
-        filename = os.path.join(self.tree_brick.user_file_directory,
-                                "queue_history.dat")
+        """Shows the history journal: last HISTORY_DAYS_LOADED days are
+           loaded, older days when they are expanded
+        """
+        journal = self.get_history_journal()
+        if journal is None:
+            return
 
-        load_file = None
+        dates = journal.get_dates()
+        recent_dates = set(dates[-HISTORY_DAYS_LOADED:])
+        self.history_tree_widget.setUpdatesEnabled(False)
         try:
-            load_file = open(filename, 'r')
-            for item in jsonpickle.decode(load_file.read()):
-                self.add_history_entry(*item)
-        except BaseException:
-            pass
+            for date in dates:
+                if date in self.history_date_items:
+                    continue
+                self.get_history_date_item(date, load_later=True)
+                if date in recent_dates:
+                    self.load_history_day(date)
         finally:
-            if load_file:
-                load_file.close()
+            self.history_tree_widget.setUpdatesEnabled(True)
+        self.resize_history_columns()
 
     def undo_queue(self):
         """Undo last change"""
@@ -21,6 +21,7 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 from mxcubeqt.utils import qt_import
 
@@ -34,6 +35,40 @@ __credits__ = ["MXCuBE collaboration"]
 __license__ = "LGPLv3+"
 
 
+# Number of points kept by a real time curve if max_plot_points is not set
+DEFAULT_STREAM_POINTS = 3600
+
+
+class RingBuffer(object):
+    """Fixed size buffer of floats. Values are written twice so that the
+       last values are always available as one contiguous array without
+       copying.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity)
+        self._start = 0
+        self.size = 0
+
+    def append(self, value):
+        end = (self._start + self.size) % self.capacity
+        self._data[end] = value
+        self._data[end + self.capacity] = value
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def clear(self):
+        self._start = 0
+        self.size = 0
+
+    def values(self):
+        """Returns a view on the values, oldest first"""
+        return self._data[self._start : self._start + self.size]
+
+
 class TwoAxisPlotWidget(qt_import.QWidget):
     def __init__(self, parent, realtime_plot=False):
 
@@ -178,15 +213,24 @@ class MplCanvas(FigureCanvas):
         FigureCanvas.updateGeometry(self)
 
         self.single_curve = None
+        self.single_fill = None
         self.real_time = None
-        self._axis_x_array = np.empty(0)
-        self._axis_y_array = np.empty(0)
         self._axis_x_limits = [None, None]
         self._axis_y_limits = [None, None]
 
+        # Real time curve: preallocated buffers and cached background
+        self._stream_x_buffer = None
+        self._stream_y_buffer = None
+        self._stream_index_array = None
+        self._stream_fill_xy = None
+        self._stream_background = None
+        self.init_stream_buffers(DEFAULT_STREAM_POINTS)
+
         self._curves_dict = {}
         self.setMaximumSize(2000, 2000)
 
+        self.mpl_connect("draw_event", self.on_draw_event)
+
     def refresh(self):
         self.axes.relim()
         self.axes.autoscale_view()
@@ -201,10 +245,27 @@ class MplCanvas(FigureCanvas):
 
     def set_max_plot_points(self, max_points):
         self.max_plot_points = max_points
+        self.init_stream_buffers(max_points or DEFAULT_STREAM_POINTS)
+
+    def init_stream_buffers(self, capacity):
+        """Allocates buffers used by append_new_point"""
+        self._stream_x_buffer = RingBuffer(capacity)
+        self._stream_y_buffer = RingBuffer(capacity)
+        self._stream_index_array = np.arange(capacity, dtype=float)
+        # Fill polygon: curve points closed by two points on the x axis
+        self._stream_fill_xy = np.zeros((capacity + 2, 2))
+        self._axis_x_limits = [None, None]
+        self._axis_y_limits = [None, None]
 
     def clear(self):
         self._curves_dict = {}
         self.single_curve = None
+        self.single_fill = None
+        self._stream_background = None
+        self._stream_x_buffer.clear()
+        self._stream_y_buffer.clear()
+        self._axis_x_limits = [None, None]
+        self._axis_y_limits = [None, None]
         self.axes.cla()
         self.axes.grid(True)
 
@@ -284,42 +345,105 @@ class MplCanvas(FigureCanvas):
         self.fig.canvas.draw()
 
     def append_new_point(self, y, x=None):
-        self._axis_y_array = np.append(self._axis_y_array, y)
+        """Appends a point to the real time curve.
+           Points are kept in ring buffers of max_plot_points values.
+           The curve and its fill are animated artists drawn over a cached
+           background: the whole figure is only redrawn when the axes
+           limits have to change.
+        """
         if x:
-            self._axis_x_array = np.append(self._axis_x_array, x)
+            if self._stream_x_buffer.size != self._stream_y_buffer.size:
+                # previous points have no x value: restart the curve
+                self._stream_x_buffer.clear()
+                self._stream_y_buffer.clear()
+            self._stream_x_buffer.append(x)
+            self._stream_y_buffer.append(y)
+            x_array = self._stream_x_buffer.values()
         else:
-            self._axis_x_array = np.arange(len(self._axis_y_array))
-
-        if self.max_plot_points:
-            if self._axis_y_array.size > self.max_plot_points:
-                self._axis_y_array = np.delete(self._axis_y_array, 0)
-                self._axis_x_array = np.delete(self._axis_x_array, 0)
+            self._stream_x_buffer.clear()
+            self._stream_y_buffer.append(y)
+            x_array = self._stream_index_array[: self._stream_y_buffer.size]
+        y_array = self._stream_y_buffer.values()
 
         if self.single_curve is None:
             self.single_curve, = self.axes.plot(
-                self._axis_y_array, linewidth=2, marker="s"
+                x_array, y_array, linewidth=2, marker="s", animated=True
+            )
+            self.single_fill = Polygon(
+                self._stream_fill_xy[:3],
+                closed=True,
+                facecolor="r",
+                edgecolor="r",
+                linewidth=2,
+                animated=True,
             )
+            self.axes.add_patch(self.single_fill)
+            self.axes.grid(True)
         else:
-            self.axes.fill(self._axis_y_array, "r", linewidth=2)
-
-        self._axis_y_limits[1] = (
-            self._axis_y_array.max() + self._axis_y_array.max() * 0.05
-        )
-        self.axes.set_ylim(self._axis_y_limits)
-        self.single_curve.set_xdata(self._axis_x_array)
-        self.single_curve.set_ydata(self._axis_y_array)
-        self.axes.relim()
-        self.axes.autoscale_view()
-        self.fig.canvas.draw()
-        self.fig.canvas.flush_events()
-        self.axes.grid(True)
+            self.single_curve.set_data(x_array, y_array)
+
+        num_points = y_array.size
+        fill_xy = self._stream_fill_xy[: num_points + 2]
+        fill_xy[1:-1, 0] = x_array
+        fill_xy[1:-1, 1] = y_array
+        fill_xy[0] = (x_array[0], 0)
+        fill_xy[-1] = (x_array[-1], 0)
+        self.single_fill.set_xy(fill_xy)
+
+        if self.update_stream_limits(x_array, y_array):
+            self.draw()
+        else:
+            self.blit_stream()
 
-        # TODO move y lims as propery
-        self.axes.set_ylim(
-            (0, self._axis_y_array.max() + self._axis_y_array.max() * 0.05)
-        )
-        # self.draw()
-        # self.set_title("Scan in progress. Please wait...")
+    def update_stream_limits(self, x_array, y_array):
+        """Updates axes limits if the curve does not fit in them anymore.
+           Returns True if the limits have been changed.
+        """
+        changed = False
+
+        x_min = x_array[0]
+        x_max = x_array[-1]
+        if (
+            self._axis_x_limits[0] is None
+            or x_min < self._axis_x_limits[0]
+            or x_max > self._axis_x_limits[1]
+        ):
+            # leave room for new points before the next full redraw
+            x_range = max(x_max - x_min, 1)
+            self._axis_x_limits = [x_min, x_max + x_range * 0.1]
+            self.axes.set_xlim(self._axis_x_limits)
+            changed = True
+
+        y_max = y_array.max()
+        if (
+            self._axis_y_limits[1] is None
+            or y_max > self._axis_y_limits[1]
+            or y_max < self._axis_y_limits[1] * 0.5
+        ):
+            self._axis_y_limits = [0, y_max + abs(y_max) * 0.05 or 1]
+            self.axes.set_ylim(self._axis_y_limits)
+            changed = True
+
+        return changed
+
+    def on_draw_event(self, event):
+        """Caches the background after a full redraw and draws the real
+           time curve on top of it
+        """
+        if self.single_curve is None:
+            return
+        self._stream_background = self.copy_from_bbox(self.axes.bbox)
+        self.axes.draw_artist(self.single_fill)
+        self.axes.draw_artist(self.single_curve)
+
+    def blit_stream(self):
+        if self._stream_background is None:
+            self.draw()
+            return
+        self.restore_region(self._stream_background)
+        self.axes.draw_artist(self.single_fill)
+        self.axes.draw_artist(self.single_curve)
+        self.blit(self.axes.bbox)
 
     def set_axes_labels(self, x_label, y_label):
         self.axes.set_xlabel(x_label)
@@ -351,29 +351,43 @@ class TaskToolBoxWidget(qt_import.QWidget):
                     "Select the sample, basket or task group you would like to add to."
                 )
             else:
-                for item in items:
-                    shapes = HWR.beamline.sample_view.get_selected_points()
-                    task_model = item.get_model()
-                    # TODO Consider if GPhL workflow needs task-per-shape
-                    # like xrf does
-
-                    # Create a new group if sample is selected
-                    if isinstance(task_model, queue_model_objects.Sample):
-                        task_model = self.create_task_group(task_model)
-                        if self.tool_box.currentWidget() in (
-                            self.discrete_page,
-                            self.char_page,
-                            self.energy_scan_page,
-                            self.xrf_spectrum_page,
-                        ) and len(shapes):
-                            # This could be done in more nicer way...
-                            for shape in shapes:
-                                self.create_task(task_model, shape)
+                shapes = HWR.beamline.sample_view.get_selected_points()
+                # Tree updates and autosave are done once for all tasks
+                with self.tree_brick.bulk_enqueue():
+                    for item in items:
+                        task_model = item.get_model()
+                        # TODO Consider if GPhL workflow needs task-per-shape
+                        # like xrf does
+
+                        # Create a new group if sample is selected
+                        if isinstance(task_model, queue_model_objects.Sample):
+                            task_model = self.create_task_group(task_model)
+                            if self.tool_box.currentWidget() in (
+                                self.discrete_page,
+                                self.char_page,
+                                self.energy_scan_page,
+                                self.xrf_spectrum_page,
+                            ) and len(shapes):
+                                # This could be done in more nicer way...
+                                for shape in shapes:
+                                    self.create_task(task_model, shape)
+                            else:
+                                self.create_task(task_model)
+                        elif isinstance(task_model, queue_model_objects.Basket):
+                            for sample_node in task_model.get_sample_list():
+                                task_group = self.create_task_group(sample_node)
+                                if self.tool_box.currentWidget() in (
+                                    self.discrete_page,
+                                    self.char_page,
+                                    self.energy_scan_page,
+                                    self.xrf_spectrum_page,
+                                    self.xray_imaging_page,
+                                ) and len(shapes):
+                                    for shape in shapes:
+                                        self.create_task(task_group, shape)
+                                else:
+                                    self.create_task(task_group)
                         else:
-                            self.create_task(task_model)
-                    elif isinstance(task_model, queue_model_objects.Basket):
-                        for sample_node in task_model.get_sample_list():
-                            task_group = self.create_task_group(sample_node)
                             if self.tool_box.currentWidget() in (
                                 self.discrete_page,
                                 self.char_page,
@@ -382,21 +396,9 @@ class TaskToolBoxWidget(qt_import.QWidget):
                                 self.xray_imaging_page,
                             ) and len(shapes):
                                 for shape in shapes:
-                                    self.create_task(task_group, shape)
+                                    self.create_task(task_model, shape)
                             else:
-                                self.create_task(task_group)
-                    else:
-                        if self.tool_box.currentWidget() in (
-                            self.discrete_page,
-                            self.char_page,
-                            self.energy_scan_page,
-                            self.xrf_spectrum_page,
-                            self.xray_imaging_page,
-                        ) and len(shapes):
-                            for shape in shapes:
-                                self.create_task(task_model, shape)
-                        else:
-                            self.create_task(task_model)
+                                self.create_task(task_model)
                 self.tree_brick.select_last_added_item()
                 self.tree_brick.update_enable_collect()
 
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Measures idle CPU use and greenlet-to-slot latency of the gevent/Qt
+integration.
+
+Usage:
+    python gevent_bridge_benchmark.py [--timer] [--duration SECONDS]
+                                      [--sleep MS]
+
+A thread writes time stamps on a socket, a greenlet reads them and emits a
+Qt signal, the connected slot records the delay. A Qt timer slot spawns
+greenlets, the delay until they run is recorded as well. A greenlet
+sleeping --sleep ms in a loop records how long each gevent.sleep takes,
+while nothing else is sent. CPU use is measured while no message is sent.
+"""
+
+import os
+import sys
+import time
+import socket
+import threading
+from optparse import OptionParser
+
+import gevent
+import gevent.socket
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubeqt.utils import qt_import
+from mxcubeqt.utils.gevent_bridge import GeventBridge
+
+
+class Receiver(qt_import.QObject):
+
+    messageSignal = qt_import.pyqtSignal(float)
+
+    def __init__(self):
+        qt_import.QObject.__init__(self)
+        self.delays = []
+        self.messageSignal.connect(self.message_received)
+
+        self.spawn_delays = []
+
+    def message_received(self, sent_time):
+        self.delays.append(time.time() - sent_time)
+
+    def spawn_greenlet(self):
+        spawn_time = time.time()
+        gevent.spawn(lambda: self.spawn_delays.append(time.time() - spawn_time))
+
+
+def read_messages(sock, receiver):
+    sock_file = gevent.socket.socket(fileno=os.dup(sock.fileno()))
+    buf = b""
+    while True:
+        buf += sock_file.recv(4096)
+        while b"\n" in buf:
+            line, buf = buf.split(b"\n", 1)
+            receiver.messageSignal.emit(float(line))
+
+
+def sleep_loop(period, sleep_times):
+    while True:
+        start = time.time()
+        gevent.sleep(period)
+        sleep_times.append(time.time() - start)
+
+
+def send_messages(sock, count, period):
+    for _ in range(count):
+        sock.sendall(b"%.6f\n" % time.time())
+        time.sleep(period)
+
+
+def run(opts):
+    app = qt_import.QApplication([])
+    bridge = GeventBridge()
+    bridge.start(force_timer=opts.timer)
+
+    receiver = Receiver()
+    read_sock, write_sock = socket.socketpair()
+    gevent.spawn(read_messages, read_sock, receiver)
+
+    spawn_timer = qt_import.QTimer()
+    spawn_timer.timeout.connect(receiver.spawn_greenlet)
+
+    result = {}
+    sleep_times = []
+
+    def measure_idle():
+        cpu_start = time.process_time()
+        wall_start = time.time()
+
+        def done():
+            result["idle_cpu"] = (time.process_time() - cpu_start) / (
+                time.time() - wall_start
+            )
+            measure_latency()
+
+        qt_import.QTimer.singleShot(int(opts.duration * 1000), done)
+
+    def measure_latency():
+        count = int(opts.duration / 0.01)
+        sender = threading.Thread(target=send_messages, args=(write_sock, count, 0.01))
+        sender.start()
+        spawn_timer.start(10)
+
+        def wait_sender():
+            if sender.is_alive():
+                qt_import.QTimer.singleShot(100, wait_sender)
+            else:
+                spawn_timer.stop()
+                qt_import.QTimer.singleShot(100, measure_sleep)
+
+        wait_sender()
+
+    def measure_sleep():
+        # Alone, other messages would run gevent timers as well
+        sleeper = gevent.spawn(sleep_loop, opts.sleep / 1000.0, sleep_times)
+
+        def done():
+            sleeper.kill(block=False)
+            app.quit()
+
+        qt_import.QTimer.singleShot(int(opts.duration * 1000), done)
+
+    qt_import.QTimer.singleShot(0, measure_idle)
+    app.exec_()
+    mode = bridge.mode
+    bridge.stop()
+
+    delays = sorted(receiver.delays)
+    print("Mode              : %s" % mode)
+    print("Idle CPU          : %.1f %%" % (result.get("idle_cpu", 0) * 100))
+    if delays:
+        print("Messages          : %d" % len(delays))
+        print("Latency median    : %.3f ms" % (delays[len(delays) // 2] * 1000))
+        print("Latency 99th perc.: %.3f ms" % (delays[int(len(delays) * 0.99)] * 1000))
+    spawn_delays = sorted(receiver.spawn_delays)
+    if spawn_delays:
+        print("Spawned greenlets : %d" % len(spawn_delays))
+        print(
+            "Spawn latency med.: %.3f ms"
+            % (spawn_delays[len(spawn_delays) // 2] * 1000)
+        )
+        print(
+            "Spawn latency 99th: %.3f ms"
+            % (spawn_delays[int(len(spawn_delays) * 0.99)] * 1000)
+        )
+    sleep_times.sort()
+    if sleep_times:
+        print("Sleeps of %.1f ms   : %d" % (opts.sleep, len(sleep_times)))
+        print(
+            "Sleep time median : %.3f ms" % (sleep_times[len(sleep_times) // 2] * 1000)
+        )
+        print(
+            "Sleep time 99th   : %.3f ms"
+            % (sleep_times[int(len(sleep_times) * 0.99)] * 1000)
+        )
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--timer", action="store_true", default=False,
+                      help="Use the legacy polling timer")
+    parser.add_option("", "--duration", type="float", default=5.0)
+    parser.add_option("", "--sleep", type="float", default=5.0,
+                      help="Duration (ms) of the measured gevent.sleep")
+    run(parser.parse_args()[0])
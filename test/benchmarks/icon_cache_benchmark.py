@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Measures icon loading with the icon cache: loading every icon of the
+icons directory as done at startup by the bricks, and setting icons on the
+items of a queue like tree followed by a repaint.
+
+Each measurement is done with a cold cache (icons read from disk) and
+with a warm cache.
+
+Usage:
+    python icon_cache_benchmark.py [--items N] [--repeats N]
+"""
+
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubeqt.utils import icons, qt_import
+
+TREE_ICONS = ("star", "sample_axis", "VCRPlay", "ThumbUp", "Stop2", "Delete")
+
+
+def measure(label, function, repeats):
+    start = time.time()
+    for index in range(repeats):
+        function()
+    duration = time.time() - start
+    print("%-36s: %9.2f ms" % (label, duration / repeats * 1000))
+
+
+def load_all_icons():
+    for filename in os.listdir(icons.ICONS_DIR):
+        icons.load_icon(os.path.splitext(filename)[0])
+
+
+def build_tree(num_items):
+    tree = qt_import.QTreeWidget()
+    tree.resize(400, 800)
+    items = [qt_import.QTreeWidgetItem(tree) for index in range(num_items)]
+    for index, item in enumerate(items):
+        item.setText(0, "Item %d" % index)
+    tree.show()
+    return tree, items
+
+
+def repaint_tree(app, tree, items):
+    for index, item in enumerate(items):
+        item.setIcon(0, icons.load_icon(TREE_ICONS[index % len(TREE_ICONS)]))
+    tree.viewport().repaint()
+    app.processEvents()
+
+
+def run(opts):
+    app = qt_import.QApplication([])
+
+    def cold_load():
+        icons.clear_cache()
+        load_all_icons()
+
+    measure("startup icon loading, cold cache", cold_load, opts.repeats)
+    measure("startup icon loading, warm cache", load_all_icons, opts.repeats)
+
+    tree, items = build_tree(opts.items)
+
+    def cold_repaint():
+        icons.clear_cache()
+        repaint_tree(app, tree, items)
+
+    measure("tree icons and repaint, cold cache", cold_repaint, opts.repeats)
+    measure(
+        "tree icons and repaint, warm cache",
+        lambda: repaint_tree(app, tree, items),
+        opts.repeats,
+    )
+    print("cache statistics: %s" % icons.get_cache_statistics())
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--items", type="int", default=2000)
+    parser.add_option("", "--repeats", type="int", default=5)
+    run(parser.parse_args()[0])
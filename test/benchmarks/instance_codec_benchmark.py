@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Measures throughput and latency of mirrored state messages sent as python
+objects (legacy format) and encoded by the binary instance codec, over a
+loopback socket.
+
+A storm of --updates brick updates over --widgets mirrored widgets is sent
+as deltas, --batch deltas per message (the updates of one batcher window).
+Deltas are encoded as by InstanceListBrick, a single delta is sent in the
+legacy format. Messages are wrapped in a brick update message, pickled and
+terminated as by QtInstanceServer. Latency is the time from sending a
+message to applying its deltas on the receiver.
+
+Usage:
+    python instance_codec_benchmark.py [--updates N] [--widgets N]
+                                       [--batch N]
+"""
+
+import os
+import sys
+import time
+import pickle
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+import gevent
+from gevent import socket
+
+from mxcubeqt.utils import instance_codec
+from mxcubeqt.utils.instance_sync import MirrorState, MirrorStateReceiver
+
+TERMINATOR = b"@@END@@"
+
+
+def create_batches(opts):
+    """Returns the storm deltas, in lists of --batch deltas"""
+    state = MirrorState()
+    deltas = []
+    for index in range(opts.updates):
+        deltas.append(
+            state.update(
+                "brick_%d" % (index % opts.widgets // 10),
+                "widget_%d" % (index % opts.widgets),
+                "setValue",
+                (index * 0.01, "value %d" % index),
+                True,
+            )
+        )
+    batch = max(opts.batch, 1)
+    return [deltas[index : index + batch] for index in range(0, len(deltas), batch)]
+
+
+def connect():
+    listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listen_socket.bind(("127.0.0.1", 0))
+    listen_socket.listen(1)
+    client_socket = socket.create_connection(listen_socket.getsockname())
+    server_socket = listen_socket.accept()[0]
+    listen_socket.close()
+    return server_socket, client_socket
+
+
+def receive(client_socket, receiver, num_messages, sent_times, latencies):
+    buffer = b""
+    received = 0
+    while received < num_messages:
+        data = client_socket.recv(65536)
+        if not data:
+            break
+        buffer += data
+        messages = buffer.split(TERMINATOR)
+        buffer = messages.pop()
+        for message in messages:
+            message_dict = pickle.loads(message)
+            state_message = instance_codec.decode_message(message_dict["args"][0])
+            if message_dict["method"] == "apply_state_delta":
+                receiver.apply_delta(state_message)
+            else:
+                receiver.apply_deltas(state_message)
+            latencies.append(time.time() - sent_times[received])
+            received += 1
+
+
+def measure(label, codec_version, batches):
+    server_socket, client_socket = connect()
+    receiver = MirrorStateReceiver(lambda *state_args: None, lambda number: None)
+    receiver.apply_snapshot((0, []))
+    sent_times = []
+    latencies = []
+    num_bytes = 0
+
+    start = time.time()
+    greenlet = gevent.spawn(
+        receive, client_socket, receiver, len(batches), sent_times, latencies
+    )
+    for deltas in batches:
+        message_type, message = instance_codec.encode_deltas(codec_version, deltas)
+        message_dict = {
+            "brick": "instance_list_brick",
+            "widget": "",
+            "method": "apply_state_delta"
+            if message_type == instance_codec.DELTA
+            else "apply_state_deltas",
+            "args": (message,),
+            "masterSync": False,
+        }
+        data = pickle.dumps(message_dict) + TERMINATOR
+        num_bytes += len(data)
+        sent_times.append(time.time())
+        server_socket.sendall(data)
+        # Let the receiver run, as the GUI event loop would
+        gevent.sleep(0)
+    greenlet.join()
+    duration = time.time() - start
+    server_socket.close()
+    client_socket.close()
+
+    num_updates = receiver.sequence_number
+    latencies.sort()
+    print(
+        "%-8s %10.0f updates/s %8.1f bytes/update  latency mean %7.1f us, "
+        "p99 %7.1f us"
+        % (
+            label,
+            num_updates / duration,
+            float(num_bytes) / num_updates,
+            sum(latencies) / len(latencies) * 1e6,
+            latencies[int(len(latencies) * 0.99)] * 1e6,
+        )
+    )
+
+
+def run(opts):
+    batches = create_batches(opts)
+    print(
+        "%d updates over %d widgets, %d messages"
+        % (opts.updates, opts.widgets, len(batches))
+    )
+    measure("legacy", instance_codec.LEGACY_CODEC_VERSION, batches)
+    measure(
+        "binary",
+        instance_codec.negotiate_codec_version([instance_codec.get_codec_versions()]),
+        batches,
+    )
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--updates", type="int", default=100000)
+    parser.add_option("", "--widgets", type="int", default=200)
+    parser.add_option("", "--batch", type="int", default=1)
+    run(parser.parse_args()[0])
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Measures the number of events processed per second by widgets inside a
+brick without the instance event filter (master mode, mirroring off),
+with the filter walking the parent chain for every event (as done before)
+and with InstanceEventFilter.
+
+Events are sent to a widget --depth levels below its brick. Most events
+of a GUI are not input events (paint, timer, layout...), --input-ratio
+sets the fraction of mouse move events among them.
+
+Usage:
+    python instance_event_filter_benchmark.py [--events N] [--depth N]
+                                              [--input-ratio R]
+"""
+
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubeqt.utils import qt_import
+from mxcubeqt.base_components import BaseWidget, InstanceEventFilter
+
+
+class LegacyInstanceEventFilter(qt_import.QObject):
+    """Walks the parent chain for every event"""
+
+    def eventFilter(self, widget, event):
+        obj = widget
+        while obj is not None:
+            if isinstance(obj, BaseWidget):
+                if isinstance(event, qt_import.QContextMenuEvent):
+                    return True
+                elif isinstance(event, qt_import.QMouseEvent):
+                    if event.button() == qt_import.Qt.RightButton:
+                        return True
+                    elif obj.should_filter_event():
+                        return True
+                elif isinstance(event, (qt_import.QKeyEvent, qt_import.QFocusEvent)):
+                    if obj.should_filter_event():
+                        return True
+                return qt_import.QObject.eventFilter(self, widget, event)
+            try:
+                obj = obj.parent()
+            except BaseException:
+                obj = None
+        return qt_import.QObject.eventFilter(self, widget, event)
+
+
+def build_brick(depth):
+    brick = BaseWidget(None, "benchmark_brick")
+    widget = brick
+    for index in range(depth):
+        widget = qt_import.QWidget(widget)
+    return brick, widget
+
+
+def create_events(opts):
+    events = []
+    num_input = int(opts.events * opts.input_ratio)
+    step = opts.events // num_input if num_input else opts.events + 1
+    for index in range(opts.events):
+        if index % step == 0:
+            events.append(
+                qt_import.QMouseEvent(
+                    qt_import.QEvent.MouseMove,
+                    qt_import.QPointF(1, 1),
+                    qt_import.Qt.NoButton,
+                    qt_import.Qt.NoButton,
+                    qt_import.Qt.NoModifier,
+                )
+            )
+        else:
+            events.append(qt_import.QEvent(qt_import.QEvent.UpdateLater))
+    return events
+
+
+def measure(app, label, event_filter, widget, events):
+    if event_filter is not None:
+        app.installEventFilter(event_filter)
+    start = time.time()
+    for event in events:
+        app.sendEvent(widget, event)
+    duration = time.time() - start
+    if event_filter is not None:
+        app.removeEventFilter(event_filter)
+    print("%-24s %12.0f events/s" % (label, len(events) / duration))
+
+
+def run(opts):
+    app = qt_import.QApplication([])
+    brick, widget = build_brick(opts.depth)
+    events = create_events(opts)
+    BaseWidget._instance_mode = BaseWidget.INSTANCE_MODE_SLAVE
+
+    measure(app, "no filter", None, widget, events)
+    measure(app, "parent walk filter", LegacyInstanceEventFilter(), widget, events)
+    measure(app, "InstanceEventFilter", InstanceEventFilter(), widget, events)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--events", type="int", default=200000)
+    parser.add_option("", "--depth", type="int", default=8)
+    parser.add_option(
+        "", "--input-ratio", dest="input_ratio", type="float", default=0.1
+    )
+    run(parser.parse_args()[0])
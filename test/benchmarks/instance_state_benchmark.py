@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Measures the time a client instance needs to get the mirrored state when
+it connects after a long session, over loopback sockets.
+
+A session of --hours hours with --rate brick updates per second spread
+over --widgets mirrored widgets is simulated. The client is brought up to
+date either by replaying every event of the session (as the events cache
+did before it kept one event per slot) or by one MirrorState snapshot.
+Messages are pickled and terminated as by QtInstanceServer.
+
+Usage:
+    python instance_state_benchmark.py [--hours N] [--rate N] [--widgets N]
+"""
+
+import os
+import sys
+import time
+import pickle
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+import gevent
+from gevent import socket
+
+from mxcubeqt.utils.instance_sync import MirrorState, MirrorStateReceiver
+
+TERMINATOR = b"@@END@@"
+
+
+def create_session(opts):
+    """Returns the list of session events and the mirror state"""
+    state = MirrorState()
+    events = []
+    num_events = int(opts.hours * 3600 * opts.rate)
+    for index in range(num_events):
+        event = (
+            "brick_%d" % (index % opts.widgets // 10),
+            "widget_%d" % (index % opts.widgets),
+            "setText",
+            ("value %d" % index,),
+            True,
+        )
+        events.append(event)
+        state.update(*event)
+    return events, state
+
+
+def connect():
+    listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listen_socket.bind(("127.0.0.1", 0))
+    listen_socket.listen(1)
+    client_socket = socket.create_connection(listen_socket.getsockname())
+    server_socket = listen_socket.accept()[0]
+    listen_socket.close()
+    return server_socket, client_socket
+
+
+def receive(client_socket, handle_message, num_messages):
+    buffer = b""
+    received = 0
+    while received < num_messages:
+        data = client_socket.recv(65536)
+        if not data:
+            break
+        buffer += data
+        messages = buffer.split(TERMINATOR)
+        buffer = messages.pop()
+        for message in messages:
+            handle_message(pickle.loads(message))
+            received += 1
+
+
+def measure(label, messages, handle_message):
+    server_socket, client_socket = connect()
+    start = time.time()
+    receiver = gevent.spawn(receive, client_socket, handle_message, len(messages))
+    for message in messages:
+        server_socket.sendall(pickle.dumps(message) + TERMINATOR)
+    receiver.join()
+    duration = time.time() - start
+    print("%-20s %9d messages in %8.3f s" % (label, len(messages), duration))
+    server_socket.close()
+    client_socket.close()
+
+
+def run(opts):
+    events, state = create_session(opts)
+    print(
+        "%.1f h session, %d events, %d mirrored widgets"
+        % (opts.hours, len(events), len(state))
+    )
+
+    widgets = {}
+
+    def apply_event(event):
+        widgets[event[:3]] = event[3]
+
+    measure("replay all events", events, apply_event)
+    replayed = dict(widgets)
+
+    widgets.clear()
+    receiver = MirrorStateReceiver(
+        lambda *state_args: apply_event(state_args), lambda number: None
+    )
+    measure("snapshot", [state.get_snapshot()], receiver.apply_snapshot)
+    assert widgets == replayed
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--hours", type="float", default=8)
+    parser.add_option("", "--rate", type="float", default=5)
+    parser.add_option("", "--widgets", type="int", default=200)
+    run(parser.parse_args()[0])
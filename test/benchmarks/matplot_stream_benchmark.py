@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Feeds MplCanvas.append_new_point with a simulated machine current and
+reports the number of points per second and the memory use.
+
+By default 24 h of machine current sampled every second are simulated:
+a top-up decay between 200 and 195 mA with an injection every 10 minutes.
+
+Usage:
+    python matplot_stream_benchmark.py [--hours N] [--period S]
+                                       [--max-points N] [--report N]
+"""
+
+import os
+import sys
+import time
+import resource
+import tracemalloc
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubeqt.utils import qt_import
+from mxcubeqt.widgets.matplot_widget import MplCanvas
+
+
+def machine_current(elapsed):
+    """Returns a top-up machine current (mA) after elapsed seconds"""
+    return 200.0 - 5.0 * ((elapsed % 600) / 600.0)
+
+
+def get_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run(opts):
+    app = qt_import.QApplication([])
+
+    canvas = MplCanvas()
+    canvas.set_real_time(True)
+    canvas.clear()
+    canvas.set_max_plot_points(opts.max_points)
+    canvas.show()
+    app.processEvents()
+
+    num_points = int(opts.hours * 3600 / opts.period)
+    tracemalloc.start()
+
+    start = time.time()
+    last_report = start
+    for index in range(num_points):
+        canvas.append_new_point(machine_current(index * opts.period))
+        app.processEvents()
+
+        if (index + 1) % opts.report == 0:
+            now = time.time()
+            current, peak = tracemalloc.get_traced_memory()
+            print(
+                "%8d points: %7.1f points/s, python heap %6.2f MB "
+                "(peak %6.2f MB), max rss %7.1f MB, artists %d"
+                % (
+                    index + 1,
+                    opts.report / (now - last_report),
+                    current / 1e6,
+                    peak / 1e6,
+                    get_rss_mb(),
+                    len(canvas.axes.lines) + len(canvas.axes.patches),
+                )
+            )
+            last_report = now
+
+    duration = time.time() - start
+    print(
+        "%d points (%.1f h simulated) in %.1f s: %.1f points/s"
+        % (num_points, opts.hours, duration, num_points / duration)
+    )
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--hours", type="float", default=24)
+    parser.add_option("", "--period", type="float", default=1.0)
+    parser.add_option("", "--max-points", dest="max_points", type="int", default=3600)
+    parser.add_option("", "--report", type="int", default=10000)
+    run(parser.parse_args()[0])
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Compares the path collision check of a queue done with the path collision
+index with the pairwise check done by queue_model.check_for_path_collisions
+for every checked queue entry.
+
+Usage:
+    python path_collision_benchmark.py [--collections N] [--samples N]
+"""
+
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubecore.HardwareObjects.queue_model_objects import PathTemplate
+
+from mxcubeqt.utils.path_collision_index import PathCollisionIndex
+
+
+class Node(object):
+    def __init__(self, path_template):
+        self.path_template = path_template
+
+
+def create_queue(opts):
+    nodes = []
+    for index in range(opts.collections):
+        path_template = PathTemplate()
+        path_template.directory = "/data/visitor/mx1234/sample_%d" % (
+            index % opts.samples
+        )
+        path_template.base_prefix = "sample_%d" % (index % opts.samples)
+        path_template.run_number = index // opts.samples + 1
+        path_template.start_num = 1
+        path_template.num_files = 100
+        nodes.append(Node(path_template))
+    return nodes
+
+
+def pairwise_check(nodes):
+    conflict = False
+    for node in nodes:
+        for other_node in nodes:
+            if (
+                other_node.path_template is not node.path_template
+                and other_node.path_template == node.path_template
+            ):
+                conflict = True
+                break
+    return conflict
+
+
+def index_check(index, nodes):
+    conflict = False
+    for node in nodes:
+        index.update(node, node.path_template)
+    for node in nodes:
+        if index.has_collision(node.path_template):
+            conflict = True
+    return conflict
+
+
+def measure(label, function, *args):
+    start = time.time()
+    result = function(*args)
+    print("%-40s: %10.2f ms" % (label, (time.time() - start) * 1000))
+    return result
+
+
+def run(opts):
+    nodes = create_queue(opts)
+    index = PathCollisionIndex()
+    measure("build index", lambda: [index.add(n, n.path_template) for n in nodes])
+    measure("check queue, index", index_check, index, nodes)
+    measure(
+        "single query, index",
+        index.has_collision,
+        nodes[len(nodes) // 2].path_template,
+    )
+    nodes[-1].path_template.run_number = 1
+    measure("edit and check queue, index", index_check, index, nodes)
+    if opts.pairwise:
+        measure("check queue, pairwise", pairwise_check, nodes)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--collections", type="int", default=10000)
+    parser.add_option("", "--samples", type="int", default=500)
+    parser.add_option(
+        "",
+        "--no-pairwise",
+        dest="pairwise",
+        action="store_false",
+        default=True,
+        help="Skip the O(N^2) pairwise check",
+    )
+    run(parser.parse_args()[0])
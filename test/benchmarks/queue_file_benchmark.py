@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Compares saving and loading a queue of --nodes nodes with jsonpickle
+(format of the queue model files) and with the streaming queue file format.
+
+Usage:
+    python queue_file_benchmark.py [--nodes N] [--tasks N] [--gzip]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from optparse import OptionParser
+
+import jsonpickle
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubecore.HardwareObjects import queue_model_objects
+
+from mxcubeqt.utils import queue_file
+
+
+class QueueModel(object):
+    """Holds the loaded nodes, as the queue model without signals"""
+
+    def __init__(self):
+        self.root = queue_model_objects.RootNode()
+
+    def get_model_root(self):
+        return self.root
+
+    def add_child(self, parent, child):
+        add_child(parent, child)
+
+
+def add_child(parent, child):
+    """Appends child as QueueModel.add_child does, without signals"""
+    child._parent = parent
+    parent.get_children().append(child)
+
+
+def create_queue(num_nodes, num_tasks):
+    root = queue_model_objects.RootNode()
+    count = 0
+    while count < num_nodes:
+        sample = queue_model_objects.Sample()
+        sample.set_name("Sample %d" % count)
+        add_child(root, sample)
+        group = queue_model_objects.TaskGroup()
+        add_child(sample, group)
+        for index in range(num_tasks):
+            add_child(group, queue_model_objects.DataCollection())
+        count += 2 + num_tasks
+    return root
+
+
+def measure(label, function, *args):
+    start = time.time()
+    result = function(*args)
+    print("%-32s: %8.1f ms" % (label, (time.time() - start) * 1000))
+    return result
+
+
+def save_jsonpickle(root, filename):
+    with open(filename, "w") as output:
+        output.write(jsonpickle.encode(root))
+
+
+def load_jsonpickle(filename):
+    with open(filename) as input_file:
+        return jsonpickle.decode(input_file.read())
+
+
+def run(opts):
+    root = create_queue(opts.nodes, opts.tasks)
+    directory = tempfile.mkdtemp()
+    pickle_filename = os.path.join(directory, "queue.dat")
+    queue_filename = os.path.join(
+        directory, "queue" + queue_file.FILE_EXTENSION + (".gz" if opts.gzip else "")
+    )
+    print("%d nodes" % len(list(queue_file.iter_nodes(root))))
+
+    measure("save, jsonpickle", save_jsonpickle, root, pickle_filename)
+    measure("save, queue file", queue_file.save_queue, root, queue_filename)
+    print(
+        "%-32s: %8.1f kB / %8.1f kB"
+        % (
+            "size, jsonpickle / queue file",
+            os.path.getsize(pickle_filename) / 1024.0,
+            os.path.getsize(queue_filename) / 1024.0,
+        )
+    )
+
+    measure("load, jsonpickle", load_jsonpickle, pickle_filename)
+    first_node_times = []
+    start = time.time()
+
+    def first_progress(count):
+        if not first_node_times:
+            first_node_times.append(time.time() - start)
+
+    measure(
+        "load, queue file",
+        queue_file.load_queue,
+        queue_filename,
+        QueueModel(),
+        None,
+        first_progress,
+        100,
+    )
+    if first_node_times:
+        print("%-32s: %8.1f ms" % ("first 100 nodes shown after", first_node_times[0] * 1000))
+
+    os.remove(pickle_filename)
+    os.remove(queue_filename)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--nodes", type="int", default=10000)
+    parser.add_option("", "--tasks", type="int", default=3)
+    parser.add_option("", "--gzip", action="store_true", default=False)
+    run(parser.parse_args()[0])
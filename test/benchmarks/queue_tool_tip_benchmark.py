@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Measures parameter edits of data collections in a large queue with tool
+tips built on every edit and with tool tips built when they are shown.
+
+Every data collection of the queue gets --edits parameter edits, as done
+when parameters of many highlighted items are changed. After the edits
+the tool tip of --hovers items is requested, as done when the mouse
+moves over the queue.
+
+Usage:
+    python queue_tool_tip_benchmark.py [--collections N] [--edits N]
+                                       [--hovers N]
+"""
+
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubecore.HardwareObjects import queue_model_objects
+
+from mxcubeqt.utils import qt_import
+
+# queue_item loads icons when imported, the application has to exist before
+APP = qt_import.QApplication([])
+
+from mxcubeqt.utils import queue_item
+
+
+class EagerDataCollectionQueueItem(queue_item.TaskQueueItem):
+    """Builds the tool tip on every update, as done before"""
+
+    def update_tool_tip(self):
+        self.setToolTip(
+            0, queue_item.get_data_collection_tool_tip(self.get_model())
+        )
+
+
+def build_tree(cls, num_collections):
+    tree = qt_import.QTreeWidget()
+    items = []
+    for index in range(num_collections):
+        data_collection = queue_model_objects.DataCollection()
+        data_collection.set_name("Collection %d" % index)
+        item = cls(tree, None, data_collection.get_display_name())
+        item._data_model = data_collection
+        item.update_tool_tip()
+        items.append(item)
+    return tree, items
+
+
+def measure(label, cls, opts):
+    tree, items = build_tree(cls, opts.collections)
+
+    start = time.time()
+    for edit_index in range(opts.edits):
+        for item in items:
+            parameters = item.get_model().acquisitions[0].acquisition_parameters
+            parameters.exp_time = 0.01 * (edit_index + 1)
+            item.update_tool_tip()
+    edit_time = time.time() - start
+
+    start = time.time()
+    for index in range(opts.hovers):
+        items[index % len(items)].data(0, qt_import.Qt.ToolTipRole)
+    hover_time = time.time() - start
+
+    num_edits = opts.edits * len(items)
+    print(
+        "%-8s %8d edits: %8.2f us per edit, %8.2f us per shown tool tip"
+        % (
+            label,
+            num_edits,
+            edit_time / num_edits * 1e6,
+            hover_time / opts.hovers * 1e6,
+        )
+    )
+
+
+def run(opts):
+    measure("eager", EagerDataCollectionQueueItem, opts)
+    measure("lazy", queue_item.DataCollectionQueueItem, opts)
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--collections", type="int", default=5000)
+    parser.add_option("", "--edits", type="int", default=10)
+    parser.add_option("", "--hovers", type="int", default=1000)
+    run(parser.parse_args()[0])
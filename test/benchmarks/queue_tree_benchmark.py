@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Measures DataCollectTree population time with the model to item index
+and with the former linear tree walk.
+
+Usage:
+    python queue_tree_benchmark.py [--baskets N] [--samples N] [--tasks N]
+"""
+
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubeqt import MOCKUP_CORE_CONFIG_PATH
+from mxcubeqt.utils import qt_import
+
+# Widgets load icons when imported, the application has to exist before
+APP = qt_import.QApplication([])
+
+from mxcubeqt.widgets.dc_tree_widget import DataCollectTree
+
+from mxcubecore import HardwareRepository as HWR
+from mxcubecore.HardwareObjects import queue_model_objects
+
+
+def linear_get_item_by_model(tree, parent_node):
+    it = qt_import.QTreeWidgetItemIterator(tree.sample_tree_widget)
+    item = it.value()
+    while item:
+        if item.get_model() is parent_node:
+            return item
+        it += 1
+        item = it.value()
+    return tree.sample_tree_widget
+
+
+def populate(tree, opts):
+    start = time.time()
+    num_nodes = 0
+    for basket_index in range(opts.baskets):
+        basket = queue_model_objects.Basket()
+        basket.name = "Basket %d" % basket_index
+        tree.add_to_view(None, basket)
+        num_nodes += 1
+        for sample_index in range(opts.samples):
+            sample = queue_model_objects.Sample()
+            sample.set_name("sample-%d-%d" % (basket_index, sample_index))
+            tree.add_to_view(basket, sample)
+            group = queue_model_objects.TaskGroup()
+            group.set_name("Group")
+            tree.add_to_view(sample, group)
+            num_nodes += 2
+            for task_index in range(opts.tasks):
+                task = queue_model_objects.TaskGroup()
+                task.set_name("Task %d" % task_index)
+                tree.add_to_view(group, task)
+                num_nodes += 1
+    return num_nodes, time.time() - start
+
+
+def run(opts):
+    HWR.init_hardware_repository(MOCKUP_CORE_CONFIG_PATH)
+
+    for label, lookup in (("indexed", None), ("linear walk", linear_get_item_by_model)):
+        tree = DataCollectTree(None)
+        if lookup is not None:
+            tree.get_item_by_model = lambda node, tree=tree: lookup(tree, node)
+        num_nodes, duration = populate(tree, opts)
+        print("%-12s: %d nodes in %.2f s" % (label, num_nodes, duration))
+        tree.clear_tree()
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--baskets", type="int", default=50)
+    parser.add_option("", "--samples", type="int", default=10)
+    parser.add_option("", "--tasks", type="int", default=8)
+    run(parser.parse_args()[0])
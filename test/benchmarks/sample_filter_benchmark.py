@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Types filter text in a queue tree of a 30 puck dewar and compares the
+full tree scan done for every keystroke with the sample filter index,
+applied once after typing.
+
+Usage:
+    python sample_filter_benchmark.py [--pucks N] [--samples N] [--tasks N]
+                                      [--text TEXT]
+"""
+
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubecore.HardwareObjects import queue_model_objects
+
+from mxcubeqt.utils import qt_import
+
+# queue_item loads icons when imported, the application has to exist before
+APP = qt_import.QApplication([])
+
+from mxcubeqt.utils import queue_item
+from mxcubeqt.utils.sample_filter import SampleFilter
+from mxcubeqt.utils.sample_filter_criteria import parse_filter_text
+
+
+class SampleTree(object):
+    """Sample tree with the item index of DataCollectTree"""
+
+    def __init__(self, opts):
+        self.sample_tree_widget = qt_import.QTreeWidget()
+        self.item_index_version = 0
+        self.items = []
+        for puck_index in range(opts.pucks):
+            basket = queue_model_objects.Basket()
+            basket.location = (puck_index + 1,)
+            basket_item = self.add_item(self.sample_tree_widget, basket, "Puck %d" % (puck_index + 1))
+            for sample_index in range(opts.samples):
+                sample = queue_model_objects.Sample()
+                sample.location = (puck_index + 1, sample_index + 1)
+                sample.code = "BC%04d" % (puck_index * opts.samples + sample_index)
+                sample.crystals[0].protein_acronym = ("lyso", "thau", "tryp")[
+                    sample_index % 3
+                ]
+                sample_item = self.add_item(
+                    basket_item, sample, "lyso-%d-%d" % (puck_index + 1, sample_index + 1)
+                )
+                group_item = self.add_item(
+                    sample_item, queue_model_objects.TaskGroup(), "Standard"
+                )
+                for task_index in range(opts.tasks):
+                    self.add_item(
+                        group_item, queue_model_objects.DataCollection(), "Collection"
+                    )
+        self.sample_tree_widget.expandAll()
+        self.sample_tree_widget.show()
+
+    def add_item(self, parent_item, model, name):
+        cls = queue_item.MODEL_VIEW_MAPPINGS[model.__class__]
+        item = cls(parent_item, None, name)
+        item.setText(0, name)
+        item._data_model = model
+        self.items.append(item)
+        self.item_index_version += 1
+        return item
+
+    def get_indexed_items(self, item_class):
+        return [item for item in self.items if isinstance(item, item_class)]
+
+    def set_items_hidden(self, item_visibility):
+        self.sample_tree_widget.setUpdatesEnabled(False)
+        for item, hidden in item_visibility:
+            if item.isHidden() != hidden:
+                item.set_hidden(hidden)
+        self.sample_tree_widget.setUpdatesEnabled(True)
+
+
+def scan_filter(tree, text):
+    """Sample name filter as done by TreeBrick before the filter index"""
+    item_iterator = qt_import.QTreeWidgetItemIterator(tree.sample_tree_widget)
+    item = item_iterator.value()
+    while item:
+        hide = False
+        if isinstance(item, queue_item.SampleQueueItem):
+            hide = text not in item.text(0)
+        item.set_hidden(hide)
+        item_iterator += 1
+        item = item_iterator.value()
+
+
+def run(opts):
+    tree = SampleTree(opts)
+    print("%d tree items" % len(tree.items))
+    keystrokes = [opts.text[: index + 1] for index in range(len(opts.text))]
+
+    start = time.time()
+    for text in keystrokes:
+        scan_filter(tree, text)
+        APP.processEvents()
+    print(
+        "%-40s: %8.1f ms" % ("tree scan on every keystroke", (time.time() - start) * 1000)
+    )
+
+    sample_filter = SampleFilter(tree)
+    start = time.time()
+    sample_filter.get_entries()
+    print("%-40s: %8.1f ms" % ("build sample index", (time.time() - start) * 1000))
+
+    start = time.time()
+    tree.set_items_hidden(
+        sample_filter.get_visibility(parse_filter_text(keystrokes[-1], "name"))
+    )
+    APP.processEvents()
+    print("%-40s: %8.1f ms" % ("indexed filter after typing", (time.time() - start) * 1000))
+
+    start = time.time()
+    tree.set_items_hidden(
+        sample_filter.get_visibility(
+            parse_filter_text("acronym:thau basket:3,5,7 barcode:BC0", None)
+        )
+    )
+    APP.processEvents()
+    print("%-40s: %8.1f ms" % ("indexed combined criteria", (time.time() - start) * 1000))
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--pucks", type="int", default=30)
+    parser.add_option("", "--samples", type="int", default=16)
+    parser.add_option("", "--tasks", type="int", default=2)
+    parser.add_option("", "--text", default="lyso-17-1")
+    run(parser.parse_args()[0])
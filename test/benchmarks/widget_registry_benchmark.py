@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Compares widget lookups through the widget registry with scans of
+QApplication.allWidgets(), as done for every mirrored instance event.
+
+The layout mimics a full beamline GUI: a main window holding a few tabs
+of bricks, each brick with named child widgets. Defaults are close to the
+number of widgets of the example configuration with all bricks loaded.
+
+Usage:
+    python widget_registry_benchmark.py [--bricks N] [--children N]
+                                        [--lookups N]
+"""
+
+import os
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+)
+
+from mxcubeqt.utils import qt_import
+from mxcubeqt.base_components import BaseWidget, WIDGET_REGISTRY
+
+
+class MainWindow(qt_import.QWidget):
+    brickChangedSignal = qt_import.pyqtSignal(str, str, str, tuple, bool)
+    tabChangedSignal = qt_import.pyqtSignal(str, int)
+
+    def __init__(self):
+        qt_import.QWidget.__init__(self)
+        self.setObjectName("mainWindow")
+        self.configuration = None
+
+
+class BenchmarkBrick(BaseWidget):
+    def __init__(self, parent, name, num_children):
+        BaseWidget.__init__(self, parent, name)
+        layout = qt_import.QVBoxLayout(self)
+        for index in range(num_children):
+            child = qt_import.QLineEdit(self)
+            setattr(self, "child_ledit_%d" % index, child)
+            layout.addWidget(child)
+
+
+def build_layout(opts):
+    main_window = MainWindow()
+    WIDGET_REGISTRY.set_main_window(main_window)
+    tab_widget = qt_import.QTabWidget(main_window)
+    bricks = []
+    for tab_index in range(opts.tabs):
+        page = qt_import.QWidget()
+        layout = qt_import.QVBoxLayout(page)
+        tab_widget.addTab(page, "Tab %d" % tab_index)
+        for brick_index in range(opts.bricks // opts.tabs):
+            brick = BenchmarkBrick(
+                page, "brick_%d_%d" % (tab_index, brick_index), opts.children
+            )
+            layout.addWidget(brick)
+            bricks.append(brick)
+    return main_window, bricks
+
+
+def scan_main_window():
+    for widget in qt_import.QApplication.allWidgets():
+        if hasattr(widget, "configuration"):
+            return widget
+
+
+def scan_brick(brick_name):
+    for widget in qt_import.QApplication.allWidgets():
+        if isinstance(widget, BaseWidget) and widget.objectName() == brick_name:
+            return widget
+
+
+def measure(label, function, args_list):
+    start = time.time()
+    for args in args_list:
+        function(*args)
+    duration = time.time() - start
+    print(
+        "%-32s: %8.2f us per lookup"
+        % (label, duration / len(args_list) * 1e6)
+    )
+
+
+def run(opts):
+    app = qt_import.QApplication([])
+    main_window, bricks = build_layout(opts)
+
+    print(
+        "%d widgets, %d bricks"
+        % (len(qt_import.QApplication.allWidgets()), len(bricks))
+    )
+    brick_names = [
+        (str(bricks[index % len(bricks)].objectName()),)
+        for index in range(opts.lookups)
+    ]
+    widget_paths = [
+        (name, "child_ledit_%d" % (index % opts.children))
+        for index, (name,) in enumerate(brick_names)
+    ]
+
+    measure("main window, allWidgets scan", scan_main_window, [()] * opts.lookups)
+    measure(
+        "main window, registry",
+        WIDGET_REGISTRY.get_main_window,
+        [()] * opts.lookups,
+    )
+    measure("brick by name, allWidgets scan", scan_brick, brick_names)
+    measure("brick by name, registry", WIDGET_REGISTRY.get_brick, brick_names)
+    measure(
+        "brick widget path, registry",
+        WIDGET_REGISTRY.get_brick_widget,
+        widget_paths,
+    )
+    measure(
+        "all bricks, allWidgets scan",
+        lambda: [
+            w
+            for w in qt_import.QApplication.allWidgets()
+            if isinstance(w, BaseWidget)
+        ],
+        [()] * (opts.lookups // 10),
+    )
+    measure(
+        "all bricks, registry",
+        WIDGET_REGISTRY.get_bricks,
+        [()] * (opts.lookups // 10),
+    )
+
+
+if __name__ == "__main__":
+    parser = OptionParser()
+    parser.add_option("", "--tabs", type="int", default=6)
+    parser.add_option("", "--bricks", type="int", default=120)
+    parser.add_option("", "--children", type="int", default=40)
+    parser.add_option("", "--lookups", type="int", default=2000)
+    run(parser.parse_args()[0])
@@ -0,0 +1,169 @@
+import os
+import textwrap
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from mxcubeqt.utils import qt_import
+
+APP = qt_import.QApplication.instance() or qt_import.QApplication([])
+
+import pytest
+
+from mxcubeqt import base_components, configuration
+from mxcubeqt.base_components import BaseWidget, DeferredBrick, WIDGET_REGISTRY
+
+
+BRICK_MODULE = '''
+from mxcubeqt.base_components import BaseWidget
+from mxcubeqt.utils import qt_import
+
+BUILT = []
+
+
+class DeferralTestBrick(BaseWidget):
+
+    valueSignal = qt_import.pyqtSignal(int)
+
+    def __init__(self, *args):
+        BaseWidget.__init__(self, *args)
+        self.add_property("value", "integer", 0)
+        self.values = []
+        BUILT.append(self.objectName())
+
+    def set_value(self, value):
+        self.values.append(value)
+'''
+
+
+@pytest.fixture(autouse=True)
+def hardware_repository(monkeypatch):
+    """Bricks connect to the hardware repository when they are built"""
+    repository = object()
+    monkeypatch.setattr(
+        base_components.HWR, "get_hardware_repository", lambda: repository
+    )
+
+
+@pytest.fixture
+def brick_module(tmp_path, monkeypatch):
+    (tmp_path / "deferral_test_brick.py").write_text(textwrap.dedent(BRICK_MODULE))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    configuration.MODULE_LOCATIONS.pop("deferral_test_brick", None)
+    configuration.LOADED_MODULES.pop("deferral_test_brick", None)
+    yield configuration.load_module("deferral_test_brick")
+    configuration.MODULE_LOCATIONS.pop("deferral_test_brick", None)
+    configuration.LOADED_MODULES.pop("deferral_test_brick", None)
+
+
+def get_item(name, item_type, children=(), brick=False, properties=()):
+    item = {
+        "name": name,
+        "type": item_type,
+        "properties": list(properties),
+        "children": list(children),
+        "connections": [],
+    }
+    if brick:
+        item["brick"] = {"name": name}
+    return item
+
+
+def get_tab_config(prefix):
+    """Window with a tab of two pages holding a brick each"""
+    value = {
+        "name": "value",
+        "type": "integer",
+        "value": 3,
+        "default_value": 0,
+        "hidden": False,
+        "comment": "",
+    }
+    visible_brick = get_item(prefix + "_visible", "deferral_test_brick", brick=True)
+    hidden_brick = get_item(
+        prefix + "_hidden", "deferral_test_brick", brick=True, properties=[value]
+    )
+    tab = get_item(
+        prefix + "_tab",
+        "tab",
+        [
+            get_item(prefix + "_page0", "vbox", [visible_brick]),
+            get_item(prefix + "_page1", "vbox", [hidden_brick]),
+        ],
+    )
+    return [get_item(prefix + "_window", "window", [tab])]
+
+
+def test_hidden_tab_page_bricks_deferred(brick_module):
+    config = configuration.Configuration(
+        get_tab_config("defer"), defer_hidden_bricks=True
+    )
+
+    assert isinstance(config.bricks["defer_visible"]["brick"], BaseWidget)
+    placeholder = config.bricks["defer_hidden"]["brick"]
+    assert isinstance(placeholder, DeferredBrick)
+    assert "defer_hidden" not in brick_module.BUILT
+
+    brick = placeholder.get_brick()
+
+    assert brick_module.BUILT.count("defer_hidden") == 1
+    assert config.bricks["defer_hidden"]["brick"] is brick
+    assert brick["value"] == 3
+    assert config.bricks["defer_hidden"]["properties"] is brick.property_bag
+    assert WIDGET_REGISTRY.get_widget_by_name("defer_hidden") is brick
+
+
+def test_bricks_built_without_deferral(brick_module):
+    config = configuration.Configuration(get_tab_config("design"))
+
+    assert not isinstance(config.bricks["design_hidden"]["brick"], DeferredBrick)
+    assert config.bricks["design_hidden"]["brick"]["value"] == 3
+
+
+def test_brick_built_by_slot(brick_module):
+    config = configuration.Configuration(
+        get_tab_config("slot"), defer_hidden_bricks=True
+    )
+    sender = config.bricks["slot_visible"]["brick"]
+    placeholder = config.bricks["slot_hidden"]["brick"]
+
+    sender.valueSignal.connect(placeholder.get_slot("set_value"))
+    sender.valueSignal.emit(7)
+
+    assert placeholder.brick is not None
+    assert placeholder.brick.values == [7]
+
+
+def test_sender_connected_when_built(brick_module):
+    config = configuration.Configuration(
+        get_tab_config("sender"), defer_hidden_bricks=True
+    )
+    receiver = config.bricks["sender_visible"]["brick"]
+    placeholder = config.bricks["sender_hidden"]["brick"]
+
+    placeholder.connect_signal("valueSignal", receiver.set_value)
+    placeholder.get_brick().valueSignal.emit(5)
+
+    assert receiver.values == [5]
+
+
+def test_brick_built_when_shown(brick_module):
+    config = configuration.Configuration(
+        get_tab_config("show"), defer_hidden_bricks=True
+    )
+    placeholder = config.bricks["show_hidden"]["brick"]
+
+    placeholder.show()
+
+    assert placeholder.brick is not None
+    assert placeholder.brick.parent() is placeholder
+
+
+def test_registry_builds_deferred_brick(brick_module):
+    config = configuration.Configuration(
+        get_tab_config("registry"), defer_hidden_bricks=True
+    )
+
+    brick = WIDGET_REGISTRY.get_brick("registry_hidden")
+
+    assert isinstance(brick, brick_module.DeferralTestBrick)
+    assert config.bricks["registry_hidden"]["brick"] is brick
@@ -0,0 +1,72 @@
+import gc
+
+from mxcubeqt.base_components import EventsCache
+
+
+class Widget(object):
+    def __init__(self):
+        self.values = []
+
+    def set_value(self, value):
+        self.values.append(value)
+
+    def set_text(self, text):
+        self.values.append(text)
+
+
+def test_latest_event_per_slot_kept():
+    cache = EventsCache()
+    widget = Widget()
+    for index in range(1000):
+        cache.add(index, widget.set_value, (index,))
+    cache.add(1000, widget.set_text, ("text",))
+
+    assert len(cache) == 2
+    cache.replay()
+    assert widget.values == [999, "text"]
+    assert len(cache) == 0
+
+
+def test_events_replayed_in_time_order():
+    cache = EventsCache()
+    widget_a, widget_b = Widget(), Widget()
+    calls = []
+    widget_a.set_value = lambda value: calls.append(("a", value))
+    widget_b.set_value = lambda value: calls.append(("b", value))
+
+    cache.add(2.0, widget_a.set_value, (1,))
+    cache.add(1.0, widget_b.set_value, (2,))
+    cache.replay()
+    assert calls == [("b", 2), ("a", 1)]
+
+
+def test_size_bound_drops_dead_then_oldest():
+    cache = EventsCache(max_size=3)
+    widgets = [Widget() for index in range(3)]
+    for index, widget in enumerate(widgets):
+        cache.add(index, widget.set_value, (index,))
+
+    del widgets[0]
+    gc.collect()
+    new_widget = Widget()
+    cache.add(3, new_widget.set_value, (3,))
+    assert len(cache) == 3
+    cache.add(4, new_widget.set_text, ("text",))
+    assert len(cache) == 3
+
+    cache.replay()
+    oldest_widget, widget = widgets
+    assert oldest_widget.values == []
+    assert widget.values == [2]
+    assert new_widget.values == [3, "text"]
+
+
+def test_deleted_objects_not_kept_alive():
+    cache = EventsCache()
+    widget = Widget()
+    cache.add(0, widget.set_value, (0,))
+    del widget
+    gc.collect()
+
+    cache.remove_dead()
+    assert len(cache) == 0
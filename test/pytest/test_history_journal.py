@@ -0,0 +1,77 @@
+import io
+
+import pytest
+
+from mxcubeqt.utils.history_journal import HistoryJournal
+
+
+def make_entry(date, index):
+    return (
+        "sample_%d" % index,
+        date,
+        "10:%02d:00" % (index % 60),
+        "Data collection",
+        "Successful",
+        "%d images" % index,
+    )
+
+
+def test_entries_indexed_by_date(tmpdir):
+    filename = str(tmpdir.join("history.jsonl"))
+    journal = HistoryJournal(filename)
+    journal.append(make_entry("2020.01.02", 0))
+    journal.append(make_entry("2020.01.01", 1))
+    journal.append(make_entry("2020.01.02", 2))
+
+    assert journal.get_dates() == ["2020.01.01", "2020.01.02"]
+    assert journal.read_day("2020.01.02") == [
+        make_entry("2020.01.02", 0),
+        make_entry("2020.01.02", 2),
+    ]
+    assert journal.read_day("2020.01.03") == []
+
+
+def test_reopened_journal_appends(tmpdir):
+    filename = str(tmpdir.join("history.jsonl"))
+    journal = HistoryJournal(filename)
+    for index in range(10):
+        journal.append(make_entry("2020.01.%02d" % (index % 3 + 1), index))
+    journal.close()
+    size = tmpdir.join("history.jsonl").size()
+
+    journal = HistoryJournal(filename)
+    assert journal.entry_count == 10
+    assert len(journal.read_day("2020.01.01")) == 4
+
+    journal.append(make_entry("2020.01.01", 10))
+    journal.close()
+    # previous entries are not rewritten
+    with io.open(filename, "rb") as journal_file:
+        assert len(journal_file.read()) > size
+    assert len(HistoryJournal(filename).read_day("2020.01.01")) == 5
+
+
+def test_partial_line_skipped(tmpdir):
+    filename = str(tmpdir.join("history.jsonl"))
+    journal = HistoryJournal(filename)
+    journal.append(make_entry("2020.01.01", 0))
+    journal.close()
+    with io.open(filename, "ab") as journal_file:
+        journal_file.write(b'["sample_1","2020.01.01"')
+
+    journal = HistoryJournal(filename)
+    journal.append(make_entry("2020.01.01", 2))
+    assert journal.entry_count == 2
+    assert journal.read_day("2020.01.01") == [
+        make_entry("2020.01.01", 0),
+        make_entry("2020.01.01", 2),
+    ]
+
+
+def test_invalid_entry_rejected(tmpdir):
+    journal = HistoryJournal(str(tmpdir.join("history.jsonl")))
+    with pytest.raises(ValueError):
+        journal.append(("sample", "2020.01.01"))
+    tmpdir.join("other.txt").write("not a journal\n")
+    with pytest.raises(ValueError):
+        HistoryJournal(str(tmpdir.join("other.txt")))
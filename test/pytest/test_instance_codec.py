@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import pickle
+
+import pytest
+
+from mxcubeqt.utils import instance_codec
+from mxcubeqt.utils.instance_sync import MirrorState, MirrorStateReceiver
+
+
+def test_delta_round_trip():
+    delta = (
+        12,
+        "sample_changer_brick",
+        "status_ledit",
+        "setText",
+        (u"Loaded é", 3, -2 ** 40, 0.125, True, False, None, b"\x00\x01"),
+        True,
+    )
+    data = instance_codec.encode_message(1, instance_codec.DELTA, delta)
+    assert isinstance(data, bytes)
+    assert data.startswith(instance_codec.MAGIC)
+    assert instance_codec.decode_message(data) == delta
+
+
+def test_nested_values_round_trip():
+    delta = (1, "brick", "", "setValues", (("a", (1, [2.5, None])), [u"ü"]), False)
+    data = instance_codec.encode_message(1, instance_codec.DELTA, delta)
+    decoded = instance_codec.decode_message(data)
+    assert decoded == delta
+    assert isinstance(decoded[4][0], tuple)
+    assert isinstance(decoded[4][1], list)
+
+
+def test_deltas_and_snapshot_round_trip():
+    state = MirrorState()
+    deltas = [
+        state.update("brick_%d" % (index % 7), "widget_%d" % index, "setValue",
+                     (index * 0.5,), index % 2 == 0)
+        for index in range(500)
+    ]
+    data = instance_codec.encode_message(1, instance_codec.DELTAS, deltas)
+    assert instance_codec.decode_message(data) == deltas
+
+    snapshot = state.get_snapshot()
+    data = instance_codec.encode_message(1, instance_codec.SNAPSHOT, snapshot)
+    assert len(data) < len(pickle.dumps(snapshot))
+
+    applied = []
+    receiver = MirrorStateReceiver(
+        lambda *state_args: applied.append(state_args), lambda number: None
+    )
+    receiver.apply_snapshot(instance_codec.decode_message(data))
+    assert sorted(applied) == sorted(snapshot[1])
+
+
+def test_legacy_version_and_unsupported_values():
+    delta = (1, "brick", "widget", "setText", ("text",), True)
+    assert instance_codec.encode_message(
+        instance_codec.LEGACY_CODEC_VERSION, instance_codec.DELTA, delta
+    ) is delta
+    assert instance_codec.decode_message(delta) is delta
+
+    unsupported = (1, "brick", "widget", "setValue", (object(),), True)
+    assert instance_codec.encode_message(
+        1, instance_codec.DELTA, unsupported
+    ) is unsupported
+    too_large = (1, "brick", "widget", "setValue", (2 ** 64,), True)
+    assert instance_codec.encode_message(
+        1, instance_codec.DELTA, too_large
+    ) is too_large
+    long_name = (1, "brick" * 100, "widget", "setValue", (1,), True)
+    assert instance_codec.encode_message(
+        1, instance_codec.DELTA, long_name
+    ) is long_name
+
+
+def test_batch_encoding():
+    deltas = [
+        (index + 1, "brick", "ledit_%d" % index, "setText", ("text",), True)
+        for index in range(3)
+    ]
+    # A single delta is smaller pickled than in a frame
+    assert instance_codec.encode_deltas(1, deltas[:1]) == (
+        instance_codec.DELTA,
+        deltas[0],
+    )
+    message_type, data = instance_codec.encode_deltas(1, deltas)
+    assert message_type == instance_codec.DELTAS
+    assert instance_codec.decode_message(data) == deltas
+
+
+def test_invalid_frames():
+    delta = (1, "brick", "widget", "setText", ("text",), True)
+    data = instance_codec.encode_message(1, instance_codec.DELTA, delta)
+    # Data without the magic is not a frame
+    assert instance_codec.decode_message(b"XYZ" + data[3:]) == b"XYZ" + data[3:]
+    with pytest.raises(ValueError):
+        instance_codec.decode_message(data[:3] + b"\xff" + data[4:])
+    with pytest.raises(ValueError):
+        instance_codec.decode_message(data + b"N")
+    with pytest.raises(ValueError):
+        instance_codec.decode_message(data[:-4])
+
+
+def test_negotiate_codec_version():
+    versions = instance_codec.get_codec_versions()
+    assert instance_codec.negotiate_codec_version([versions, versions]) == max(
+        versions
+    )
+    assert (
+        instance_codec.negotiate_codec_version([versions, []])
+        == instance_codec.LEGACY_CODEC_VERSION
+    )
+    assert (
+        instance_codec.negotiate_codec_version([[99]])
+        == instance_codec.LEGACY_CODEC_VERSION
+    )
@@ -0,0 +1,47 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from mxcubeqt.utils import qt_import
+
+APP = qt_import.QApplication.instance() or qt_import.QApplication([])
+
+import pytest
+
+from mxcubeqt import base_components
+from mxcubeqt.base_components import BaseWidget
+from mxcubeqt.bricks.instance_list_brick import InstanceListBrick
+
+
+@pytest.fixture(autouse=True)
+def hardware_repository(monkeypatch):
+    """Bricks connect to the hardware repository when they are built"""
+    repository = object()
+    monkeypatch.setattr(
+        base_components.HWR, "get_hardware_repository", lambda: repository
+    )
+
+
+def test_client_widget_change_mirrored():
+    instance_list = InstanceListBrick(None, "mirror_instance_list")
+    brick = BaseWidget(None, "mirror_brick")
+    brick.value_ledit = qt_import.QLineEdit(brick)
+
+    instance_list.update_mirror_state(brick.value_ledit.setText, ("a",), False)
+
+    assert instance_list.mirror_state.get_snapshot() == (
+        0,
+        [("mirror_brick", "value_ledit", "setText", ("a",), False)],
+    )
+
+
+def test_state_messages_not_mirrored():
+    instance_list = InstanceListBrick(None, "control_instance_list")
+
+    # Relayed to the server as calls of the instance list brick
+    instance_list.update_mirror_state(instance_list.resync_state, (3,), False)
+    instance_list.update_mirror_state(
+        instance_list.set_client_codec_versions, ("token", [1]), False
+    )
+
+    assert len(instance_list.mirror_state) == 0
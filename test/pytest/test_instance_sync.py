@@ -0,0 +1,245 @@
+import pickle
+
+import gevent
+from gevent import socket
+
+from mxcubeqt.utils.instance_sync import (
+    BrickUpdateBatcher,
+    MirrorState,
+    MirrorStateReceiver,
+)
+
+TERMINATOR = b"@@END@@"
+
+
+class LoopbackRig(object):
+    """Server broadcasting brick updates to observers over loopback sockets"""
+
+    def __init__(self, num_observers):
+        self.listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listen_socket.bind(("127.0.0.1", 0))
+        self.listen_socket.listen(num_observers)
+        address = self.listen_socket.getsockname()
+
+        self.client_sockets = []
+        self.server_sockets = []
+        self.states = []
+        self.message_counts = []
+        for index in range(num_observers):
+            client_socket = socket.create_connection(address)
+            self.server_sockets.append(self.listen_socket.accept()[0])
+            self.client_sockets.append(client_socket)
+            self.states.append({})
+            self.message_counts.append(0)
+            gevent.spawn(self._observe, index, client_socket)
+
+    def broadcast(self, brick_name, widget_name, method_name, method_args,
+                  master_sync):
+        data = pickle.dumps(
+            (brick_name, widget_name, method_name, method_args, master_sync)
+        )
+        for server_socket in self.server_sockets:
+            server_socket.sendall(data + TERMINATOR)
+
+    def _observe(self, index, client_socket):
+        buffer = b""
+        while True:
+            data = client_socket.recv(4096)
+            if not data:
+                break
+            buffer += data
+            messages = buffer.split(TERMINATOR)
+            buffer = messages.pop()
+            for message in messages:
+                brick_name, widget_name, method_name, method_args, _ = \
+                    pickle.loads(message)
+                self.states[index][(brick_name, widget_name, method_name)] = \
+                    method_args
+                self.message_counts[index] += 1
+
+    def close(self):
+        for sock in self.client_sockets + self.server_sockets:
+            sock.close()
+        self.listen_socket.close()
+
+
+def type_text(batcher, text, interval=0.002):
+    for index in range(1, len(text) + 1):
+        batcher.add("brick", "ledit", "setText", (text[:index],), True)
+        gevent.sleep(interval)
+
+
+def test_typing_mirrored_to_observers():
+    rig = LoopbackRig(4)
+    batcher = BrickUpdateBatcher(rig.broadcast, window=0.02)
+    text = "mirrored line edit text " * 4
+
+    type_text(batcher, text)
+    gevent.sleep(0.2)
+
+    for state, message_count in zip(rig.states, rig.message_counts):
+        assert state == {("brick", "ledit", "setText"): (text,)}
+        assert message_count < len(text) / 2
+    statistics = batcher.get_statistics()
+    assert statistics["update_count"] == len(text)
+    assert statistics["message_count"] == rig.message_counts[0]
+    assert statistics["update_rate"] > statistics["message_rate"]
+    rig.close()
+
+
+def test_updates_of_different_widgets_kept_in_order():
+    sent = []
+    batcher = BrickUpdateBatcher(lambda *args: sent.append(args[:4]), 60)
+    batcher.add("brick", "combo", "setCurrentIndex", (1,), True)
+    batcher.add("brick", "ledit", "setText", ("a",), True)
+    batcher.add("brick", "combo", "setCurrentIndex", (2,), True)
+    assert batcher.get_pending_count() == 2
+
+    batcher.flush()
+    assert sent == [
+        ("brick", "ledit", "setText", ("a",)),
+        ("brick", "combo", "setCurrentIndex", (2,)),
+    ]
+    assert batcher.get_statistics()["merged_count"] == 1
+
+
+def test_window_sent_as_one_batch():
+    batches = []
+
+    def send_batch(updates):
+        batches.append(updates)
+        return 1
+
+    batcher = BrickUpdateBatcher(None, 0.02, send_batch)
+    for text in ("a", "ab", "abc"):
+        batcher.add("brick", "ledit", "setText", (text,), True)
+    batcher.add("brick", "combo", "setCurrentIndex", (2,), False)
+    gevent.sleep(0.1)
+
+    assert batches == [
+        [
+            ("brick", "ledit", "setText", ("abc",), True),
+            ("brick", "combo", "setCurrentIndex", (2,), False),
+        ]
+    ]
+    statistics = batcher.get_statistics()
+    assert statistics["message_count"] == 1
+    assert statistics["batch_count"] == 1
+
+
+def test_failed_send_counted():
+    def send(*args):
+        raise IOError("client closed")
+
+    batcher = BrickUpdateBatcher(send, 60)
+    batcher.add("brick", "ledit", "setText", ("a",), True)
+    batcher.flush()
+    assert batcher.get_statistics()["error_count"] == 1
+    assert batcher.get_pending_count() == 0
+
+
+class Client(object):
+    def __init__(self, server_state):
+        self.server_state = server_state
+        self.widgets = {}
+        self.resync_requests = []
+        self.receiver = MirrorStateReceiver(self.apply, self.resync)
+
+    def apply(self, brick_name, widget_name, method_name, method_args,
+              master_sync):
+        self.widgets[(brick_name, widget_name)] = method_args
+
+    def resync(self, sequence_number):
+        self.resync_requests.append(sequence_number)
+        deltas = self.server_state.get_deltas_since(sequence_number)
+        if deltas is None:
+            self.receiver.apply_snapshot(self.server_state.get_snapshot())
+        else:
+            self.receiver.apply_deltas(deltas)
+
+
+def update(state, widget_name, value):
+    return state.update("brick", widget_name, "setText", (value,), True)
+
+
+def test_late_client_gets_snapshot_of_latest_states():
+    state = MirrorState()
+    for index in range(10000):
+        update(state, "ledit_%d" % (index % 5), str(index))
+    sequence_number, states = state.get_snapshot()
+    assert sequence_number == 10000
+    assert len(states) == 5
+
+    client = Client(state)
+    # delta received before the snapshot is applied after it
+    client.receiver.apply_delta(update(state, "ledit_0", "new"))
+    client.receiver.apply_snapshot((sequence_number, states))
+
+    assert client.widgets[("brick", "ledit_0")] == ("new",)
+    assert client.widgets[("brick", "ledit_4")] == ("9999",)
+    assert client.receiver.sequence_number == 10001
+
+
+def test_gap_resynchronized_with_missing_deltas():
+    state = MirrorState(history_size=10)
+    client = Client(state)
+    client.receiver.apply_snapshot(state.get_snapshot())
+
+    client.receiver.apply_delta(update(state, "ledit", "a"))
+    update(state, "ledit", "b")
+    update(state, "other", "c")
+    client.receiver.apply_delta(update(state, "ledit", "d"))
+
+    assert client.resync_requests == [1]
+    assert client.widgets == {("brick", "ledit"): ("d",), ("brick", "other"): ("c",)}
+    assert client.receiver.statistics["gap_count"] == 1
+    assert not client.receiver.resyncing
+
+    # duplicates are ignored
+    client.receiver.apply_deltas(state.get_deltas_since(0))
+    assert client.widgets[("brick", "ledit")] == ("d",)
+
+
+def test_gap_beyond_history_resynchronized_with_snapshot():
+    state = MirrorState(history_size=10)
+    client = Client(state)
+    client.receiver.apply_snapshot(state.get_snapshot())
+    for index in range(50):
+        update(state, "ledit", str(index))
+    client.receiver.apply_delta(update(state, "ledit", "last"))
+
+    assert state.get_deltas_since(0) is None
+    assert client.receiver.statistics["snapshot_count"] == 2
+    assert client.widgets == {("brick", "ledit"): ("last",)}
+    assert client.receiver.sequence_number == 51
+
+
+def test_old_snapshot_ignored():
+    state = MirrorState()
+    client = Client(state)
+    old_snapshot = state.get_snapshot()
+    client.receiver.apply_snapshot(old_snapshot)
+    client.receiver.apply_delta(update(state, "ledit", "a"))
+    client.receiver.apply_snapshot(old_snapshot)
+
+    assert client.receiver.sequence_number == 1
+    assert client.receiver.statistics["snapshot_count"] == 1
+
+
+def test_client_change_added_to_snapshot():
+    state = MirrorState()
+    update(state, "ledit", "a")
+    # Changes of clients are relayed by the server without a delta
+    state.set_state("brick", "spinbox", "setValue", (3,), False)
+    state.set_state("brick", "ledit", "setText", ("b",), True)
+
+    assert state.get_snapshot() == (
+        1,
+        [
+            ("brick", "spinbox", "setValue", (3,), False),
+            ("brick", "ledit", "setText", ("b",), True),
+        ],
+    )
+    client = Client(state)
+    client.receiver.apply_snapshot(state.get_snapshot())
+    assert client.widgets == {("brick", "ledit"): ("b",), ("brick", "spinbox"): (3,)}
@@ -0,0 +1,128 @@
+from mxcubecore.HardwareObjects import queue_model_objects
+
+from mxcubeqt.utils.path_collision_index import PathCollisionIndex
+
+
+def PathTemplate(directory, prefix, run_number, start_num=1, num_files=10):
+    path_template = queue_model_objects.PathTemplate()
+    path_template.directory = directory
+    path_template.base_prefix = prefix
+    path_template.run_number = run_number
+    path_template.start_num = start_num
+    path_template.num_files = num_files
+    return path_template
+
+
+class Node(object):
+    pass
+
+
+def test_collision_found():
+    index = PathCollisionIndex()
+    pt_a = PathTemplate("/data", "lyso", 1)
+    pt_b = PathTemplate("/data", "lyso", 1, start_num=5)
+    index.add(Node(), pt_a)
+    index.add(Node(), pt_b)
+
+    assert index.has_collision(pt_a)
+    assert index.get_collisions(pt_b) == [pt_a]
+
+
+def test_no_collision():
+    index = PathCollisionIndex()
+    pt_a = PathTemplate("/data", "lyso", 1)
+    index.add(Node(), pt_a)
+    index.add(Node(), PathTemplate("/data", "lyso", 2))
+    index.add(Node(), PathTemplate("/data", "thau", 1))
+    index.add(Node(), PathTemplate("/data", "lyso", 1, start_num=11))
+
+    assert not index.has_collision(pt_a)
+
+
+def test_consecutive_image_ranges():
+    index = PathCollisionIndex()
+    index.add(Node(), PathTemplate("/data", "lyso", 1, start_num=1, num_files=100))
+
+    assert not index.has_collision(
+        PathTemplate("/data", "lyso", 1, start_num=101, num_files=100)
+    )
+    assert index.has_collision(
+        PathTemplate("/data", "lyso", 1, start_num=100, num_files=100)
+    )
+
+
+def test_directories_normalized():
+    index = PathCollisionIndex()
+    index.add(Node(), PathTemplate("/data/", "lyso", 1))
+
+    assert index.has_collision(PathTemplate("/data", "lyso", 1))
+    assert index.has_collision(PathTemplate("/data/./", "lyso", 1))
+
+
+def test_not_indexed_path_template():
+    index = PathCollisionIndex()
+    index.add(Node(), PathTemplate("/data", "lyso", 1))
+
+    assert index.has_collision(PathTemplate("/data", "lyso", 1))
+    assert not index.has_collision(PathTemplate("/data", "lyso", 3))
+
+
+def test_remove():
+    index = PathCollisionIndex()
+    node_a, node_b = Node(), Node()
+    pt_a = PathTemplate("/data", "lyso", 1)
+    index.add(node_a, pt_a)
+    index.add(node_b, PathTemplate("/data", "lyso", 1))
+
+    index.remove(node_b)
+    index.remove(node_b)
+
+    assert not index.has_collision(pt_a)
+    assert len(index) == 1
+
+
+def test_update_after_edit():
+    index = PathCollisionIndex()
+    node_a, node_b = Node(), Node()
+    pt_a = PathTemplate("/data", "lyso", 1)
+    pt_b = PathTemplate("/data", "lyso", 2)
+    index.add(node_a, pt_a)
+    index.add(node_b, pt_b)
+
+    pt_b.run_number = 1
+    assert not index.has_collision(pt_a)
+    index.update(node_b)
+    assert index.has_collision(pt_a)
+
+    pt_b.base_prefix = "thau"
+    assert index.update_all() == 1
+    assert not index.has_collision(pt_a)
+
+
+def test_update_replaced_path_template():
+    index = PathCollisionIndex()
+    node_a, node_b = Node(), Node()
+    pt_a = PathTemplate("/data", "lyso", 1)
+    index.add(node_a, pt_a)
+    index.add(node_b, PathTemplate("/data", "thau", 1))
+
+    index.update(node_b, PathTemplate("/data", "lyso", 1))
+
+    assert index.has_collision(pt_a)
+    assert len(index) == 2
+
+
+def test_queue_of_many_collections():
+    index = PathCollisionIndex()
+    path_templates = [
+        PathTemplate("/data/%d" % (num % 10), "lyso", num) for num in range(10000)
+    ]
+    for path_template in path_templates:
+        index.add(Node(), path_template)
+
+    assert not any(index.has_collision(pt) for pt in path_templates)
+
+    duplicate = PathTemplate("/data/3", "lyso", 5003, start_num=10)
+    index.add(Node(), duplicate)
+    assert index.get_collisions(duplicate) == [path_templates[5003]]
+    assert index.has_collision(path_templates[5003])
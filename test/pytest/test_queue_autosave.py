@@ -0,0 +1,211 @@
+import gevent
+import jsonpickle
+
+from mxcubecore.model import queue_model_objects
+
+from mxcubeqt.utils.queue_autosave import (
+    MemoryQueueStore,
+    QueueAutosave,
+    QueueSerializer,
+    encode_task_group,
+    write_queue,
+)
+
+
+KEY_ARGS = ("mx1234", "id00")
+
+
+class Node(object):
+    def __init__(self, parent=None, location=None):
+        self.parent = parent
+        self.children = []
+        self.location = location
+        if parent is not None:
+            parent.children.append(self)
+
+    def get_parent(self):
+        return self.parent
+
+
+class Entry(object):
+    """Queue entry of a data model node"""
+
+    def __init__(self, node):
+        self.node = node
+
+    def get_data_model(self):
+        return self.node
+
+    def get_queue_entry_list(self):
+        return [Entry(child) for child in self.node.children]
+
+
+def create_autosave(delay=0.05):
+    queue = []
+    store = MemoryQueueStore()
+    calls = []
+
+    def save(changed_nodes):
+        calls.append(changed_nodes)
+        return write_queue(store, KEY_ARGS, "free-pin", queue)
+
+    autosave = QueueAutosave(save, delay)
+    autosave.calls = calls
+    return queue, store, autosave
+
+
+def create_queue():
+    """Root with two samples holding a task group each"""
+    root = Node()
+    samples = [Node(root, (1, index)) for index in range(2)]
+    task_groups = [Node(sample) for sample in samples]
+    tasks = [Node(task_group) for task_group in task_groups]
+    return [Entry(sample) for sample in samples], task_groups, tasks
+
+
+def encode(node):
+    return "group%d" % id(node)
+
+
+def test_changes_saved_once_per_window():
+    queue, store, autosave = create_autosave()
+
+    for index in range(500):
+        node = Node()
+        queue.append(index)
+        autosave.mark_dirty(node)
+    assert autosave.calls == []
+    assert len(autosave.get_dirty_nodes()) == 500
+
+    gevent.sleep(0.2)
+
+    assert len(autosave.calls) == 1
+    assert len(autosave.calls[0]) == 500
+    assert store.get("mxcube:mx1234:id00:queue_current") == repr(list(range(500)))
+    assert store.get("mxcube:mx1234:id00:queue_model") == "free-pin"
+    assert not autosave.is_dirty()
+
+
+def test_unknown_change_saves_all():
+    queue, store, autosave = create_autosave()
+    autosave.mark_dirty(Node())
+    autosave.mark_dirty()
+    autosave.flush()
+
+    assert autosave.calls == [None]
+
+
+def test_statistics_report_time_and_size():
+    queue, store, autosave = create_autosave()
+    queue.extend(range(10))
+    autosave.mark_dirty()
+    autosave.flush()
+
+    statistics = autosave.get_statistics()
+    assert statistics["save_count"] == 1
+    assert statistics["change_count"] == 1
+    assert statistics["last_save_size"] == len(
+        store.get("mxcube:mx1234:id00:queue_current")
+    )
+    assert statistics["last_save_time"] >= 0
+
+
+def test_flush_and_cancel():
+    queue, store, autosave = create_autosave(delay=10)
+    autosave.mark_dirty()
+    autosave.flush()
+    assert len(autosave.calls) == 1
+
+    autosave.flush()
+    assert len(autosave.calls) == 1
+
+    autosave.mark_dirty()
+    autosave.cancel()
+    gevent.sleep(0.05)
+    assert len(autosave.calls) == 1
+    assert not autosave.is_dirty()
+
+
+def test_failed_save_kept_dirty():
+    def fail(changed_nodes):
+        raise IOError("no space left")
+
+    autosave = QueueAutosave(fail, 0.01)
+    node = Node()
+    autosave.mark_dirty(node)
+    gevent.sleep(0.1)
+
+    assert autosave.get_statistics()["error_count"] == 1
+    assert autosave.get_dirty_nodes() == [node]
+
+
+def test_disabled_autosave_ignores_changes():
+    queue, store, autosave = create_autosave()
+    autosave.enabled = False
+    autosave.mark_dirty()
+    gevent.sleep(0.1)
+    assert autosave.calls == []
+
+
+def test_serializer_encodes_changed_task_groups():
+    sample_entries, task_groups, tasks = create_queue()
+    serializer = QueueSerializer(encode)
+
+    queue_list = serializer.get_queue_list(sample_entries)
+    assert queue_list == [
+        {"sample_location": (1, 0), "task_group_entry": encode(task_groups[0])},
+        {"sample_location": (1, 1), "task_group_entry": encode(task_groups[1])},
+    ]
+    assert serializer.statistics == {"encoded_count": 2, "reused_count": 0}
+
+    # A task of the second task group changed
+    assert serializer.get_queue_list(sample_entries, [tasks[1]]) == queue_list
+    assert serializer.statistics == {"encoded_count": 3, "reused_count": 1}
+
+    # Unknown change
+    serializer.get_queue_list(sample_entries, None)
+    assert serializer.statistics == {"encoded_count": 5, "reused_count": 1}
+
+
+def test_serializer_sample_change_encodes_all():
+    sample_entries, task_groups, tasks = create_queue()
+    serializer = QueueSerializer(encode)
+    serializer.get_queue_list(sample_entries)
+
+    serializer.get_queue_list(sample_entries, [sample_entries[0].get_data_model()])
+
+    assert serializer.statistics == {"encoded_count": 4, "reused_count": 0}
+
+
+def test_serializer_follows_queue_changes():
+    sample_entries, task_groups, tasks = create_queue()
+    serializer = QueueSerializer(encode)
+    serializer.get_queue_list(sample_entries)
+
+    # Task group added to the first sample, task group of the second removed
+    new_task_group = Node(sample_entries[0].get_data_model())
+    sample_entries[1].get_data_model().children.remove(task_groups[1])
+    queue_list = serializer.get_queue_list(sample_entries, [new_task_group])
+
+    assert [item["task_group_entry"] for item in queue_list] == [
+        encode(task_groups[0]),
+        encode(new_task_group),
+    ]
+    assert serializer.statistics == {"encoded_count": 3, "reused_count": 1}
+
+
+def test_task_group_encoded_without_sample():
+    sample = queue_model_objects.Sample()
+    task_group = queue_model_objects.TaskGroup()
+    data_collection = queue_model_objects.DataCollection()
+    sample._children.append(task_group)
+    task_group._parent = sample
+    task_group._children.append(data_collection)
+    data_collection._parent = task_group
+
+    decoded = jsonpickle.decode(encode_task_group(task_group))
+
+    assert task_group._parent is sample
+    assert decoded._parent is None
+    assert len(decoded.get_children()) == 1
+    assert decoded.get_children()[0]._parent is decoded
@@ -0,0 +1,204 @@
+import gzip
+import json
+
+import jsonpickle
+import pytest
+
+from mxcubeqt.utils import queue_file
+
+
+class Node(object):
+    def __init__(self, name, **values):
+        self._parent = None
+        self._children = []
+        self._name = name
+        self.values = values
+
+    def get_children(self):
+        return self._children
+
+    def add_child(self, child):
+        child._parent = self
+        self._children.append(child)
+
+
+class Sample(Node):
+    def __init__(self, name, location=None, **values):
+        Node.__init__(self, name, **values)
+        self.location = location
+
+
+class DataCollection(Node):
+    pass
+
+
+NODE_CLASSES = {"Node": Node, "Sample": Sample, "DataCollection": DataCollection}
+
+
+class QueueModel(object):
+    def __init__(self):
+        self.root = Node("root")
+        self.added = []
+
+    def get_model_root(self):
+        return self.root
+
+    def add_child(self, parent, child):
+        parent.add_child(child)
+        self.added.append(child)
+
+
+def create_queue(num_samples=3, num_collections=2):
+    root = Node("root")
+    for sample_index in range(num_samples):
+        sample = Sample("sample %d" % sample_index, location=(1, sample_index + 1))
+        root.add_child(sample)
+        group = Node("group")
+        sample.add_child(group)
+        for index in range(num_collections):
+            group.add_child(
+                DataCollection(
+                    "dc %d" % index, osc_range=0.1, energy=12.7, tags=set(["a"])
+                )
+            )
+    return root
+
+
+def encode_tree(node):
+    """Current format of the queue model: the tree encoded by jsonpickle"""
+    return jsonpickle.encode(
+        [(child.__class__.__name__, child.__dict__) for child in node.get_children()]
+    )
+
+
+@pytest.mark.parametrize("filename", ["queue.mxq", "queue.mxq.gz"])
+def test_round_trip(tmpdir, filename):
+    root = create_queue()
+    path = str(tmpdir.join(filename))
+
+    assert queue_file.save_queue(root, path) == 12
+    assert queue_file.is_queue_file(path)
+
+    queue_model = QueueModel()
+    top_level_nodes = queue_file.load_queue(path, queue_model, NODE_CLASSES)
+
+    assert len(top_level_nodes) == 3
+    assert len(queue_model.added) == 12
+    assert encode_tree(queue_model.root) == encode_tree(root)
+    collection = queue_model.root.get_children()[2].get_children()[0].get_children()[1]
+    assert isinstance(collection, DataCollection)
+    assert collection.values["tags"] == set(["a"])
+    assert collection._parent._parent is queue_model.root.get_children()[2]
+
+
+def test_progress_reported(tmpdir):
+    path = str(tmpdir.join("queue.mxq"))
+    queue_file.save_queue(create_queue(10, 5), path)
+    progress = []
+
+    queue_file.load_queue(
+        path, QueueModel(), NODE_CLASSES, progress.append, progress_interval=20
+    )
+    assert progress == [20, 40, 60]
+
+
+def test_tasks_added_to_samples_by_location(tmpdir):
+    path = str(tmpdir.join("queue.mxq"))
+    queue_file.save_queue(create_queue(), path, "ispyb")
+    assert queue_file.get_model_name(path) == "ispyb"
+
+    # Samples shown in the tree, the first saved sample is not there anymore
+    queue_model = QueueModel()
+    samples = {}
+    for index in (1, 2, 3):
+        sample = Sample("current %d" % index, location=(1, index + 1))
+        queue_model.root.add_child(sample)
+        samples[sample.location] = sample
+
+    task_groups = queue_file.load_queue(
+        path, queue_model, NODE_CLASSES, samples=samples
+    )
+
+    assert [group._parent for group in task_groups] == [
+        samples[(1, 2)],
+        samples[(1, 3)],
+    ]
+    assert len(queue_model.root.get_children()) == 3
+    assert len(queue_model.added) == 6
+    assert not samples[(1, 4)].get_children()
+
+
+def write_lines(path, documents):
+    with open(path, "w") as output:
+        for document in documents:
+            output.write(json.dumps(document) + "\n")
+
+
+def load(path):
+    return queue_file.load_queue(path, QueueModel(), NODE_CLASSES)
+
+
+def test_not_a_queue_file(tmpdir):
+    path = str(tmpdir.join("queue.dat"))
+    with open(path, "w") as output:
+        output.write(jsonpickle.encode(create_queue()))
+
+    assert not queue_file.is_queue_file(path)
+    with pytest.raises(queue_file.QueueFileError):
+        load(path)
+
+
+def test_unsupported_version(tmpdir):
+    path = str(tmpdir.join("queue.mxq"))
+    write_lines(path, [{"format": queue_file.FORMAT_NAME, "version": 99}])
+    with pytest.raises(queue_file.QueueFileError, match="version"):
+        load(path)
+
+
+def test_invalid_records(tmpdir):
+    path = str(tmpdir.join("queue.mxq"))
+    header = {"format": queue_file.FORMAT_NAME, "version": 1}
+    record = {"id": 1, "parent": 0, "class": "Sample", "state": {}}
+
+    write_lines(path, [header, dict(record, parent=5)])
+    with pytest.raises(queue_file.QueueFileError, match="parent"):
+        load(path)
+
+    write_lines(path, [header, record, record])
+    with pytest.raises(queue_file.QueueFileError, match="twice"):
+        load(path)
+
+    write_lines(path, [header, {"id": 1}])
+    with pytest.raises(queue_file.QueueFileError, match="invalid"):
+        load(path)
+
+    write_lines(path, [header, dict(record, **{"class": "os.system"})])
+    with pytest.raises(queue_file.QueueFileError, match="Unknown"):
+        load(path)
+
+
+def test_truncated_file(tmpdir):
+    path = str(tmpdir.join("queue.mxq.gz"))
+    queue_file.save_queue(create_queue(), path)
+    with gzip.open(path, "rt") as input_file:
+        lines = input_file.readlines()
+    with gzip.open(path, "wt") as output:
+        output.writelines(lines[:-2])
+
+    with pytest.raises(queue_file.QueueFileError, match="truncated"):
+        load(path)
+
+
+def test_failed_save_keeps_previous_file(tmpdir, monkeypatch):
+    path = str(tmpdir.join("queue.mxq.gz"))
+    queue_file.save_queue(create_queue(), path)
+
+    def fail(*args):
+        raise TypeError("not serializable")
+
+    monkeypatch.setattr(queue_file, "encode_node", fail)
+    with pytest.raises(TypeError):
+        queue_file.save_queue(create_queue(10, 5), path)
+
+    assert len(load(path)) == 3
+    assert tmpdir.listdir() == [tmpdir.join("queue.mxq.gz")]
@@ -0,0 +1,127 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from mxcubeqt.utils import qt_import
+
+APP = qt_import.QApplication.instance() or qt_import.QApplication([])
+
+from mxcubecore.HardwareObjects import queue_model_objects
+
+from mxcubeqt.utils import queue_item
+from mxcubeqt.utils.sample_filter import SampleFilter
+from mxcubeqt.utils.sample_filter_criteria import (
+    get_basket_indexes,
+    parse_filter_text,
+)
+
+
+def test_words_filter_on_default_field():
+    assert parse_filter_text("lyso 12", "name") == {"name": "lyso 12"}
+    assert parse_filter_text("", "name") == {}
+
+
+def test_combined_criteria():
+    criteria = parse_filter_text("lyso acronym:TRYP basket:1,2 collected:no", "name")
+    assert criteria == {
+        "name": "lyso",
+        "acronym": "TRYP",
+        "basket": "1,2",
+        "collected": "no",
+    }
+
+
+def test_unknown_field_is_a_word():
+    assert parse_filter_text("a:b", "acronym") == {"acronym": "a:b"}
+
+
+def test_basket_indexes():
+    assert get_basket_indexes("3") == set([3])
+    assert get_basket_indexes("1, 2,x,") == set([1, 2])
+
+
+class SampleTree(object):
+    """Two baskets with two samples each, with the item index of
+       DataCollectTree
+    """
+
+    def __init__(self):
+        self.tree_widget = qt_import.QTreeWidget()
+        self.item_index_version = 0
+        self.items = []
+        self.samples = []
+        self.collections = []
+        for basket_index in (1, 2):
+            basket = queue_model_objects.Basket()
+            basket.location = (basket_index,)
+            basket_item = self.add_item(
+                self.tree_widget, basket, "Puck %d" % basket_index
+            )
+            for sample_index in (1, 2):
+                sample = queue_model_objects.Sample()
+                sample.location = (basket_index, sample_index)
+                sample_item = self.add_item(
+                    basket_item, sample, "lyso-%d-%d" % (basket_index, sample_index)
+                )
+                group_item = self.add_item(
+                    sample_item, queue_model_objects.TaskGroup(), "Standard"
+                )
+                collection = queue_model_objects.DataCollection()
+                self.add_item(group_item, collection, "Collection")
+                self.samples.append(sample_item)
+                self.collections.append(collection)
+
+    def add_item(self, parent_item, model, name):
+        item = queue_item.MODEL_VIEW_MAPPINGS[model.__class__](parent_item, None, name)
+        item.setText(0, name)
+        item._data_model = model
+        self.items.append(item)
+        self.item_index_version += 1
+        return item
+
+    def get_indexed_items(self, item_class):
+        return [item for item in self.items if isinstance(item, item_class)]
+
+
+def get_hidden_names(visibility):
+    return sorted(str(item.text(0)) for item, hidden in visibility if hidden)
+
+
+def test_visibility_hides_baskets_without_shown_samples():
+    tree = SampleTree()
+    sample_filter = SampleFilter(tree)
+
+    visibility = sample_filter.get_visibility(parse_filter_text("lyso-2", "name"))
+
+    assert len(visibility) == 6
+    assert get_hidden_names(visibility) == ["Puck 1", "lyso-1-1", "lyso-1-2"]
+    assert get_hidden_names(sample_filter.get_visibility({})) == []
+
+
+def test_visibility_follows_renamed_samples():
+    tree = SampleTree()
+    sample_filter = SampleFilter(tree)
+    sample_filter.get_visibility({})
+
+    # Renaming does not change the item index
+    tree.samples[0].setText(0, "thau-1-1")
+    visibility = sample_filter.get_visibility(parse_filter_text("thau", "name"))
+
+    assert get_hidden_names(visibility) == [
+        "Puck 2",
+        "lyso-1-2",
+        "lyso-2-1",
+        "lyso-2-2",
+    ]
+
+
+def test_visibility_follows_collection_state():
+    tree = SampleTree()
+    sample_filter = SampleFilter(tree)
+    criteria = parse_filter_text("collected:yes", None)
+    assert len(get_hidden_names(sample_filter.get_visibility(criteria))) == 6
+
+    tree.collections[3].set_executed(True)
+    visibility = sample_filter.get_visibility(criteria)
+
+    assert get_hidden_names(visibility) == ["Puck 1", "lyso-1-1", "lyso-1-2", "lyso-2-1"]
@@ -0,0 +1,70 @@
+import gevent
+
+from mxcubeqt.utils.snapshot_cache import SnapshotCache
+
+
+class SampleView(object):
+    def __init__(self):
+        self.positions = (("phi", 0.0), ("zoom", 1))
+        self.grab_count = 0
+
+    def get_state(self):
+        return self.positions
+
+    def get_snapshot(self):
+        self.grab_count += 1
+        return "snapshot %d" % self.grab_count
+
+
+def create_cache(sample_view, time_window=60):
+    return SnapshotCache(
+        sample_view.get_snapshot, sample_view.get_state, 0.05, time_window
+    )
+
+
+def test_selections_grab_once():
+    sample_view = SampleView()
+    cache = create_cache(sample_view)
+    results = []
+
+    for index in range(100):
+        assert cache.get_snapshot(results.append) is None
+    assert sample_view.grab_count == 0
+
+    gevent.sleep(0.2)
+    assert sample_view.grab_count == 1
+    assert results == ["snapshot 1"] * 100
+
+    assert cache.get_snapshot(results.append) == "snapshot 1"
+    assert cache.statistics["hit_count"] == 1
+    assert sample_view.grab_count == 1
+
+
+def test_motor_move_grabs_again():
+    sample_view = SampleView()
+    cache = create_cache(sample_view)
+    assert cache.get_current_snapshot() == "snapshot 1"
+    assert cache.get_current_snapshot() == "snapshot 1"
+
+    sample_view.positions = (("phi", 90.0), ("zoom", 1))
+    # last snapshot is returned until the new one is grabbed
+    assert cache.get_snapshot() == "snapshot 1"
+    gevent.sleep(0.2)
+    assert cache.get_snapshot() == "snapshot 2"
+
+
+def test_unknown_state_not_cached():
+    sample_view = SampleView()
+    sample_view.positions = None
+    cache = create_cache(sample_view)
+
+    assert cache.get_current_snapshot() == "snapshot 1"
+    assert cache.get_current_snapshot() == "snapshot 2"
+
+
+def test_snapshot_outdated_after_time_window():
+    sample_view = SampleView()
+    cache = create_cache(sample_view, time_window=0.1)
+    cache.get_current_snapshot()
+    gevent.sleep(0.15)
+    assert cache.get_current_snapshot() == "snapshot 2"
@@ -0,0 +1,67 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from mxcubeqt.utils import qt_import
+
+APP = qt_import.QApplication.instance() or qt_import.QApplication([])
+
+import pytest
+
+from mxcubeqt import base_components
+from mxcubeqt.base_components import BaseWidget, WIDGET_REGISTRY
+from mxcubeqt.base_layout_items import BrickCfg
+
+
+@pytest.fixture(autouse=True)
+def hardware_repository(monkeypatch):
+    """Bricks connect to the hardware repository when they are built"""
+    repository = object()
+    monkeypatch.setattr(
+        base_components.HWR, "get_hardware_repository", lambda: repository
+    )
+
+
+def test_brick_registered_by_name():
+    brick = BaseWidget(None, "registry_brick")
+    assert WIDGET_REGISTRY.get_brick("registry_brick") is brick
+    assert WIDGET_REGISTRY.get_brick_widget("registry_brick", "") is brick
+
+
+def test_renamed_brick_found_by_new_name():
+    brick = BaseWidget(None, "old_brick")
+    brick.child_label = qt_import.QLabel(brick)
+    assert WIDGET_REGISTRY.get_brick_widget("old_brick", "child_label") is (
+        brick.child_label
+    )
+
+    brick_cfg = BrickCfg("old_brick", "BaseWidget", brick)
+    brick_cfg.rename("new_brick")
+
+    assert WIDGET_REGISTRY.get_brick("new_brick") is brick
+    assert WIDGET_REGISTRY.get_widget_by_name("new_brick") is brick
+    assert WIDGET_REGISTRY.get_brick("old_brick") is None
+    assert WIDGET_REGISTRY.get_brick_widget("old_brick", "child_label") is None
+    assert WIDGET_REGISTRY.get_brick_widget("new_brick", "child_label") is (
+        brick.child_label
+    )
+
+
+def test_brick_widget_names():
+    brick = BaseWidget(None, "names_brick")
+    brick.synced_spinbox = qt_import.QSpinBox(brick)
+    brick.other_label = qt_import.QLabel(brick)
+    WIDGET_REGISTRY.register_brick_widget(
+        "names_brick", "synced_spinbox", brick.synced_spinbox
+    )
+
+    assert WIDGET_REGISTRY.get_brick_widget_names(brick) == ("names_brick", "")
+    assert WIDGET_REGISTRY.get_brick_widget_names(brick.synced_spinbox) == (
+        "names_brick",
+        "synced_spinbox",
+    )
+    assert WIDGET_REGISTRY.get_brick_widget_names(brick.other_label) == (
+        "names_brick",
+        "other_label",
+    )
+    assert WIDGET_REGISTRY.get_brick_widget_names(qt_import.QLabel()) is None
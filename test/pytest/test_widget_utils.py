@@ -0,0 +1,122 @@
+import gc
+import os
+
+import gevent
+from mxcubecore.dispatcher import dispatcher
+
+from mxcubeqt.utils import widget_utils
+from mxcubeqt.utils.widget_utils import (
+    DataModelInputBinder,
+    ModelUpdateRegistry,
+    PathExistsCache,
+)
+
+
+class Model(object):
+    def __init__(self):
+        self.value = 0
+
+
+class CountingBinder(DataModelInputBinder):
+    def __init__(self, obj):
+        DataModelInputBinder.__init__(self, obj)
+        self.updates = []
+
+    def _update_widget(self, field_name, data_binder):
+        self.updates.append(field_name)
+
+
+def setup_function(function):
+    widget_utils.MODEL_UPDATE_REGISTRY = ModelUpdateRegistry()
+
+
+def send_update(model, field_name="value"):
+    dispatcher.send("model_update", model, field_name, None)
+
+
+def test_update_routed_to_model_binders():
+    model_a, model_b = Model(), Model()
+    binder_a = CountingBinder(model_a)
+    binder_b = CountingBinder(model_b)
+
+    send_update(model_a)
+
+    assert binder_a.updates == ["value"]
+    assert binder_b.updates == []
+
+
+def test_rebind_moves_subscription():
+    model_a, model_b = Model(), Model()
+    binder = CountingBinder(model_a)
+    binder.set_model(model_b)
+
+    send_update(model_a)
+    assert binder.updates == []
+
+    send_update(model_b)
+    assert binder.updates == ["value"]
+
+
+def test_destroyed_binder_is_detached():
+    registry = widget_utils.MODEL_UPDATE_REGISTRY
+    model = Model()
+    binder = CountingBinder(model)
+    other_binder = CountingBinder(model)
+
+    binder.destroy()
+    del other_binder
+    gc.collect()
+
+    assert registry.get_binders(model) == []
+    assert registry.get_model_count() == 0
+
+
+def test_dispatch_cost_constant_over_selections():
+    registry = widget_utils.MODEL_UPDATE_REGISTRY
+    models = [Model() for i in range(5000)]
+    binder = CountingBinder(models[0])
+
+    for model in models:
+        # a tree selection rebinds the parameter widget binder
+        binder.set_model(model)
+        send_update(model)
+
+    assert registry.get_binder_count() == 1
+    assert registry.get_model_count() == 1
+    assert registry.dispatch_count == len(models)
+    assert len(binder.updates) == len(models)
+
+
+def wait_for(results, length, timeout=5):
+    """Waits until results holds length items"""
+    with gevent.Timeout(timeout):
+        while len(results) < length:
+            gevent.sleep(0.01)
+
+
+def test_path_exists_checked_once(tmpdir):
+    cache = PathExistsCache(ttl=60)
+    existing_dir = str(tmpdir)
+    missing_dir = os.path.join(existing_dir, "missing")
+    results = []
+
+    assert cache.get(existing_dir, results.append) is None
+    assert cache.get(missing_dir, results.append) is None
+    wait_for(results, 2)
+
+    assert sorted(results) == [False, True]
+    assert cache.get(existing_dir, results.append) is True
+    assert cache.get(missing_dir, results.append) is False
+    assert len(results) == 2
+
+
+def test_outdated_path_result_returned_while_checked(tmpdir):
+    cache = PathExistsCache(ttl=0)
+    results = []
+    cache.get(str(tmpdir), results.append)
+    wait_for(results, 1)
+
+    tmpdir.remove()
+    assert cache.get(str(tmpdir), results.append) is True
+    wait_for(results, 2)
+    assert results == [True, False]